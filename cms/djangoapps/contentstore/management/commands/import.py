@@ -3,6 +3,7 @@ Script for importing courseware from XML format
 """
 from optparse import make_option
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django_comment_common.utils import (seed_permissions_roles,
                                          are_permissions_roles_seeded)
@@ -22,15 +23,21 @@ class Command(BaseCommand):
         make_option('--nostatic',
                     action='store_true',
                     help='Skip import of static content'),
+        make_option('--incremental',
+                    action='store_true',
+                    help='Only import the blocks which changed since the last import'),
     )
 
     def handle(self, *args, **options):
         "Execute the command"
         if len(args) == 0:
-            raise CommandError("import requires at least one argument: <data directory> [--nostatic] [<course dir>...]")
+            raise CommandError(
+                "import requires at least one argument: <data directory> [--nostatic] [--incremental] [<course dir>...]"
+            )
 
         data_dir = args[0]
         do_import_static = not options.get('nostatic', False)
+        incremental = options.get('incremental', False)
         if len(args) > 1:
             source_dirs = args[1:]
         else:
@@ -46,6 +53,8 @@ class Command(BaseCommand):
             static_content_store=contentstore(), verbose=True,
             do_import_static=do_import_static,
             create_if_not_present=True,
+            static_content_workers=settings.COURSE_IMPORT_STATIC_CONTENT_WORKERS,
+            incremental=incremental,
         )
 
         for course in course_items:
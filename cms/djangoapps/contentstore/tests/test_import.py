@@ -9,6 +9,7 @@ from django.test.utils import override_settings
 from django.conf import settings
 import ddt
 import copy
+from mock import patch
 
 from openedx.core.djangoapps.content.course_structures.tests import SignalDisconnectTestMixin
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -39,7 +40,7 @@ class ContentStoreImportTest(SignalDisconnectTestMixin, ModuleStoreTestCase):
         self.client = Client()
         self.client.login(username=self.user.username, password=self.user_password)
 
-    def load_test_import_course(self, target_id=None, create_if_not_present=True, module_store=None):
+    def load_test_import_course(self, target_id=None, create_if_not_present=True, module_store=None, incremental=False):
         '''
         Load the standard course used to test imports
         (for do_import_static=False behavior).
@@ -57,6 +58,7 @@ class ContentStoreImportTest(SignalDisconnectTestMixin, ModuleStoreTestCase):
             verbose=True,
             target_id=target_id,
             create_if_not_present=create_if_not_present,
+            incremental=incremental,
         )
         course_id = module_store.make_course_key('edX', 'test_import_course', '2012_Fall')
         course = module_store.get_course(course_id)
@@ -187,6 +189,35 @@ class ContentStoreImportTest(SignalDisconnectTestMixin, ModuleStoreTestCase):
             __, __, course = self.load_test_import_course(create_if_not_present=True)
             self.load_test_import_course(target_id=course.id)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_incremental_reimport(self, default_ms_type):
+        with modulestore().default_store(default_ms_type):
+            module_store, __, course = self.load_test_import_course(create_if_not_present=True)
+            with patch.object(module_store, 'import_xblock', wraps=module_store.import_xblock) as mock_import:
+                self.load_test_import_course(target_id=course.id)
+            full_import_count = mock_import.call_count
+
+            with patch.object(module_store, 'import_xblock', wraps=module_store.import_xblock) as mock_import:
+                self.load_test_import_course(target_id=course.id, incremental=True)
+            self.assertLess(mock_import.call_count, full_import_count)
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_incremental_reimport_changed_block(self, default_ms_type):
+        with modulestore().default_store(default_ms_type):
+            module_store, __, course = self.load_test_import_course(create_if_not_present=True)
+            vertical_key = course.id.make_usage_key('vertical', 'vertical_test')
+            vertical = module_store.get_item(vertical_key)
+            original_display_name = vertical.display_name
+            vertical.display_name = 'Changed'
+            module_store.update_item(vertical, self.user.id)
+            module_store.publish(vertical_key, self.user.id)
+
+            self.load_test_import_course(target_id=course.id, incremental=True)
+            revisions = (ModuleStoreEnum.RevisionOption.published_only, ModuleStoreEnum.RevisionOption.draft_preferred)
+            for revision in revisions:
+                vertical = module_store.get_item(vertical_key, revision=revision)
+                self.assertEqual(vertical.display_name, original_display_name)
+
     def test_rewrite_reference_list(self):
         # This test fails with split modulestore (the HTML component is not in "different_course_id" namespace).
         # More investigation needs to be done.
@@ -32,7 +32,7 @@ from xblock_django.user_service import DjangoXBlockUserService
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from cms.lib.xblock.field_data import CmsFieldData
 
-from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
+from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, get_safe_exec_cache
 
 import static_replace
 from .session_kv_store import SessionKeyValueStore
@@ -206,6 +206,7 @@ def _preview_module_system(request, descriptor, field_data):
         debug=True,
         replace_urls=partial(static_replace.replace_static_urls, data_directory=None, course_id=course_id),
         user=request.user,
+        cache=get_safe_exec_cache(),
         can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
         get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
         mixins=settings.XBLOCK_MIXINS,
@@ -207,6 +207,8 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_CACHE_MAX_ENTRIES = ENV_TOKENS.get("SAFE_EXEC_CACHE_MAX_ENTRIES", SAFE_EXEC_CACHE_MAX_ENTRIES)
+SAFE_EXEC_CACHE_TIMEOUT = ENV_TOKENS.get("SAFE_EXEC_CACHE_TIMEOUT", SAFE_EXEC_CACHE_TIMEOUT)
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -455,3 +457,40 @@ PARTNER_SUPPORT_EMAIL = ENV_TOKENS.get('PARTNER_SUPPORT_EMAIL', PARTNER_SUPPORT_
 
 # Affiliate cookie tracking
 AFFILIATE_COOKIE_NAME = ENV_TOKENS.get('AFFILIATE_COOKIE_NAME', AFFILIATE_COOKIE_NAME)
+
+# Course assets cached on disk
+CONTENTSERVER_DISK_CACHE_DIR = ENV_TOKENS.get("CONTENTSERVER_DISK_CACHE_DIR", CONTENTSERVER_DISK_CACHE_DIR)
+CONTENTSERVER_DISK_CACHE_CHUNK_SIZE = ENV_TOKENS.get(
+    "CONTENTSERVER_DISK_CACHE_CHUNK_SIZE", CONTENTSERVER_DISK_CACHE_CHUNK_SIZE
+)
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    "CONTENTSERVER_DISK_CACHE_MAX_SIZE", CONTENTSERVER_DISK_CACHE_MAX_SIZE
+)
+
+# Course structures cached in each process
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    "COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE", COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE
+)
+
+# Static files imported concurrently
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = ENV_TOKENS.get(
+    "COURSE_IMPORT_STATIC_CONTENT_WORKERS", COURSE_IMPORT_STATIC_CONTENT_WORKERS
+)
+
+# Configuration model entries cached in each process and request
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = ENV_TOKENS.get(
+    "CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT", CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT
+)
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = ENV_TOKENS.get(
+    "CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED", CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED
+)
+
+# Enrollments of a user cached across and within requests
+COURSE_ENROLLMENT_CACHE_TIMEOUT = ENV_TOKENS.get("COURSE_ENROLLMENT_CACHE_TIMEOUT", COURSE_ENROLLMENT_CACHE_TIMEOUT)
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = ENV_TOKENS.get(
+    "COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED", COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED
+)
+
+# Asset manifests of courses used to rewrite /static/ urls
+ASSET_MANIFEST_CACHE_TIMEOUT = ENV_TOKENS.get("ASSET_MANIFEST_CACHE_TIMEOUT", ASSET_MANIFEST_CACHE_TIMEOUT)
+ASSET_MANIFEST_CACHE_MAX_SIZE = ENV_TOKENS.get("ASSET_MANIFEST_CACHE_MAX_SIZE", ASSET_MANIFEST_CACHE_MAX_SIZE)
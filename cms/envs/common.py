@@ -949,6 +949,12 @@ MKTG_URL_LINK_MAP = {
 
 COURSES_WITH_UNSAFE_CODE = []
 
+# Results of sandboxed code are cached in a per-process cache of at most
+# SAFE_EXEC_CACHE_MAX_ENTRIES entries, in front of the "default" cache, for
+# SAFE_EXEC_CACHE_TIMEOUT seconds.
+SAFE_EXEC_CACHE_MAX_ENTRIES = 1000
+SAFE_EXEC_CACHE_TIMEOUT = 24 * 60 * 60
+
 ############################## EVENT TRACKING #################################
 
 TRACK_MAX_EVENT = 50000
@@ -1189,3 +1195,69 @@ PARTNER_SUPPORT_EMAIL = ''
 
 # Affiliate cookie tracking
 AFFILIATE_COOKIE_NAME = 'affiliate_id'
+
+############## Settings for the contentserver ###############
+
+# Directory where course assets too large for the "course_assets" cache are
+# cached, as chunk files, on the local disk.  This cache is disabled if None.
+CONTENTSERVER_DISK_CACHE_DIR = None
+
+# Size, in bytes, of the chunk files of assets cached on the local disk.
+CONTENTSERVER_DISK_CACHE_CHUNK_SIZE = 1048576
+
+# Maximum size, in bytes, of the assets cached on the local disk.  The least
+# recently used assets are removed once it is exceeded.  If None, the cache is
+# not pruned, and must be cleaned up externally.
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+############## Settings for the split modulestore ###############
+
+# Maximum size, in bytes of pickled data, of the per-process cache of course
+# structures, in front of the "course_structure_cache".  The per-process cache
+# is disabled if 0.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 0
+
+############## Settings for course import ###############
+
+# Number of threads importing the static files of a course, which are then
+# streamed to the contentstore, and skipped if they are already in it
+# unchanged.  Static files are imported one at a time, in memory, if 0.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 0
+
+############## Settings for configuration models ###############
+
+# Number of seconds configuration model entries are kept in each process, in
+# front of the "configuration" cache.  Saved changes are seen by all
+# processes within this time.  The per-process tier is disabled if 0.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 5
+
+# Whether configuration model entries are memoized for the duration of each
+# request.
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = True
+
+############## Settings for course enrollments ###############
+
+# Number of seconds the enrollments of a user are cached across requests.
+# Saving or deleting an enrollment invalidates the cache immediately; the
+# timeout only bounds how long enrollments read by a request racing with an
+# uncommitted change can be cached.  Enrollments are not cached if 0.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 60
+
+# Whether the enrollments of a user are memoized for the duration of each
+# request.
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = True
+
+############## Settings for course asset manifests ###############
+
+# Number of seconds the asset manifest of a course, used to rewrite the
+# /static/ urls of its content, is cached.  Saving, deleting or locking an
+# asset invalidates the manifest immediately; the timeout only bounds how
+# long changes made outside of the contentstore API can go unnoticed.
+# Manifests are not cached if 0.
+ASSET_MANIFEST_CACHE_TIMEOUT = 60 * 60
+
+# Maximum size, in bytes of pickled data, of a cached asset manifest, which
+# must fit in a single cache entry (memcached rejects values larger than 1MB).
+# The urls of courses with larger manifests are rewritten by looking up their
+# assets one by one.  Manifests of any size are cached if None.
+ASSET_MANIFEST_CACHE_MAX_SIZE = 1000000
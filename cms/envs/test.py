@@ -182,6 +182,20 @@ CACHES = {
     },
 }
 
+# Tests change configuration models outside of requests, and between tests
+# whose database changes are rolled back, so always read them through.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 0
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = False
+
+# Tests roll back their enrollments without invalidating any cache, and
+# count the queries enrollments take, so always read them through.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 0
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = False
+
+# Tests drop their contentstore without invalidating any cache, and count
+# the queries asset urls take, so always read asset manifests through.
+ASSET_MANIFEST_CACHE_TIMEOUT = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
@@ -1,6 +1,11 @@
 """
 Django Model baseclass for database-backed configuration.
 """
+import cPickle as pickle
+import threading
+import time
+
+from django.conf import settings
 from django.db import connection, models
 from django.contrib.auth.models import User
 from django.core.cache import caches, InvalidCacheBackendError
@@ -8,12 +13,22 @@ from django.utils.translation import ugettext_lazy as _
 
 from rest_framework.utils import model_meta
 
+import request_cache
+
 
 try:
     cache = caches['configuration']  # pylint: disable=invalid-name
 except InvalidCacheBackendError:
     from django.core.cache import cache
 
+REQUEST_CACHE_NAME = 'config_models.current'
+
+# The per-process tier of ConfigurationModel.current, shared by all the
+# threads of a process: a dict of cache key to (expiration time, final
+# expiration time, generation, pickled configuration entry).
+_LOCAL_CACHE = {}
+_LOCAL_CACHE_LOCK = threading.Lock()
+
 
 class ConfigurationModelManager(models.Manager):
     """
@@ -99,9 +114,16 @@ class ConfigurationModel(models.Model):
         # Always create a new entry, instead of updating an existing model
         self.pk = None  # pylint: disable=invalid-name
         super(ConfigurationModel, self).save(*args, **kwargs)
-        cache.delete(self.cache_key_name(*[getattr(self, key) for key in self.KEY_FIELDS]))
+        cache_key = self.cache_key_name(*[getattr(self, key) for key in self.KEY_FIELDS])
+        request_cache.get_cache(REQUEST_CACHE_NAME).pop(cache_key, None)
+        with _LOCAL_CACHE_LOCK:
+            _LOCAL_CACHE.pop(cache_key, None)
+        # Delete the shared entry first, so that no process can read the
+        # previous entry and keep it for the new generation.
+        cache.delete(cache_key)
         if self.KEY_FIELDS:
             cache.delete(self.key_values_cache_key_name())
+        self._bump_generation()
 
     @classmethod
     def cache_key_name(cls, *args):
@@ -115,25 +137,126 @@ class ConfigurationModel(models.Model):
         else:
             return 'configuration/{}/current'.format(cls.__name__)
 
+    @classmethod
+    def generation_cache_key_name(cls):
+        """Return the name of the key to use to cache the generation of this configuration"""
+        return 'configuration/{}/generation'.format(cls.__name__)
+
+    @classmethod
+    def _generation(cls):
+        """
+        Return the generation of this configuration, which is bumped by every
+        save.  Entries of the per-process tier of `current` are only valid for
+        the generation they were read in.
+
+        The generation is initialized from the current time, rather than from
+        0, so that a generation evicted from the cache cannot be reused with
+        stale entries.
+        """
+        generation_key = cls.generation_cache_key_name()
+        generation = cache.get(generation_key)
+        if generation is None:
+            generation = int(time.time() * 1000)
+            if not cache.add(generation_key, generation, None):
+                generation = cache.get(generation_key, generation)
+        return generation
+
+    @classmethod
+    def _bump_generation(cls):
+        """
+        Invalidate the entries of the per-process tier of `current` in all
+        processes by atomically incrementing the generation.
+        """
+        generation_key = cls.generation_cache_key_name()
+        try:
+            cache.incr(generation_key)
+        except ValueError:
+            # The generation is not in the cache: start a new one.
+            cache.set(generation_key, int(time.time() * 1000), None)
+
     @classmethod
     def current(cls, *args):
         """
         Return the active configuration entry, either from cache,
         from the database, or by creating a new empty entry (which is not
         persisted).
+
+        Entries are memoized for the duration of the request, if
+        CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED is set, and kept in a
+        per-process tier for CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT seconds,
+        in front of the shared "configuration" cache.  Once they expire,
+        per-process entries are reused as long as the generation of the
+        configuration is unchanged, so that a save is seen by all processes
+        within that timeout, but never for longer than `cache_timeout` in all.
         """
-        cached = cache.get(cls.cache_key_name(*args))
-        if cached is not None:
-            return cached
+        cache_key = cls.cache_key_name(*args)
+        request_cache_enabled = getattr(settings, 'CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED', True)
+        if request_cache_enabled:
+            request_cached = request_cache.get_cache(REQUEST_CACHE_NAME)
+            if cache_key in request_cached:
+                return request_cached[cache_key]
+
+        local_timeout = getattr(settings, 'CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT', 5)
+        generation = None
+        if local_timeout:
+            current = cls._get_local(cache_key, local_timeout)
+            if current is not None:
+                if request_cache_enabled:
+                    request_cached[cache_key] = current
+                return current
+            # Read the generation before the entry, so that an entry changed
+            # in between is only kept for the older generation.
+            generation = cls._generation()
+
+        current = cache.get(cache_key)
+        if current is None:
+            key_dict = dict(zip(cls.KEY_FIELDS, args))
+            try:
+                current = cls.objects.filter(**key_dict).order_by('-change_date')[0]
+            except IndexError:
+                current = cls(**key_dict)
+
+            cache.set(cache_key, current, cls.cache_timeout)
+
+        if local_timeout:
+            now = time.time()
+            entry = (
+                now + local_timeout,
+                now + cls.cache_timeout,
+                generation,
+                pickle.dumps(current, pickle.HIGHEST_PROTOCOL),
+            )
+            with _LOCAL_CACHE_LOCK:
+                _LOCAL_CACHE[cache_key] = entry
+        if request_cache_enabled:
+            request_cached[cache_key] = current
+        return current
 
-        key_dict = dict(zip(cls.KEY_FIELDS, args))
-        try:
-            current = cls.objects.filter(**key_dict).order_by('-change_date')[0]
-        except IndexError:
-            current = cls(**key_dict)
+    @classmethod
+    def _get_local(cls, cache_key, local_timeout):
+        """
+        Return the configuration entry with the given key from the per-process
+        tier of `current`, or None if it is missing or stale.
 
-        cache.set(cls.cache_key_name(*args), current, cls.cache_timeout)
-        return current
+        Expired entries are checked against the generation of the
+        configuration, and renewed if it is unchanged, up to their final
+        expiration time: an entry read while a save was in progress may be
+        stale even though its generation is current.
+        """
+        with _LOCAL_CACHE_LOCK:
+            entry = _LOCAL_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        expiration_time, final_expiration_time, generation, pickled_current = entry
+        now = time.time()
+        if expiration_time < now:
+            if final_expiration_time < now or cls._generation() != generation:
+                return None
+            with _LOCAL_CACHE_LOCK:
+                _LOCAL_CACHE[cache_key] = (
+                    min(now + local_timeout, final_expiration_time), final_expiration_time, generation, pickled_current
+                )
+        return pickle.loads(pickled_current)
 
     @classmethod
     def is_enabled(cls):
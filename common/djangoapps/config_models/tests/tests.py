@@ -5,15 +5,18 @@ Tests of ConfigurationModel
 
 import ddt
 from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
 from django.db import models
 from django.test import TestCase
+from django.test.utils import override_settings
 from rest_framework.test import APIRequestFactory
 
 from freezegun import freeze_time
 
 from mock import patch, Mock
-from config_models.models import ConfigurationModel
+from config_models.models import ConfigurationModel, _LOCAL_CACHE
 from config_models.views import ConfigurationModelCurrentAPIView
+from request_cache.middleware import RequestCache
 
 
 class ExampleConfig(ConfigurationModel):
@@ -180,6 +183,105 @@ class ConfigurationModelTests(TestCase):
         )
 
 
+@override_settings(CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT=5, CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED=False)
+class ConfigurationModelLocalCacheTests(TestCase):
+    """
+    Tests of the per-process and per-request tiers of ConfigurationModel.current
+    """
+    def setUp(self):
+        super(ConfigurationModelLocalCacheTests, self).setUp()
+        self.user = User()
+        self.user.save()
+        self.cache = LocMemCache('config_models_tests', {})
+        patcher = patch('config_models.models.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _LOCAL_CACHE.clear()
+        self.addCleanup(_LOCAL_CACHE.clear)
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def _change_in_other_process(self, string_field):
+        """
+        Change the current configuration as a save in another process would,
+        without touching the per-process tier of this one.
+        """
+        ExampleConfig.objects.update(string_field=string_field)
+        self.cache.delete(ExampleConfig.cache_key_name())
+        ExampleConfig._bump_generation()  # pylint: disable=protected-access
+
+    def test_local_cache(self):
+        ExampleConfig(changed_by=self.user, string_field='first').save()
+        first = ExampleConfig.current()
+        self.cache.clear()
+        with self.assertNumQueries(0):
+            current = ExampleConfig.current()
+        self.assertEquals(current.string_field, 'first')
+        self.assertIsNot(current, first)
+
+    def test_save_clears_local_cache(self):
+        ExampleConfig(changed_by=self.user, string_field='first').save()
+        ExampleConfig.current()
+        ExampleConfig(changed_by=self.user, string_field='second').save()
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_other_process_change_seen_after_timeout(self):
+        with freeze_time('2016-01-01 00:00:00'):
+            ExampleConfig(changed_by=self.user, string_field='first').save()
+            ExampleConfig.current()
+            self._change_in_other_process('second')
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+        with freeze_time('2016-01-01 00:00:06'):
+            self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_expired_entry_renewed_for_same_generation(self):
+        with freeze_time('2016-01-01 00:00:00'):
+            ExampleConfig(changed_by=self.user, string_field='first').save()
+            ExampleConfig.current()
+        self.cache.delete(ExampleConfig.cache_key_name())
+        with freeze_time('2016-01-01 00:00:06'):
+            with self.assertNumQueries(0):
+                self.assertEquals(ExampleConfig.current().string_field, 'first')
+
+    def test_local_entry_lifetime_capped(self):
+        with freeze_time('2016-01-01 00:00:00'):
+            ExampleConfig(changed_by=self.user, string_field='first').save()
+            ExampleConfig.current()
+        # An entry read while a save in another process was in progress is
+        # stale, even though it was kept for the new generation.
+        ExampleConfig.objects.update(string_field='second')
+        self.cache.delete(ExampleConfig.cache_key_name())
+        with freeze_time('2016-01-01 00:04:59'):
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+        with freeze_time('2016-01-01 00:05:01'):
+            self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_save_deletes_shared_entry_before_bumping_generation(self):
+        ExampleConfig(changed_by=self.user, string_field='first').save()
+        ExampleConfig.current()
+        bump_generation = ExampleConfig._bump_generation  # pylint: disable=protected-access
+
+        def _bump_generation():
+            """Checks that the previous entry can't be read for the new generation."""
+            self.assertIsNone(self.cache.get(ExampleConfig.cache_key_name()))
+            bump_generation()
+
+        with patch.object(ExampleConfig, '_bump_generation', side_effect=_bump_generation) as mock_bump_generation:
+            ExampleConfig(changed_by=self.user, string_field='second').save()
+        self.assertEquals(mock_bump_generation.call_count, 1)
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    @override_settings(CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT=0, CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED=True)
+    def test_request_cache(self):
+        ExampleConfig(changed_by=self.user, string_field='first').save()
+        first = ExampleConfig.current()
+        self.cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIs(ExampleConfig.current(), first)
+        ExampleConfig(changed_by=self.user, string_field='second').save()
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+
 class ExampleKeyedConfig(ConfigurationModel):
     """
     Test model for testing ``ConfigurationModels`` with keyed configuration.
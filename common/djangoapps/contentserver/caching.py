@@ -1,10 +1,51 @@
 """
 Helper functions for caching course assets.
+
+Assets are cached in two tiers:
+
+* Small assets are pickled whole, with their data, into the "course_assets"
+  cache.
+
+* Large assets are written to the local disk, if CONTENTSERVER_DISK_CACHE_DIR
+  is set, as fixed-size chunk files in a directory named after the asset's
+  digest.  Only the asset's metadata goes into the "course_assets" cache, and
+  its data (or any range of it) is then read straight from the chunk files.
+  The least recently used assets are removed from the disk once their total
+  size exceeds CONTENTSERVER_DISK_CACHE_MAX_SIZE.
 """
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContent
+
+log = logging.getLogger(__name__)
+
+# Assets smaller than this, in bytes, are cached whole in the "course_assets" cache.  We cap
+# this at 1MB because it's the default for memcached and also we don't want to do too much
+# buffering in memory when we're serving an actual request.
+MEMORY_CACHE_MAX_SIZE = 1048576
+
+# Default size, in bytes, of the chunk files of assets cached on disk.
+DEFAULT_DISK_CACHE_CHUNK_SIZE = 1048576
+
+# Default maximum size, in bytes, of the assets cached on disk.
+DEFAULT_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# Prefix of the temporary directories in which the chunks of an asset are written.
+DISK_CACHE_TEMP_PREFIX = '.tmp-'
+
+# Temporary directories older than this, in seconds, were left behind by failed writes.
+DISK_CACHE_TEMP_EXPIRATION = 60 * 60
+
+# Assets used more recently than this, in seconds, may still be streamed, so they are not pruned.
+DISK_CACHE_PRUNE_MIN_UNUSED_TIME = 10 * 60
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -24,8 +65,38 @@ def set_cached_content(content):
 def get_cached_content(location):
     """
     Retrieves the given piece of content by its location if cached.
+
+    Content whose data is cached on disk is only returned if its chunk files
+    exist on this host's disk.
     """
-    return CONTENT_CACHE.get(unicode(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
+    content = CONTENT_CACHE.get(unicode(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
+    if isinstance(content, DiskCachedContent):
+        if not content.is_on_disk():
+            return None
+        content.mark_used()
+    return content
+
+
+def cache_content(content):
+    """
+    Caches the given content, freshly loaded as a StaticContentStream, in the
+    tier suited to its size, and returns the content to serve it from.
+
+    The given content is returned as is if it cannot be cached.
+    """
+    if content.length is None:
+        return content
+
+    if content.length < MEMORY_CACHE_MAX_SIZE:
+        content = content.copy_to_in_mem()
+        set_cached_content(content)
+        return content
+
+    disk_content = DiskCachedContent.create_from_stream(content)
+    if disk_content is None:
+        return content
+    set_cached_content(disk_content)
+    return disk_content
 
 
 def del_cached_content(location):
@@ -47,3 +118,211 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+class DiskCachedContent(StaticContent):
+    """
+    Course asset whose data is stored in fixed-size chunk files on the local disk.
+
+    The chunk files of an asset are named after their index, in a directory
+    named after the asset's digest.  That directory is created atomically
+    once all of its chunks are written, so its existence means that the
+    asset's data is complete.  Since the directory depends only on the
+    digest, it can be shared by all the locations and versions of an asset
+    with the same data, and it never needs to be invalidated: a modified
+    asset gets a new digest.  The directory can safely be cleared at any
+    time to reclaim disk space, which prune_disk_cache does for the least
+    recently used assets.
+
+    Instances only hold the asset's metadata, so that they can be pickled
+    into the "course_assets" cache.
+    """
+    def __init__(self, content, chunk_size):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def create_from_stream(cls, content):
+        """
+        Writes the data of the given StaticContentStream to the disk cache,
+        unless it is already there, and returns the corresponding
+        DiskCachedContent.
+
+        Returns None if the disk cache is disabled, the content has no
+        usable digest, is larger than the disk cache, or cannot be written.
+        Otherwise, the given content is closed, since it is served from the
+        disk instead.
+        """
+        cache_dir = getattr(settings, 'CONTENTSERVER_DISK_CACHE_DIR', None)
+        if not cache_dir or not content.content_digest or not content.content_digest.isalnum():
+            return None
+        max_size = getattr(settings, 'CONTENTSERVER_DISK_CACHE_MAX_SIZE', DEFAULT_DISK_CACHE_MAX_SIZE)
+        if max_size is not None and content.length > max_size:
+            return None
+
+        chunk_size = getattr(settings, 'CONTENTSERVER_DISK_CACHE_CHUNK_SIZE', DEFAULT_DISK_CACHE_CHUNK_SIZE)
+        disk_content = cls(content, chunk_size)
+        if disk_content.is_on_disk():
+            content.close()
+            return disk_content
+
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            temp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=DISK_CACHE_TEMP_PREFIX)
+        except (IOError, OSError):
+            log.exception(u"Unable to write asset %s to the disk cache", unicode(content.location))
+            return None
+
+        try:
+            disk_content._write_chunks(content, temp_dir)  # pylint: disable=protected-access
+            os.rename(temp_dir, disk_content.chunks_dir)
+        except (IOError, OSError):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            # Another process may have written the same asset in the meantime.
+            if not disk_content.is_on_disk():
+                log.exception(u"Unable to write asset %s to the disk cache", unicode(content.location))
+                # The content is served from its stream instead, so rewind what was read of it.
+                content._stream.seek(0)  # pylint: disable=protected-access
+                return None
+            content.close()
+            return disk_content
+
+        content.close()
+        if max_size is not None:
+            prune_disk_cache(cache_dir, max_size)
+        return disk_content
+
+    @property
+    def chunks_dir(self):
+        """
+        Returns the directory holding the chunk files of this asset.
+        """
+        return os.path.join(settings.CONTENTSERVER_DISK_CACHE_DIR, self.content_digest)
+
+    def is_on_disk(self):
+        """
+        Returns whether the chunk files of this asset exist on the local disk.
+        """
+        cache_dir = getattr(settings, 'CONTENTSERVER_DISK_CACHE_DIR', None)
+        return bool(cache_dir) and os.path.isdir(self.chunks_dir)
+
+    def mark_used(self):
+        """
+        Records that this asset was just used, so that it is pruned from the
+        disk cache after less recently used assets.
+        """
+        try:
+            os.utime(self.chunks_dir, None)
+        except OSError:
+            # The asset was pruned in the meantime.
+            pass
+
+    def _write_chunks(self, content, chunks_dir):
+        """
+        Writes the data of the given StaticContentStream as chunk files in
+        the given directory.
+        """
+        index = 0
+        chunk_file = None
+        chunk_length = 0
+        try:
+            for data in content.stream_data():
+                while data:
+                    if chunk_file is None:
+                        chunk_file = open(os.path.join(chunks_dir, str(index)), 'wb')
+                        chunk_length = 0
+                    written = data[:self.chunk_size - chunk_length]
+                    chunk_file.write(written)
+                    chunk_length += len(written)
+                    data = data[len(written):]
+                    if chunk_length == self.chunk_size:
+                        chunk_file.close()
+                        chunk_file = None
+                        index += 1
+        finally:
+            if chunk_file is not None:
+                chunk_file.close()
+
+    @property
+    def data(self):
+        return ''.join(self.stream_data())
+
+    def stream_data(self):
+        """
+        Streams the whole data of this asset from its chunk files.
+        """
+        if self.length:
+            return self.stream_data_in_range(0, self.length - 1)
+        return iter([])
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Streams the data between first_byte and last_byte (included) from
+        the chunk files of this asset, reading only the chunks that overlap
+        the range.
+
+        The asset is marked as used before each chunk is read, so that it is
+        not pruned while it is being streamed.
+        """
+        for index in xrange(first_byte // self.chunk_size, last_byte // self.chunk_size + 1):
+            self.mark_used()
+            chunk_start = index * self.chunk_size
+            with open(os.path.join(self.chunks_dir, str(index)), 'rb') as chunk_file:
+                offset = max(first_byte - chunk_start, 0)
+                chunk_file.seek(offset)
+                yield chunk_file.read(min(last_byte - chunk_start + 1, self.chunk_size) - offset)
+
+
+def prune_disk_cache(cache_dir, max_size):
+    """
+    Removes the least recently used assets from the disk cache in the given
+    directory until the total size of its assets is at most max_size bytes,
+    along with the temporary directories left behind by failed writes.
+
+    An asset's directory is marked as used, by updating its modification
+    time, every time the asset is served and while it is streamed.  Assets
+    used within the last DISK_CACHE_PRUNE_MIN_UNUSED_TIME seconds are never
+    removed, so that their streams aren't cut off, even if the disk cache
+    then stays larger than max_size.
+    """
+    now = time.time()
+    assets = []
+    total_size = 0
+    try:
+        dir_names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for dir_name in dir_names:
+        dir_path = os.path.join(cache_dir, dir_name)
+        try:
+            last_used = os.path.getmtime(dir_path)
+            if dir_name.startswith(DISK_CACHE_TEMP_PREFIX):
+                if now - last_used > DISK_CACHE_TEMP_EXPIRATION:
+                    shutil.rmtree(dir_path, ignore_errors=True)
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(dir_path, chunk_name)) for chunk_name in os.listdir(dir_path)
+            )
+        except OSError:
+            # Another process removed the directory in the meantime.
+            continue
+        assets.append((last_used, size, dir_path))
+        total_size += size
+
+    if total_size <= max_size:
+        return
+    assets.sort()
+    pruned_count = 0
+    for last_used, size, dir_path in assets:
+        if total_size <= max_size or now - last_used < DISK_CACHE_PRUNE_MIN_UNUSED_TIME:
+            break
+        shutil.rmtree(dir_path, ignore_errors=True)
+        total_size -= size
+        pruned_count += 1
+    log.info(u"Pruned %d assets from the disk cache in %s", pruned_count, cache_dir)
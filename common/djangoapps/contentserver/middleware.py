@@ -2,12 +2,16 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
 import datetime
+from uuid import uuid4
+
 import newrelic.agent
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
     HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+from django.utils.http import parse_http_date_safe
 from student.models import CourseEnrollment
 from contentserver.models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
@@ -17,7 +21,7 @@ from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
-from .caching import get_cached_content, set_cached_content
+from .caching import cache_content, get_cached_content
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -26,6 +30,9 @@ from xmodule.exceptions import NotFoundError
 
 log = logging.getLogger(__name__)
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+# Range requests with more ranges than this get the full content instead, so that a single
+# request can't make us stream the same asset over and over.
+MAX_BYTE_RANGES = 10
 
 
 class StaticContentServer(object):
@@ -66,7 +73,7 @@ class StaticContentServer(object):
             # if we're able to load it.
             actual_digest = None
             try:
-                content = self.load_asset_from_location(loc)
+                content = self.load_asset_from_location(loc, load_data=(request.method != 'HEAD'))
                 actual_digest = getattr(content, "content_digest", None)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
@@ -102,24 +109,22 @@ class StaticContentServer(object):
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            if self.is_not_modified(request, content):
+                response = HttpResponseNotModified()
+                self.set_caching_headers(content, response)
+                return response
+
+            # HEAD requests get the same headers as a GET, but we never read the asset's data.
+            is_head_request = request.method == 'HEAD'
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]]..."
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -132,43 +137,57 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
                             )
+                            response = HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            response['Content-Range'] = 'bytes */{length}'.format(length=content.length)
+                            return response
+
+                        # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
+                        if type(content) == StaticContent and not is_head_request:
+                            content = AssetManager.find(loc, as_stream=True)
+
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = HttpResponse(
+                                '' if is_head_request else content.stream_data_in_range(first, last)
+                            )
+                            response['Content-Range'] = get_content_range(first, last, content.length)
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+                            response['Content-Type'] = content.content_type
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            # Multiple ranges are sent back as a multipart message, one part per range.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+                            boundary = uuid4().hex
+                            part_headers = get_byteranges_part_headers(content, ranges, boundary)
+                            response = HttpResponse(
+                                '' if is_head_request else stream_byteranges(content, ranges, part_headers, boundary)
                             )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            response['Content-Length'] = str(get_byteranges_length(ranges, part_headers, boundary))
+                            response['Content-Type'] = 'multipart/byteranges; boundary={}'.format(boundary)
+                        response.status_code = 206  # Partial Content
+
+                        newrelic.agent.add_custom_parameter('contentserver.ranged', True)
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = HttpResponse('' if is_head_request else content.stream_data())
                 response['Content-Length'] = content.length
+                response['Content-Type'] = content.content_type
 
             newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
             newrelic.agent.add_custom_parameter('contentserver.content_type', content.content_type)
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -203,11 +222,59 @@ class StaticContentServer(object):
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
 
+        etag = StaticContentServer.get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
+
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
         force_header_for_response(response, 'Vary', 'Origin')
 
+    @staticmethod
+    def get_etag(content):
+        """
+        Returns a strong entity tag for the given content, built from its digest, or None
+        if the content has no digest.
+        """
+        content_digest = getattr(content, "content_digest", None)
+        if not content_digest:
+            return None
+        return '"{}"'.format(content_digest)
+
+    def is_not_modified(self, request, content):
+        """
+        Determines whether the client already holds the current version of the given content,
+        based on the If-None-Match and If-Modified-Since headers of the request.
+
+        As required by RFC 7232, If-Modified-Since is ignored when If-None-Match is present.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etag = StaticContentServer.get_etag(content)
+            if etag is None:
+                return False
+            if if_none_match.strip() == '*':
+                return True
+            # GET and HEAD requests use the weak comparison function, so ignore any weak indicator.
+            for candidate in if_none_match.split(','):
+                candidate = candidate.strip()
+                if candidate.startswith('W/'):
+                    candidate = candidate[2:]
+                if candidate == etag:
+                    return True
+            return False
+
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since is not None and content.last_modified_at is not None:
+            if_modified_since = parse_http_date_safe(if_modified_since)
+            if if_modified_since is not None:
+                # HTTP dates only have a precision of one second.
+                last_modified_at = calendar.timegm(content.last_modified_at.utctimetuple())
+                return last_modified_at <= if_modified_since
+
+        return False
+
     @staticmethod
     def is_cdn_request(request):
         """
@@ -255,10 +322,14 @@ class StaticContentServer(object):
 
         return True
 
-    def load_asset_from_location(self, location):
+    def load_asset_from_location(self, location, load_data=True):
         """
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
+
+        If load_data is False, an asset that isn't cached is returned as a closed
+        stream, with its metadata but without reading any of its data, and is not
+        added to the cache.
         """
 
         # See if we can load this item from cache.
@@ -270,12 +341,13 @@ class StaticContentServer(object):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
-                content = content.copy_to_in_mem()
-                set_cached_content(content)
+            # Now that we fetched it, let's go ahead and try to cache it, unless we
+            # were asked not to read its data.
+            if load_data:
+                content = cache_content(content)
+            else:
+                # Only the asset's metadata is used, so don't leave its stream open.
+                content.close()
 
         return content
 
@@ -321,3 +393,47 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def get_content_range(first, last, length):
+    """
+    Returns the value of the Content-Range header for the given range of bytes.
+    """
+    return 'bytes {first}-{last}/{length}'.format(first=first, last=last, length=length)
+
+
+def get_byteranges_part_headers(content, ranges, boundary):
+    """
+    Returns the boundary line and headers that precede each part of a
+    multipart/byteranges response for the given ranges.
+    """
+    return [
+        '--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: {content_range}\r\n\r\n'.format(
+            boundary=boundary,
+            content_type=content.content_type,
+            content_range=get_content_range(first, last, content.length),
+        )
+        for first, last in ranges
+    ]
+
+
+def get_byteranges_length(ranges, part_headers, boundary):
+    """
+    Returns the total length of the multipart/byteranges body streamed by stream_byteranges.
+    """
+    length = len('--{}--\r\n'.format(boundary))
+    for (first, last), headers in zip(ranges, part_headers):
+        length += len(headers) + (last - first + 1) + len('\r\n')
+    return length
+
+
+def stream_byteranges(content, ranges, part_headers, boundary):
+    """
+    Streams the body of a multipart/byteranges response for the given ranges of the content.
+    """
+    for (first, last), headers in zip(ranges, part_headers):
+        yield headers
+        for chunk in content.stream_data_in_range(first, last):
+            yield chunk
+        yield '\r\n'
+    yield '--{}--\r\n'.format(boundary)
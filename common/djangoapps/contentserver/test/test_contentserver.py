@@ -6,7 +6,12 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
+import time
 import unittest
+from StringIO import StringIO
 from uuid import uuid4
 
 from django.conf import settings
@@ -16,15 +21,17 @@ from django.test.utils import override_settings
 from mock import patch
 
 from xmodule.contentstore.django import contentstore
-from xmodule.contentstore.content import StaticContent, VERSIONED_ASSETS_PREFIX
+from xmodule.contentstore.content import StaticContent, StaticContentStream, VERSIONED_ASSETS_PREFIX
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from xmodule.assetstore.assetmgr import AssetManager
 from opaque_keys import InvalidKeyError
+from opaque_keys.edx.locator import CourseLocator
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from contentserver.middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from contentserver.caching import DiskCachedContent, prune_disk_cache
+from contentserver.middleware import parse_range_header, HTTP_DATE_FORMAT, MAX_BYTE_RANGES, StaticContentServer
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
@@ -241,13 +248,49 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+
+        body = resp.content
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        self.assertTrue(body.endswith('--{}--\r\n'.format(boundary)))
+
+        full_content = self.client.get(self.url_unlocked).content
+        parts = body.split('--{}'.format(boundary))[1:-1]
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        self.assertEqual(len(parts), len(expected_ranges))
+        for part, (first, last) in zip(parts, expected_ranges):
+            headers, data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=self.length_unlocked), headers)
+            self.assertEqual(data, full_content[first:last + 1] + '\r\n')
+
+    def test_range_request_multiple_ranges_some_unsatisfiable(self):
+        """
+        Test that unsatisfiable ranges are dropped from a multiple range request.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {first}-'.format(
+            first=self.length_unlocked))
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '10')
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that requests with more ranges than MAX_BYTE_RANGES get the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={}'.format(
+            ', '.join('0-{}'.format(index) for index in range(MAX_BYTE_RANGES + 1))
+        ))
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -284,6 +327,107 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_etag_header_sent(self):
+        """
+        Test that assets are served with a strong ETag built from their digest.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        content_digest = AssetManager.find(self.unlocked_asset, as_stream=True).content_digest
+        self.assertEqual(resp['ETag'], '"{}"'.format(content_digest))
+
+    def test_if_none_match(self):
+        """
+        Test that a request whose If-None-Match header matches the ETag gets a 304 with the ETag.
+        """
+        etag = self.client.get(self.url_unlocked)['ETag']
+        for if_none_match in (etag, '"other", {}'.format(etag), 'W/{}'.format(etag), '*'):
+            resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp['ETag'], etag)
+
+    def test_if_none_match_mismatch(self):
+        """
+        Test that a request whose If-None-Match header doesn't match the ETag gets the full content,
+        even if the asset wasn't modified since its If-Modified-Since header.
+        """
+        resp = self.client.get(self.url_unlocked)
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (datetime.timedelta(), 304),
+        (datetime.timedelta(days=1), 304),
+        (datetime.timedelta(days=-1), 200),
+    )
+    @ddt.unpack
+    def test_if_modified_since(self, offset, expected_status_code):
+        """
+        Test that If-Modified-Since is compared as a date to the asset's modification time.
+        """
+        last_modified = datetime.datetime.strptime(
+            self.client.get(self.url_unlocked)['Last-Modified'], HTTP_DATE_FORMAT
+        )
+        if_modified_since = (last_modified + offset).strftime(HTTP_DATE_FORMAT)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=if_modified_since)
+        self.assertEqual(resp.status_code, expected_status_code)
+
+    def test_if_modified_since_invalid_date(self):
+        """
+        Test that an invalid If-Modified-Since header is ignored.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE='not a date')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_head_request(self):
+        """
+        Test that HEAD requests get the same headers as GET requests, without loading the asset's data.
+        """
+        get_resp = self.client.get(self.url_unlocked)
+        with patch('xmodule.contentstore.content.StaticContentStream.copy_to_in_mem') as mock_copy_to_in_mem:
+            with patch('xmodule.contentstore.content.StaticContentStream.close') as mock_close:
+                with patch('contentserver.middleware.get_cached_content', return_value=None):
+                    resp = self.client.head(self.url_unlocked)
+        self.assertFalse(mock_copy_to_in_mem.called)
+        self.assertTrue(mock_close.called)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, '')
+        for header in ('Content-Length', 'Content-Type', 'ETag', 'Last-Modified', 'Accept-Ranges'):
+            self.assertEqual(resp[header], get_resp[header])
+
+    def test_head_range_request(self):
+        """
+        Test that HEAD range requests get the headers of the partial content response.
+        """
+        resp = self.client.head(self.url_unlocked, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '10')
+        self.assertEqual(resp.content, '')
+
+    @patch('contentserver.caching.MEMORY_CACHE_MAX_SIZE', 0)
+    def test_disk_cached_asset(self):
+        """
+        Test that large assets are served from their chunks in the disk cache.
+        """
+        full_content = self.client.get(self.url_unlocked).content
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=cache_dir, CONTENTSERVER_DISK_CACHE_CHUNK_SIZE=7):
+            with patch('contentserver.middleware.get_cached_content', return_value=None):
+                resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.content, full_content)
+            content_digest = AssetManager.find(self.unlocked_asset, as_stream=True).content_digest
+            self.assertTrue(os.path.isdir(os.path.join(cache_dir, content_digest)))
+
+            with patch('contentserver.middleware.AssetManager.find') as mock_find:
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=5-20')
+            self.assertFalse(mock_find.called)
+            self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+            self.assertEqual(resp.content, full_content[5:21])
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -402,6 +546,146 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(is_from_cdn, True)
 
 
+@ddt.ddt
+class DiskCachedContentTestCase(unittest.TestCase):
+    """
+    Tests for caching assets as chunk files on disk.
+    """
+    DATA = ''.join(chr(index % 256) for index in range(1000))
+
+    def setUp(self):
+        super(DiskCachedContentTestCase, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.location = CourseLocator('org', 'course', 'run').make_asset_key('asset', 'large.bin')
+
+    def _create_from_stream(self, content_digest=FAKE_MD5_HASH, chunk_size=64):
+        """
+        Caches a stream of DATA on disk and returns the result.
+        """
+        content = StaticContentStream(
+            self.location, 'large.bin', 'application/octet-stream', StringIO(self.DATA),
+            length=len(self.DATA), content_digest=content_digest,
+        )
+        with override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir, CONTENTSERVER_DISK_CACHE_CHUNK_SIZE=chunk_size
+        ):
+            return DiskCachedContent.create_from_stream(content)
+
+    @ddt.data(1, 64, 1000, 4096)
+    def test_stream_data(self, chunk_size):
+        content = self._create_from_stream(chunk_size=chunk_size)
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            self.assertTrue(content.is_on_disk())
+            self.assertEqual(''.join(content.stream_data()), self.DATA)
+            self.assertEqual(content.data, self.DATA)
+
+    @ddt.data((0, 0), (0, 63), (63, 64), (10, 500), (640, 999), (999, 999))
+    @ddt.unpack
+    def test_stream_data_in_range(self, first_byte, last_byte):
+        content = self._create_from_stream()
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, FAKE_MD5_HASH))), 16)
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            self.assertEqual(
+                ''.join(content.stream_data_in_range(first_byte, last_byte)),
+                self.DATA[first_byte:last_byte + 1],
+            )
+
+    def test_already_on_disk(self):
+        self._create_from_stream()
+        stream = StringIO(self.DATA)
+        content = StaticContentStream(
+            self.location, 'large.bin', 'application/octet-stream', stream,
+            length=len(self.DATA), content_digest=FAKE_MD5_HASH,
+        )
+        with patch.object(DiskCachedContent, '_write_chunks') as mock_write_chunks:
+            with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+                self.assertIsNotNone(DiskCachedContent.create_from_stream(content))
+        self.assertFalse(mock_write_chunks.called)
+        self.assertTrue(stream.closed)
+
+    def test_stream_closed_after_write(self):
+        stream = StringIO(self.DATA)
+        content = StaticContentStream(
+            self.location, 'large.bin', 'application/octet-stream', stream,
+            length=len(self.DATA), content_digest=FAKE_MD5_HASH,
+        )
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            self.assertIsNotNone(DiskCachedContent.create_from_stream(content))
+        self.assertTrue(stream.closed)
+
+    def test_disabled(self):
+        content = StaticContentStream(
+            self.location, 'large.bin', 'application/octet-stream', StringIO(self.DATA),
+            length=len(self.DATA), content_digest=FAKE_MD5_HASH,
+        )
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=None):
+            self.assertIsNone(DiskCachedContent.create_from_stream(content))
+
+    @ddt.data(None, '../escape')
+    def test_invalid_digest(self, content_digest):
+        self.assertIsNone(self._create_from_stream(content_digest=content_digest))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_larger_than_max_size(self):
+        with override_settings(CONTENTSERVER_DISK_CACHE_MAX_SIZE=len(self.DATA) - 1):
+            self.assertIsNone(self._create_from_stream())
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_mark_used(self):
+        self._create_from_stream()
+        chunks_dir = os.path.join(self.cache_dir, FAKE_MD5_HASH)
+        os.utime(chunks_dir, (1000, 1000))
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            self._create_from_stream().mark_used()
+        self.assertGreater(os.path.getmtime(chunks_dir), 1000)
+
+    def test_marked_used_while_streamed(self):
+        content = self._create_from_stream()
+        chunks_dir = os.path.join(self.cache_dir, FAKE_MD5_HASH)
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            data = content.stream_data()
+            next(data)
+            os.utime(chunks_dir, (1000, 1000))
+            next(data)
+        self.assertGreater(os.path.getmtime(chunks_dir), 1000)
+
+    def _create_cache_dir(self, dir_name, size, last_used):
+        """
+        Creates a directory of the disk cache holding size bytes, last used at
+        the given time.
+        """
+        dir_path = os.path.join(self.cache_dir, dir_name)
+        os.mkdir(dir_path)
+        with open(os.path.join(dir_path, '0'), 'wb') as chunk_file:
+            chunk_file.write('x' * size)
+        os.utime(dir_path, (last_used, last_used))
+
+    def test_prune_disk_cache(self):
+        now = time.time()
+        self._create_cache_dir('oldest', 400, now - 3000)
+        self._create_cache_dir('older', 300, now - 2000)
+        self._create_cache_dir('recent', 300, now - 1000)
+        self._create_cache_dir('newest', 200, now)
+        self._create_cache_dir('.tmp-failed', 100, now - 2 * 60 * 60)
+        self._create_cache_dir('.tmp-writing', 100, now)
+
+        prune_disk_cache(self.cache_dir, 600)
+        self.assertItemsEqual(os.listdir(self.cache_dir), ['recent', 'newest', '.tmp-writing'])
+
+        # The newest asset may still be streamed, so it is kept.
+        prune_disk_cache(self.cache_dir, 0)
+        self.assertItemsEqual(os.listdir(self.cache_dir), ['newest', '.tmp-writing'])
+
+    def test_pruned_after_write(self):
+        self._create_cache_dir('old', 500, time.time() - 1000)
+        with override_settings(CONTENTSERVER_DISK_CACHE_MAX_SIZE=len(self.DATA)):
+            content = self._create_from_stream()
+        self.assertEqual(os.listdir(self.cache_dir), [FAKE_MD5_HASH])
+        with override_settings(CONTENTSERVER_DISK_CACHE_DIR=self.cache_dir):
+            self.assertTrue(content.is_on_disk())
+
+
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
     """
@@ -5,10 +5,12 @@ from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
 
+from openedx.core.lib.cache_utils import memoized
 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 
 from opaque_keys.edx.locator import AssetLocator
 
@@ -32,6 +34,28 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@memoized
+def _compiled_url_replace_regex(prefix):
+    """
+    Returns the compiled `_url_replace_regex` of the given prefix.
+
+    Patterns are compiled once per process, rather than formatted and
+    looked up in the `re` module's cache on every substitution.
+    """
+    return re.compile(_url_replace_regex(prefix))
+
+
+def _static_url_prefix(data_dir):
+    """
+    Returns the prefix of the static urls to replace: urls under STATIC_URL
+    or /static/, but not under the given data directory.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -73,7 +97,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -93,7 +117,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -106,31 +130,32 @@ def process_static_urls(text, replacement_function, data_dir=None):
         Unwraps a match group for the captures specified in _url_replace_regex
         and forward them on as function arguments
         """
-        original = match.group(0)
-        prefix = match.group('prefix')
-        quote = match.group('quote')
-        rest = match.group('rest')
+        return _replace_static_url_match(match, replacement_function)
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
 
-        starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
-            return original
 
-        return replacement_function(original, prefix, quote, rest)
+def _replace_static_url_match(match, replacement_function):
+    """
+    Runs the given replacement function on the static url matched by
+    `match`, unless it is an XBlock resource link.
+    """
+    original = match.group(0)
+    prefix = match.group('prefix')
+    quote = match.group('quote')
+    rest = match.group('rest')
+
+    # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
+    # works for actual static assets and for magical course asset URLs....
+    full_url = prefix + rest
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        return original
+
+    return replacement_function(original, prefix, quote, rest)
 
 
 def make_static_urls_absolute(request, html):
@@ -162,6 +187,29 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    return process_static_urls(
+        text,
+        _static_url_replacer(data_directory, course_id, static_asset_path),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path):
+    """
+    Returns the replacement function of `replace_static_urls`, to pass to
+    `process_static_urls`.
+    """
+    # The asset manifest of the course, read on the first url served from the contentstore, so that
+    # all of the urls in the text are resolved without querying the contentstore for each of them.
+    asset_manifests = {}
+
+    def get_asset_manifest():
+        """
+        Returns the asset manifest of the course.
+        """
+        if course_id not in asset_manifests:
+            asset_manifests[course_id] = contentstore().get_asset_manifest(course_id)
+        return asset_manifests[course_id]
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -193,7 +241,9 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
                 # Mongo-backed database
                 base_url = AssetBaseUrlConfig.get_base_url()
                 excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+                url = StaticContent.get_canonicalized_asset_path(
+                    course_id, rest, base_url, excluded_exts, asset_manifest=get_asset_manifest()
+                )
 
                 if AssetLocator.CANONICAL_NAMESPACE in url:
                     url = url.replace('block@', 'block/', 1)
@@ -215,4 +265,41 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
+
+
+def replace_all_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Replace the urls of the given text as `replace_static_urls` would,
+    followed by `replace_course_urls` if course_id is given, and
+    `replace_jump_to_id_urls` if jump_to_id_base_url is given too, but in a
+    single scan of the text with one compiled pattern.
+
+    The three kinds of urls can't be produced by each other's replacements,
+    so this is equivalent to applying the three functions in turn, except
+    for urls overlapping another url's quotes, which are only replaced once.
+    """
+    data_dir = static_asset_path or data_directory
+    prefixes = [u'(?P<static>{})'.format(_static_url_prefix(data_dir))]
+    if course_id:
+        prefixes.append(u'(?P<course>/course/)')
+        if jump_to_id_base_url:
+            prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
+
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path)
+    course_url_prefix = u'/courses/' + course_id.to_deprecated_string() + u'/' if course_id else None
+
+    def replace_url(match):
+        """
+        Replace a single matched url, according to its kind.
+        """
+        if match.group('static') is not None:
+            return _replace_static_url_match(match, replace_static_url)
+
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if match.group('course') is not None:
+            return "".join([quote, course_url_prefix, rest, quote])
+        return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    return _compiled_url_replace_regex(u'|'.join(prefixes)).sub(replace_url, text)
@@ -3,6 +3,8 @@
 
 import ddt
 import re
+import timeit
+import unittest
 
 from django.test import override_settings
 from django.utils.http import urlquote, urlencode
@@ -13,10 +15,13 @@ from nose.tools import assert_equals, assert_true, assert_false  # pylint: disab
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_all_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
 )
+from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from mock import patch, Mock
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.contentstore.content import StaticContent
@@ -33,6 +38,7 @@ from xmodule.assetstore.assetmgr import AssetManager
 DATA_DIRECTORY = 'data_dir'
 COURSE_KEY = SlashSeparatedCourseKey('org', 'course', 'run')
 STATIC_SOURCE = '"/static/file.png"'
+JUMP_TO_ID_BASE_URL = '/courses/org/course/run/jump_to_id/'
 
 
 def encode_unicode_characters_in_url(url):
@@ -114,10 +120,12 @@ def test_storage_url_not_exists(mock_storage):
 
 
 @patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.contentstore', autospec=True)
 @patch('static_replace.modulestore', autospec=True)
 @patch('static_replace.AssetBaseUrlConfig.get_base_url')
 @patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions')
-def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_static_content):
+def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_contentstore,
+                         mock_static_content):
 
     mock_modulestore.return_value = Mock(MongoModuleStore)
     mock_static_content.get_canonicalized_asset_path.return_value = "c4x://mock_url"
@@ -133,7 +141,10 @@ def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_m
         replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, course_id=COURSE_KEY)
     )
 
-    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', u'', ['foobar'])
+    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(
+        COURSE_KEY, 'file.png', u'', ['foobar'], asset_manifest=mock_contentstore().get_asset_manifest.return_value
+    )
+    mock_contentstore().get_asset_manifest.assert_called_once_with(COURSE_KEY)
 
 
 @patch('static_replace.settings', autospec=True)
@@ -197,6 +208,146 @@ def test_regex():
         assert_false(re.match(regex, s))
 
 
+def all_urls_source(count):
+    """
+    Returns the html of `count` verticals, each with static, course and
+    jump_to_id urls among some text.
+    """
+    return u''.join(
+        u'<div class="vert_{index}"><p>{text}</p><img src="/static/images/image_{index}.png"/>'
+        u'<script src="/static/js/file.js"></script><a href="/static/file.pdf?raw">raw</a>'
+        u'<script src="/static/xblock/resources/file.js"></script><a href="/course/info">info</a>'
+        u'<a href=\'/jump_to_id/block_{index}\'>block</a><p>{text}</p></div>'.format(
+            index=index,
+            text=u'Lorem ipsum dolor sit amet. ' * 50
+        )
+        for index in range(count)
+    )
+
+
+def replace_urls_in_turn(text, data_directory=None, course_id=None, jump_to_id_base_url=None):
+    """
+    Replaces the urls of text as replace_all_urls does, one kind of url after
+    the other.
+    """
+    text = replace_static_urls(text, data_directory, course_id)
+    if course_id:
+        text = replace_course_urls(text, course_id)
+        if jump_to_id_base_url:
+            text = replace_jump_to_id_urls(text, course_id, jump_to_id_base_url)
+    return text
+
+
+class StubStaticfilesStorage(object):
+    """
+    Storage in which only js/file.js exists.
+    """
+    @staticmethod
+    def exists(path):  # pylint: disable=missing-docstring
+        return path == 'js/file.js'
+
+    @staticmethod
+    def url(path):  # pylint: disable=missing-docstring
+        return '/static/' + path.replace('.', '.0123456789ab.')
+
+
+class StubStaticContent(object):
+    """
+    StaticContent canonicalizing all paths as c4x asset urls.
+    """
+    @staticmethod
+    def get_canonicalized_asset_path(course_key, path, *args, **kwargs):  # pylint: disable=missing-docstring, unused-argument
+        return '/c4x/org/course/asset/' + path
+
+
+@ddt.ddt
+@patch('static_replace.staticfiles_storage', StubStaticfilesStorage)
+@patch('static_replace.StaticContent', StubStaticContent)
+@patch('static_replace.contentstore', Mock())
+@patch('static_replace.AssetBaseUrlConfig.get_base_url', Mock(return_value=u''))
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', Mock(return_value=[]))
+class ReplaceAllUrlsTest(unittest.TestCase):
+    """
+    Tests for replace_all_urls.
+    """
+    @ddt.data(
+        (None, None),
+        (COURSE_KEY, None),
+        (COURSE_KEY, JUMP_TO_ID_BASE_URL),
+    )
+    @ddt.unpack
+    def test_same_as_in_turn(self, course_id, jump_to_id_base_url):
+        text = all_urls_source(2) + u'"/static/{0}/file.png" "/not-static/file.png" "/static/file.png'.format(
+            DATA_DIRECTORY
+        )
+        self.assertEqual(
+            replace_all_urls(text, DATA_DIRECTORY, course_id, jump_to_id_base_url=jump_to_id_base_url),
+            replace_urls_in_turn(text, DATA_DIRECTORY, course_id, jump_to_id_base_url=jump_to_id_base_url)
+        )
+
+    def test_replaced_urls(self):
+        replaced_text = replace_all_urls(
+            all_urls_source(1), DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url=JUMP_TO_ID_BASE_URL
+        )
+        for url in [
+                '"/c4x/org/course/asset/images/image_0.png"',
+                '"/static/js/file.0123456789ab.js"',
+                '"/static/file.pdf?raw"',
+                '"/static/xblock/resources/file.js"',
+                '"/courses/org/course/run/info"',
+                "'/courses/org/course/run/jump_to_id/block_0'",
+        ]:
+            self.assertIn(url, replaced_text)
+
+    @ddt.data(
+        (None, None),
+        (COURSE_KEY, None),
+        (COURSE_KEY, JUMP_TO_ID_BASE_URL),
+    )
+    @ddt.unpack
+    def test_same_as_in_turn_on_varied_text(self, course_id, jump_to_id_base_url):
+        for text in [
+                u'',
+                u'No urls at all.',
+                u"<img src='/static/images/single_quoted.png'/>",
+                u'<a href="/static/js/file.js">"/static/js/file.js"</a>',
+                u'"/static/file.png""/course/info""/jump_to_id/block"',
+                u'"/static/{0}/file.png" "/static/{0}" "/static/{0}x/file.png"'.format(DATA_DIRECTORY),
+                u'"/static/xblock/resources/file.js" "/static/file.js?xblock/resources/"',
+                u'"/static/file.pdf?raw" "/static/video.mp4?start=1&src=/static/subs.srt"',
+                u'"/course/info?next=/static/file.png" "/jump_to_id/block?next=/course/info"',
+                u'"/courses/org/course/run/info" "/static/" "/course/" "/jump_to_id/"',
+                u'"/static/ünïcödé fïlé.png" \'/course/ünïcödé\' "/jump_to_id/blöck"',
+                u'"/static/file.png "/static/unterminated.png \'/course/info"',
+                u'url(/static/unquoted.png) &quot;/static/escaped.png&quot;',
+                all_urls_source(3),
+        ]:
+            self.assertEqual(
+                replace_all_urls(text, DATA_DIRECTORY, course_id, jump_to_id_base_url=jump_to_id_base_url),
+                replace_urls_in_turn(text, DATA_DIRECTORY, course_id, jump_to_id_base_url=jump_to_id_base_url),
+                text
+            )
+
+    def test_benchmark(self):
+        """
+        Checks that replacing the urls of the html of a 30-vertical sequence
+        in a single pass is faster than applying the three functions in turn.
+        """
+        text = all_urls_source(30)
+        timings = {}
+        for name, replace in [
+                ('in turn', replace_urls_in_turn),
+                ('all at once', replace_all_urls),
+        ]:
+            timings[name] = min(timeit.repeat(
+                lambda: replace(text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url=JUMP_TO_ID_BASE_URL),  # pylint: disable=cell-var-from-loop
+                number=10,
+                repeat=3
+            ))
+            print 'Replaced the urls of {} characters {}: {:.2f}ms per call'.format(len(text), name, timings[name] * 100)
+        self.assertLess(timings['all at once'], timings['in turn'])
+
+
 @patch('static_replace.staticfiles_storage', autospec=True)
 @patch('static_replace.modulestore', autospec=True)
 def test_static_url_with_xblock_resource(mock_modulestore, mock_storage):
@@ -768,3 +919,63 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             print expected
             print asset_path
             self.assertIsNotNone(re.match(expected, asset_path))
+
+    @ddt.data(
+        (u'', u'{prfx}_ünlöck.png'),
+        (u'dev', u'{prfx}_ünlöck.png'),
+        (u'dev', u'{prfx}_lock.png'),
+        (u'dev', u'special/weird {prfx}_ünlöck.png'),
+        (u'dev', u'{prfx}_excluded.html'),
+        (u'dev', u'{prfx}_not_excluded.htm'),
+        (u'dev', u'{prfx}_missing.png'),
+        (u'dev', u'{prfx}_ünlöck.png?foo=/static/{prfx}_lock.png'),
+    )
+    @ddt.unpack
+    def test_canonical_asset_path_with_asset_manifest(self, base_url, start):
+        exts = ['.html', '.tm']
+        for prefix in ('split', 'old'):
+            course_key = self.courses[prefix].id
+            path = start.format(prfx=prefix)
+            with check_mongo_calls(1):
+                asset_manifest = contentstore().get_asset_manifest(course_key)
+            with check_mongo_calls(0):
+                asset_path = StaticContent.get_canonicalized_asset_path(
+                    course_key, path, base_url, exts, asset_manifest=asset_manifest
+                )
+            self.assertEqual(asset_path, StaticContent.get_canonicalized_asset_path(course_key, path, base_url, exts))
+
+    @ddt.data('split', 'old')
+    def test_replace_static_urls_with_one_query(self, prefix):
+        course_key = self.courses[prefix].id
+        names = [
+            name.format(prefix)
+            for name in [u'{}_ünlöck.png', u'{}_lock.png', u'special/{}_lock.png', u'{}_missing.png']
+        ]
+        text = u' '.join(u'"/static/{}"'.format(name) for name in names)
+
+        with check_mongo_calls(1):
+            replaced_text = replace_static_urls(text, course_id=course_key)
+
+        for name in names:
+            self.assertIn(
+                StaticContent.get_canonicalized_asset_path(
+                    course_key,
+                    name,
+                    AssetBaseUrlConfig.get_base_url(),
+                    AssetExcludedExtensionsConfig.get_excluded_extensions()
+                ).replace('block@', 'block/', 1),
+                replaced_text
+            )
+
+    @ddt.data('split', 'old')
+    def test_replace_static_urls_with_oversized_asset_manifest(self, prefix):
+        course_key = self.courses[prefix].id
+        text = u' '.join(
+            u'"/static/{}"'.format(name.format(prefix))
+            for name in [u'{}_ünlöck.png', u'{}_lock.png', u'special/{}_lock.png', u'{}_missing.png']
+        )
+        replaced_text = replace_static_urls(text, course_id=course_key)
+
+        with override_settings(ASSET_MANIFEST_CACHE_TIMEOUT=60, ASSET_MANIFEST_CACHE_MAX_SIZE=1):
+            self.assertIsNone(contentstore().get_asset_manifest(course_key))
+            self.assertEqual(replace_static_urls(text, course_id=course_key), replaced_text)
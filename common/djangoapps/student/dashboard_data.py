@@ -0,0 +1,105 @@
+"""
+Data for the student dashboard, prefetched for all of a user's enrollments.
+"""
+from collections import defaultdict
+
+from certificates.models import GeneratedCertificate, certificate_status
+from course_modes.models import CourseMode
+from shoppingcart.models import CourseRegistrationCode
+from student.models import CourseEnrollmentAttribute
+
+
+class DashboardData(object):
+    """
+    The per-enrollment data shown on a user's dashboard, prefetched for all of
+    the given enrollments with one query per data type: course modes,
+    certificates, enrollment attributes and redeemed registration codes.
+
+    The dashboard view is served from this data instead of querying each of
+    the user's courses separately.
+    """
+    def __init__(self, user, course_enrollments):
+        self.user = user
+        course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(course_ids)
+        self.course_modes_by_course = {
+            course_id: {
+                mode.slug: mode
+                for mode in modes
+            }
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+        self._selectable_modes_by_course = {
+            course_id: [
+                mode for mode in modes
+                if mode.slug not in CourseMode.CREDIT_MODES
+            ] or [CourseMode.DEFAULT_MODE]
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+
+        self._certificates = {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(user=user, course_id__in=course_ids)
+        }
+
+        self._attributes_by_enrollment = defaultdict(list)
+        for attribute in CourseEnrollmentAttribute.objects.filter(enrollment__in=course_enrollments):
+            self._attributes_by_enrollment[attribute.enrollment_id].append(attribute)
+
+        self._registration_codes_by_course = defaultdict(list)
+        registration_codes = CourseRegistrationCode.objects.filter(
+            course_id__in=course_ids,
+            registrationcoderedemption__redeemed_by=user
+        ).select_related('invoice_item__invoice')
+        for registration_code in registration_codes:
+            self._registration_codes_by_course[registration_code.course_id].append(registration_code)
+
+    def certificate_status(self, course_id):
+        """
+        Returns the user's certificate status in the given course, as returned
+        by `certificate_status_for_student`.
+        """
+        return certificate_status(
+            self._certificates.get(course_id),
+            course_modes=self._selectable_modes_by_course[course_id]
+        )
+
+    def is_refundable(self, enrollment):
+        """
+        Returns whether the given enrollment is refundable, as returned by
+        `CourseEnrollment.refundable`.
+        """
+        return enrollment.refundable(
+            user_already_has_certs_for=self._certificates,
+            modes=self._selectable_modes_by_course[enrollment.course_id],
+            attributes=self._attributes_by_enrollment[enrollment.id],
+        )
+
+    def is_paid_course(self, enrollment):
+        """
+        Returns whether the course of the given enrollment is paid, as returned
+        by `CourseEnrollment.is_paid_course`.
+        """
+        return enrollment.is_paid_course(
+            modes_dict=CourseMode.modes_for_course_dict(
+                enrollment.course_id,
+                modes=self._selectable_modes_by_course[enrollment.course_id]
+            )
+        )
+
+    def enrollment_attribute(self, enrollment, namespace, name):
+        """
+        Returns the value of the given attribute of the given enrollment, or
+        None if it is not set.
+        """
+        for attribute in self._attributes_by_enrollment[enrollment.id]:
+            if attribute.namespace == namespace and attribute.name == name:
+                return attribute.value
+        return None
+
+    def redeemed_registration_codes(self, course_id):
+        """
+        Returns the registration codes of the given course redeemed by the user.
+        """
+        return self._registration_codes_by_course[course_id]
@@ -22,6 +22,7 @@ from urllib import urlencode
 import uuid
 
 import analytics
+import crum
 
 from config_models.models import ConfigurationModel
 from django.utils.translation import ugettext_lazy as _
@@ -44,6 +45,7 @@ from model_utils.models import TimeStampedModel
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from simple_history.models import HistoricalRecords
+import request_cache
 from track import contexts
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 
@@ -1007,6 +1009,10 @@ class CourseEnrollment(models.Model):
     # cache key format e.g enrollment.<username>.<course_key>.mode = 'honor'
     COURSE_ENROLLMENT_CACHE_KEY = u"enrollment.{}.{}.mode"
 
+    # cache key format e.g enrollment.<user_id>.all = {<course_key>: <enrollment>}
+    USER_ENROLLMENTS_CACHE_KEY = u"enrollment.{}.all"
+    USER_ENROLLMENTS_REQUEST_CACHE_NAME = 'student.enrollments'
+
     class Meta(object):
         unique_together = (('user', 'course_id'),)
         ordering = ('user', 'course_id')
@@ -1074,13 +1080,49 @@ class CourseEnrollment(models.Model):
         Returns:
             Course enrollment object or None
         """
-        try:
-            return cls.objects.get(
-                user=user,
-                course_id=course_key
-            )
-        except cls.DoesNotExist:
-            return None
+        if hasattr(course_key, 'version_agnostic') and hasattr(course_key, 'for_branch'):
+            # Course keys are stored without their branch and version.
+            course_key = course_key.for_branch(None).version_agnostic()
+        return cls._enrollments_by_course(user).get(course_key)
+
+    @classmethod
+    def _enrollments_by_course(cls, user):
+        """
+        Returns a dict of all the enrollments of the given user, active or not,
+        keyed by course key, loaded with a single query.
+
+        Within a request, the dict is memoized in the request cache if
+        COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED is set.  It is also kept in the
+        shared cache for COURSE_ENROLLMENT_CACHE_TIMEOUT seconds.  Both are
+        invalidated by `invalidate_enrollment_mode_cache` whenever one of the
+        user's enrollments is saved or deleted.
+        """
+        if user.id is None:
+            return {}
+
+        use_request_cache = (
+            getattr(settings, 'COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED', True) and
+            crum.get_current_request() is not None
+        )
+        if use_request_cache:
+            enrollments_by_user = request_cache.get_cache(cls.USER_ENROLLMENTS_REQUEST_CACHE_NAME)
+            if user.id in enrollments_by_user:
+                return enrollments_by_user[user.id]
+
+        cache_key = cls.USER_ENROLLMENTS_CACHE_KEY.format(user.id)
+        cache_timeout = getattr(settings, 'COURSE_ENROLLMENT_CACHE_TIMEOUT', 60)
+        enrollments = cache.get(cache_key) if cache_timeout else None
+        if enrollments is None:
+            enrollments = {
+                enrollment.course_id: enrollment
+                for enrollment in cls.objects.filter(user_id=user.id)
+            }
+            if cache_timeout:
+                cache.set(cache_key, enrollments, cache_timeout)
+
+        if use_request_cache:
+            enrollments_by_user[user.id] = enrollments
+        return enrollments
 
     @classmethod
     def is_enrollment_closed(cls, user, course):
@@ -1389,11 +1431,8 @@ class CourseEnrollment(models.Model):
         if not user.is_authenticated():
             return False
 
-        try:
-            record = cls.objects.get(user=user, course_id=course_key)
-            return record.is_active
-        except cls.DoesNotExist:
-            return False
+        record = cls.get_enrollment(user, course_key)
+        return record is not None and record.is_active
 
     @classmethod
     def is_enrolled_by_partial(cls, user, course_id_partial):
@@ -1435,21 +1474,24 @@ class CourseEnrollment(models.Model):
             and is_active is whether the enrollment is active.
         Returns (None, None) if the courseenrollment record does not exist.
         """
-        try:
-            record = cls.objects.get(user=user, course_id=course_id)
-            return (record.mode, record.is_active)
-        except cls.DoesNotExist:
+        record = cls.get_enrollment(user, course_id)
+        if record is None:
             return (None, None)
+        return (record.mode, record.is_active)
 
     @classmethod
     def enrollments_for_user(cls, user):
         return cls.objects.filter(user=user, is_active=1)
 
-    def is_paid_course(self):
+    def is_paid_course(self, modes_dict=None):
         """
         Returns True, if course is paid
+
+        Keyword Args:
+            modes_dict (dict): If provided, use these course modes.
+                Useful for avoiding unnecessary database queries.
         """
-        paid_course = CourseMode.is_white_label(self.course_id)
+        paid_course = CourseMode.is_white_label(self.course_id, modes_dict=modes_dict)
         if paid_course or CourseMode.is_professional_slug(self.mode):
             return True
 
@@ -1469,10 +1511,21 @@ class CourseEnrollment(models.Model):
         """Changes this `CourseEnrollment` record's mode to `mode`.  Saves immediately."""
         self.update_enrollment(mode=mode)
 
-    def refundable(self):
+    def refundable(self, user_already_has_certs_for=None, modes=None, attributes=None):
         """
         For paid/verified certificates, students may receive a refund if they have
         a verified certificate and the deadline for refunds has not yet passed.
+
+        The keyword arguments can be used to avoid database queries when
+        checking many enrollments of a user at once.
+
+        Keyword Args:
+            user_already_has_certs_for (set): If provided, the ids of all the
+                courses in which the user has a certificate.
+            modes (list of `Mode`): If provided, the non-expired course modes
+                of the course, as returned by `CourseMode.modes_for_course`.
+            attributes (list of `CourseEnrollmentAttribute`): If provided, all
+                the attributes of this enrollment.
         """
         # In order to support manual refunds past the deadline, set can_refund on this object.
         # On unenrolling, the "UNENROLL_DONE" signal calls CertificateItem.refund_cert_callback(),
@@ -1483,26 +1536,46 @@ class CourseEnrollment(models.Model):
             return True
 
         # If the student has already been given a certificate they should not be refunded
-        if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+        if user_already_has_certs_for is None:
+            if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+                return False
+        elif self.course_id in user_already_has_certs_for:
             return False
 
         # If it is after the refundable cutoff date they should not be refunded.
-        refund_cutoff_date = self.refund_cutoff_date()
+        refund_cutoff_date = self.refund_cutoff_date(attributes=attributes)
         if refund_cutoff_date and datetime.now(UTC) > refund_cutoff_date:
             return False
 
-        course_mode = CourseMode.mode_for_course(self.course_id, 'verified')
+        course_mode = CourseMode.mode_for_course(self.course_id, 'verified', modes=modes)
         if course_mode is None:
             return False
         else:
             return True
 
-    def refund_cutoff_date(self):
-        """ Calculate and return the refund window end date. """
-        try:
-            attribute = self.attributes.get(namespace='order', name='order_number')
-        except ObjectDoesNotExist:
-            return None
+    def refund_cutoff_date(self, attributes=None):
+        """
+        Calculate and return the refund window end date.
+
+        Keyword Args:
+            attributes (list of `CourseEnrollmentAttribute`): If provided, search
+                these attributes of this enrollment for the order number.
+        """
+        if attributes is None:
+            try:
+                attribute = self.attributes.get(namespace='order', name='order_number')
+            except ObjectDoesNotExist:
+                return None
+        else:
+            attribute = next(
+                (
+                    attribute for attribute in attributes
+                    if attribute.namespace == 'order' and attribute.name == 'order_number'
+                ),
+                None
+            )
+            if attribute is None:
+                return None
 
         order_number = attribute.value
         order = ecommerce_api_client(self.user).orders(order_number).get()
@@ -1595,6 +1668,10 @@ def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: dis
     )
     cache.delete(cache_key)
 
+    # Also invalidate all the cached enrollments of the user.
+    request_cache.get_cache(CourseEnrollment.USER_ENROLLMENTS_REQUEST_CACHE_NAME).pop(instance.user_id, None)
+    cache.delete(CourseEnrollment.USER_ENROLLMENTS_CACHE_KEY.format(instance.user_id))
+
 
 class ManualEnrollmentAudit(models.Model):
     """
@@ -0,0 +1,84 @@
+"""
+Tests for the prefetched student dashboard data.
+"""
+import unittest
+
+from django.conf import settings
+
+from course_modes.tests.factories import CourseModeFactory
+from student.dashboard_data import DashboardData
+from student.models import CourseEnrollment, CourseEnrollmentAttribute
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+# These imports refer to lms djangoapps.
+# Their testcases are only run under lms.
+from certificates.models import CertificateStatuses, certificate_status_for_student  # pylint: disable=import-error
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+
+
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+class DashboardDataTest(SharedModuleStoreTestCase):
+    """
+    Tests for DashboardData.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(DashboardDataTest, cls).setUpClass()
+        cls.courses = [CourseFactory.create() for __ in range(3)]
+
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory.create()
+        for course in self.courses[:2]:
+            CourseModeFactory.create(course_id=course.id, mode_slug='verified')
+        CourseModeFactory.create(course_id=self.courses[2].id, mode_slug='honor', min_price=10)
+        self.enrollments = [
+            CourseEnrollment.enroll(self.user, self.courses[0].id, mode='verified'),
+            CourseEnrollment.enroll(self.user, self.courses[1].id, mode='verified'),
+            CourseEnrollment.enroll(self.user, self.courses[2].id, mode='honor'),
+        ]
+        GeneratedCertificateFactory.create(
+            user=self.user,
+            course_id=self.courses[0].id,
+            status=CertificateStatuses.downloadable,
+            mode='verified',
+            download_url='http://www.example.com/certificate.pdf',
+            grade='0.95',
+        )
+        CourseEnrollmentAttribute.objects.create(
+            enrollment=self.enrollments[1], namespace='credit', name='provider_id', value='hogwarts'
+        )
+
+    def test_one_query_per_data_type(self):
+        # Course modes, certificates, enrollment attributes and registration codes.
+        with self.assertNumQueries(4):
+            DashboardData(self.user, self.enrollments)
+
+    def test_matches_enrollment_data(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        with self.assertNumQueries(0):
+            certificate_statuses = [
+                dashboard_data.certificate_status(enrollment.course_id) for enrollment in self.enrollments
+            ]
+            refundable = [dashboard_data.is_refundable(enrollment) for enrollment in self.enrollments]
+            paid = [dashboard_data.is_paid_course(enrollment) for enrollment in self.enrollments]
+
+        self.assertEqual(
+            certificate_statuses,
+            [certificate_status_for_student(self.user, enrollment.course_id) for enrollment in self.enrollments]
+        )
+        self.assertEqual(refundable, [enrollment.refundable() for enrollment in self.enrollments])
+        self.assertEqual(refundable, [False, True, False])
+        self.assertEqual(paid, [enrollment.is_paid_course() for enrollment in self.enrollments])
+        self.assertEqual(paid, [False, False, True])
+
+    def test_enrollment_attribute(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        self.assertEqual(dashboard_data.enrollment_attribute(self.enrollments[1], 'credit', 'provider_id'), 'hogwarts')
+        self.assertIsNone(dashboard_data.enrollment_attribute(self.enrollments[0], 'credit', 'provider_id'))
+
+    def test_no_redeemed_registration_codes(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+        self.assertEqual(dashboard_data.redeemed_registration_codes(self.courses[0].id), [])
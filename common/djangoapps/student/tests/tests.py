@@ -8,6 +8,7 @@ import ddt
 from datetime import datetime, timedelta
 from urlparse import urljoin
 
+import crum
 import pytz
 from markupsafe import escape
 from mock import Mock, patch
@@ -19,7 +20,8 @@ from django.conf import settings
 from django.contrib.auth.models import User, AnonymousUser
 from django.core.urlresolvers import reverse
 from django.test import TestCase
-from django.test.client import Client
+from django.test.client import Client, RequestFactory
+from django.test.utils import override_settings
 
 from course_modes.models import CourseMode
 from student.models import (
@@ -37,6 +39,8 @@ from util.testing import EventTestMixin
 from util.model_utils import USER_SETTINGS_CHANGED_EVENT_NAME
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, ModuleStoreEnum
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from request_cache.middleware import RequestCache
 
 # These imports refer to lms djangoapps.
 # Their testcases are only run under lms.
@@ -770,6 +774,66 @@ class EnrollInCourseTest(EnrollmentEventTestMixin, TestCase):
         self.assert_enrollment_mode_change_event_was_emitted(user, course_id, "audit")
 
 
+@override_settings(COURSE_ENROLLMENT_CACHE_TIMEOUT=60, COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED=True)
+class EnrollmentCacheTest(CacheIsolationTestCase):
+    """
+    Tests of the cached enrollment lookups of CourseEnrollment.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(EnrollmentCacheTest, self).setUp()
+        self.user = UserFactory.create()
+        self.course_ids = [SlashSeparatedCourseKey("edX", "Test{}".format(index), "2013") for index in range(3)]
+        CourseEnrollment.enroll(self.user, self.course_ids[0], "verified")
+        CourseEnrollment.enroll(self.user, self.course_ids[1], "honor")
+        CourseEnrollment.unenroll(self.user, self.course_ids[1])
+
+        crum.set_current_request(RequestFactory().get('/'))
+        self.addCleanup(crum.set_current_request, None)
+        self.clear_caches()
+
+    def assert_lookups(self):
+        """
+        Asserts the results of all the enrollment lookups of the user.
+        """
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_ids[0]))
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_ids[1]))
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_ids[2]))
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_ids[0]), ("verified", True))
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_ids[1]), ("honor", False))
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_ids[2]), (None, None))
+        self.assertIsNone(CourseEnrollment.get_enrollment(self.user, self.course_ids[2]))
+
+    def test_one_query_per_user(self):
+        with self.assertNumQueries(1):
+            self.assert_lookups()
+
+    def test_shared_cache(self):
+        self.assert_lookups()
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assert_lookups()
+
+    def test_outside_of_request(self):
+        crum.set_current_request(None)
+        with self.assertNumQueries(1):
+            self.assert_lookups()
+        self.assertEqual(RequestCache.get_request_cache(CourseEnrollment.USER_ENROLLMENTS_REQUEST_CACHE_NAME), {})
+
+    def test_invalidated_on_save(self):
+        self.assert_lookups()
+        CourseEnrollment.enroll(self.user, self.course_ids[2], "audit")
+        CourseEnrollment.unenroll(self.user, self.course_ids[0])
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_ids[0]))
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_ids[2]), ("audit", True))
+
+    def test_invalidated_on_delete(self):
+        self.assert_lookups()
+        CourseEnrollment.get_enrollment(self.user, self.course_ids[0]).delete()
+        self.assertIsNone(CourseEnrollment.get_enrollment(self.user, self.course_ids[0]))
+
+
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class ChangeEnrollmentViewTest(ModuleStoreTestCase):
     """Tests the student.views.change_enrollment view"""
@@ -50,7 +50,7 @@ from course_modes.models import CourseMode
 from shoppingcart.api import order_history
 from student.models import (
     Registration, UserProfile,
-    PendingEmailChange, CourseEnrollment, CourseEnrollmentAttribute, unique_id_for_user,
+    PendingEmailChange, CourseEnrollment, unique_id_for_user,
     CourseEnrollmentAllowed, UserStanding, LoginFailures,
     create_comments_service_user, PasswordHistory, UserSignupSource,
     DashboardConfiguration, LinkedInAddToProfileConfiguration, ManualEnrollmentAudit, ALLOWEDTOENROLL_TO_ENROLLED,
@@ -107,8 +107,9 @@ from student.helpers import (
     DISABLE_UNENROLL_CERT_STATES,
 )
 from student.cookies import set_logged_in_cookies, delete_logged_in_cookies
+from student.dashboard_data import DashboardData
 from student.models import anonymous_id_for_user, UserAttribute, EnrollStatusChange
-from shoppingcart.models import DonationConfiguration, CourseRegistrationCode
+from shoppingcart.models import DonationConfiguration
 
 from embargo import api as embargo_api
 
@@ -206,7 +207,7 @@ def process_survey_link(survey_link, user):
     return survey_link.format(UNIQUE_ID=unique_id_for_user(user))
 
 
-def cert_info(user, course_overview, course_mode):
+def cert_info(user, course_overview, course_mode, cert_status=None):
     """
     Get the certificate info needed to render the dashboard section for the given
     student and course.
@@ -215,6 +216,8 @@ def cert_info(user, course_overview, course_mode):
         user (User): A user.
         course_overview (CourseOverview): A course.
         course_mode (str): The enrollment mode (honor, verified, audit, etc.)
+        cert_status (dict): If provided, the status of the user's certificate,
+            as returned by `certificate_status_for_student`.
 
     Returns:
         dict: Empty dict if certificates are disabled or hidden, or a dictionary with keys:
@@ -229,12 +232,9 @@ def cert_info(user, course_overview, course_mode):
     """
     if not course_overview.may_certify():
         return {}
-    return _cert_info(
-        user,
-        course_overview,
-        certificate_status_for_student(user, course_overview.id),
-        course_mode
-    )
+    if cert_status is None:
+        cert_status = certificate_status_for_student(user, course_overview.id)
+    return _cert_info(user, course_overview, cert_status, course_mode)
 
 
 def reverification_info(statuses):
@@ -569,16 +569,10 @@ def dashboard(request):
     # sort the enrollment pairs by the enrollment date
     course_enrollments.sort(key=lambda x: x.created, reverse=True)
 
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
-    course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in unexpired_course_modes.iteritems()
-    }
+    # Retrieve the course modes, certificates, enrollment attributes and
+    # redeemed registration codes of all the courses at once.
+    dashboard_data = DashboardData(user, course_enrollments)
+    course_modes_by_course = dashboard_data.course_modes_by_course
 
     # Check to see if the student has recently enrolled in a course.
     # If so, display a notification message confirming the enrollment.
@@ -641,7 +635,10 @@ def dashboard(request):
     # there is no verification messaging to display.
     verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
     cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
+        enrollment.course_id: cert_info(
+            request.user, enrollment.course_overview, enrollment.mode,
+            dashboard_data.certificate_status(enrollment.course_id)
+        )
         for enrollment in course_enrollments
     }
 
@@ -662,24 +659,21 @@ def dashboard(request):
 
     show_refund_option_for = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.refundable()
+        if dashboard_data.is_refundable(enrollment)
     )
 
     block_courses = frozenset(
         enrollment.course_id for enrollment in course_enrollments
         if is_course_blocked(
             request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
+            dashboard_data.redeemed_registration_codes(enrollment.course_id),
             enrollment.course_id
         )
     )
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
+        if dashboard_data.is_paid_course(enrollment)
     )
 
     # If there are *any* denied reverifications that have not been toggled off,
@@ -718,7 +712,7 @@ def dashboard(request):
         'show_courseware_links_for': show_courseware_links_for,
         'all_course_modes': course_mode_info,
         'cert_statuses': cert_statuses,
-        'credit_statuses': _credit_statuses(user, course_enrollments),
+        'credit_statuses': _credit_statuses(user, course_enrollments, dashboard_data),
         'show_email_settings_for': show_email_settings_for,
         'reverifications': reverifications,
         'verification_status': verification_status,
@@ -853,7 +847,7 @@ def _update_email_opt_in(request, org):
         preferences_api.update_email_opt_in(request.user, org, email_opt_in_boolean)
 
 
-def _credit_statuses(user, course_enrollments):
+def _credit_statuses(user, course_enrollments, dashboard_data):
     """
     Retrieve the status for credit courses.
 
@@ -871,6 +865,7 @@ def _credit_statuses(user, course_enrollments):
         user (User): The currently logged-in user.
         course_enrollments (list[CourseEnrollment]): List of enrollments for the
             user.
+        dashboard_data (DashboardData): The prefetched data of these enrollments.
 
     Returns: dict
 
@@ -887,7 +882,7 @@ def _credit_statuses(user, course_enrollments):
             so the user should contact the support team.
 
     Example:
-    >>> _credit_statuses(user, course_enrollments)
+    >>> _credit_statuses(user, course_enrollments, dashboard_data)
     {
         CourseKey.from_string("edX/DemoX/Demo_Course"): {
             "course_key": "edX/DemoX/Demo_Course",
@@ -921,15 +916,11 @@ def _credit_statuses(user, course_enrollments):
 
     # When a user purchases credit in a course, the user's enrollment
     # mode is set to "credit" and an enrollment attribute is set
-    # with the ID of the credit provider.  We retrieve *all* such attributes
-    # here to minimize the number of database queries.
+    # with the ID of the credit provider.  These attributes are prefetched
+    # with the other enrollment data to minimize the number of database queries.
     purchased_credit_providers = {
-        attribute.enrollment.course_id: attribute.value
-        for attribute in CourseEnrollmentAttribute.objects.filter(
-            namespace="credit",
-            name="provider_id",
-            enrollment__in=credit_enrollments.values()
-        ).select_related("enrollment")
+        course_id: dashboard_data.enrollment_attribute(enrollment, "credit", "provider_id")
+        for course_id, enrollment in credit_enrollments.iteritems()
     }
 
     provider_info_by_id = {
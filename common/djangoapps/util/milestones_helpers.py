@@ -126,6 +126,8 @@ def get_pre_requisite_courses_not_completed(user, enrolled_courses):  # pylint:
         return {}
 
     pre_requisite_courses = {}
+    # Courses often share prerequisites, so load each one's overview only once.
+    required_course_overviews = {}
 
     for course_key in enrolled_courses:
         required_courses = []
@@ -135,7 +137,11 @@ def get_pre_requisite_courses_not_completed(user, enrolled_courses):  # pylint:
                 if key == 'courses' and value:
                     for required_course in value:
                         required_course_key = CourseKey.from_string(required_course)
-                        required_course_overview = CourseOverview.get_from_id(required_course_key)
+                        if required_course_key not in required_course_overviews:
+                            required_course_overviews[required_course_key] = CourseOverview.get_from_id(
+                                required_course_key
+                            )
+                        required_course_overview = required_course_overviews[required_course_key]
                         required_courses.append({
                             'key': required_course_key,
                             'display': get_course_display_string(required_course_overview)
@@ -1,5 +1,9 @@
 import re
+
+from capa.safe_exec import SafeExecCache
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.lru_cache import lru_cache
 
 # We'll make assets named this be importable by Python code in the sandbox.
 PYTHON_LIB_ZIP = "python_lib.zip"
@@ -38,3 +42,19 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+@lru_cache()
+def get_safe_exec_cache():
+    """
+    Return the cache of safe_exec results of this process.
+
+    It is shared by all the problems rendered and checked by this process,
+    and backed by the default cache so that results are shared across
+    processes too.
+    """
+    return SafeExecCache(
+        shared_cache=cache,
+        max_entries=getattr(settings, 'SAFE_EXEC_CACHE_MAX_ENTRIES', 1000),
+        timeout=getattr(settings, 'SAFE_EXEC_CACHE_TIMEOUT', 24 * 60 * 60),
+    )
@@ -4,7 +4,7 @@ Tests for sandboxing.py in util app
 
 from django.test import TestCase
 from opaque_keys.edx.locator import LibraryLocator
-from util.sandboxing import can_execute_unsafe_code
+from util.sandboxing import can_execute_unsafe_code, get_safe_exec_cache
 from django.test.utils import override_settings
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
@@ -37,3 +37,16 @@ class SandboxingTest(TestCase):
         self.assertFalse(can_execute_unsafe_code(SlashSeparatedCourseKey('edX', 'full', '2012_Fall')))
         self.assertFalse(can_execute_unsafe_code(SlashSeparatedCourseKey('edX', 'full', '2013_Spring')))
         self.assertFalse(can_execute_unsafe_code(LibraryLocator('edX', 'test_bank')))
+
+
+class SafeExecCacheTest(TestCase):
+    """
+    Test the safe_exec cache of the process
+    """
+    def test_get_safe_exec_cache(self):
+        """
+        Test that the same cache is shared by all callers
+        """
+        safe_exec_cache = get_safe_exec_cache()
+        self.assertIs(safe_exec_cache, get_safe_exec_cache())
+        self.assertIsNotNone(safe_exec_cache.shared_cache)
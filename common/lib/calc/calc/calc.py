@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -50,6 +53,12 @@ DEFAULT_FUNCTIONS = {
     'arccsch': functions.arccsch,
     'arccoth': functions.arccoth
 }
+# Functions of DEFAULT_FUNCTIONS which can be applied to numpy arrays elementwise. Any other
+# function is applied to each element separately by `batch_evaluator`.
+VECTORIZED_FUNCTIONS = frozenset(
+    func for name, func in DEFAULT_FUNCTIONS.iteritems()
+    if name not in ('fact', 'factorial', 'arccot')
+)
 DEFAULT_VARIABLES = {
     'i': numpy.complex(0, 1),
     'j': numpy.complex(0, 1),
@@ -73,6 +82,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of parse trees kept in memory by `parse_expression`.
+PARSE_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -94,6 +107,16 @@ def lower_dict(input_dict):
 # The following few functions define evaluation actions, which are run on lists
 # of results from each parse component. They convert the strings and (previously
 # calculated) numbers into the number that component represents.
+# Except for `eval_parallel`, they also accept numpy arrays in place of numbers,
+# as used by `batch_evaluator`.
+
+def is_value(token):
+    """
+    Return whether a processed token is a value (e.g. a number or an array of
+    numbers), as opposed to an operator or a parenthesis, which are strings.
+    """
+    return not isinstance(token, basestring)
+
 
 def super_float(text):
     """
@@ -122,7 +145,7 @@ def eval_atom(parse_result):
     In the case of parenthesis, ignore them.
     """
     # Find first number in the list
-    result = next(k for k in parse_result if isinstance(k, numbers.Number))
+    result = next(k for k in parse_result if is_value(k))
     return result
 
 
@@ -136,7 +159,7 @@ def eval_power(parse_result):
     # `reduce` will go from left to right; reverse the list.
     parse_result = reversed(
         [k for k in parse_result
-         if isinstance(k, numbers.Number)]  # Ignore the '^' marks.
+         if is_value(k)]  # Ignore the '^' marks.
     )
     # Having reversed it, raise `b` to the power of `a`.
     power = reduce(lambda a, b: b ** a, parse_result)
@@ -162,6 +185,20 @@ def eval_parallel(parse_result):
     return 1. / sum(reciprocals)
 
 
+def batch_eval_parallel(parse_result):
+    """
+    Like `eval_parallel`, but for inputs which may be numpy arrays.
+
+    Return NaN for each element where there is a zero among the inputs.
+    """
+    values = [e for e in parse_result if is_value(e)]
+    if len(values) == 1:
+        return values[0]
+    has_zero = reduce(numpy.logical_or, [numpy.equal(e, 0) for e in values])
+    reciprocals = [numpy.true_divide(1., e) for e in values]
+    return numpy.where(has_zero, float('nan'), numpy.true_divide(1., sum(reciprocals)))
+
+
 def eval_sum(parse_result):
     """
     Add the inputs, keeping in mind their sign.
@@ -173,12 +210,12 @@ def eval_sum(parse_result):
     total = 0.0
     current_op = operator.add
     for token in parse_result:
-        if token == '+':
+        if is_value(token):
+            total = current_op(total, token)
+        elif token == '+':
             current_op = operator.add
         elif token == '-':
             current_op = operator.sub
-        else:
-            total = current_op(total, token)
     return total
 
 
@@ -191,12 +228,12 @@ def eval_product(parse_result):
     prod = 1.0
     current_op = operator.mul
     for token in parse_result:
-        if token == '*':
+        if is_value(token):
+            prod = current_op(prod, token)
+        elif token == '*':
             current_op = operator.mul
         elif token == '/':
             current_op = operator.truediv
-        else:
-            prod = current_op(prod, token)
     return prod
 
 
@@ -229,8 +266,7 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
         return float('nan')
 
     # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    math_interpreter = parse_expression(math_expr, case_sensitive)
 
     # Get our variables together.
     all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
@@ -258,6 +294,89 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     return math_interpreter.reduce_tree(evaluate_actions)
 
 
+def batch_evaluator(variables, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression for many samples of its variables in one pass.
+
+    Like `evaluator`, except that variables may be passed as numpy arrays
+    of samples (all of the same length), and the result is then an array
+    with the value of the expression for each sample.
+
+    Since the tree is reduced with numpy operations, invalid operations
+    such as dividing by zero don't raise errors, but give NaN or infinite
+    results instead. Callers which need `evaluator`'s error handling should
+    check the results and evaluate the expression again with `evaluator`.
+    """
+    # No need to go further.
+    if math_expr.strip() == "":
+        return float('nan')
+
+    math_interpreter = parse_expression(math_expr, case_sensitive)
+    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+    math_interpreter.check_variables(all_variables, all_functions)
+
+    if case_sensitive:
+        casify = lambda x: x
+    else:
+        casify = lambda x: x.lower()  # Lowercase for case insens.
+
+    def eval_function(parse_result):
+        """
+        Apply a function to its (possibly array) argument, elementwise.
+        """
+        func = all_functions[casify(parse_result[0])]
+        if func not in VECTORIZED_FUNCTIONS:
+            func = numpy.vectorize(func)
+        return func(parse_result[1])
+
+    evaluate_actions = {
+        'number': eval_number,
+        'variable': lambda x: all_variables[casify(x[0])],
+        'function': eval_function,
+        'atom': eval_atom,
+        'power': eval_power,
+        'parallel': batch_eval_parallel,
+        'product': eval_product,
+        'sum': eval_sum
+    }
+
+    with numpy.errstate(all='ignore'):
+        return math_interpreter.reduce_tree(evaluate_actions)
+
+
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return a `ParseAugmenter` holding the parse tree of the given expression.
+
+    Parsing is the most expensive part of evaluating an expression, and the
+    same expressions tend to be evaluated over and over (e.g. for each
+    sample of a FormulaResponse), so the most recently used parse trees are
+    kept in memory, keyed by the expression and its case sensitivity.
+
+    The returned ParseAugmenter is shared, and must not be modified.
+    """
+    key = (math_expr, case_sensitive)
+    with _PARSE_CACHE_LOCK:
+        math_interpreter = _PARSE_CACHE.pop(key, None)
+        if math_interpreter is not None:
+            _PARSE_CACHE[key] = math_interpreter
+            return math_interpreter
+
+    # Parse outside of the lock; invalid expressions raise and are not cached.
+    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+    math_interpreter.parse_algebra()
+
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = math_interpreter
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return math_interpreter
+
+
 class ParseAugmenter(object):
     """
     Holds the data for a particular parse.
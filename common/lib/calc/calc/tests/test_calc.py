@@ -559,3 +559,72 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+    def test_parse_cache(self):
+        """
+        Check that parse trees are reused, per expression and case sensitivity
+        """
+        parsed = calc.parse_expression("2*x + 1")
+        self.assertIs(parsed, calc.parse_expression("2*x + 1"))
+        self.assertIsNot(parsed, calc.parse_expression("2*x + 1", case_sensitive=True))
+        self.assertIsNot(parsed, calc.parse_expression("2*x + 2"))
+        self.assertEqual(calc.evaluator({'x': 3.0}, {}, "2*x + 1"), 7.0)
+        self.assertEqual(calc.evaluator({'x': 4.0}, {}, "2*x + 1"), 9.0)
+
+        with self.assertRaises(ParseException):
+            calc.parse_expression("1 +* 2")
+
+
+class BatchEvaluatorTest(unittest.TestCase):
+    """
+    Run tests for calc.batch_evaluator, checking its results against those of
+    calc.evaluator for each sample.
+    """
+    SAMPLES = {
+        'x': numpy.array([-2.5, -1.0, 0.5, 1.0, 3.0]),
+        'y': numpy.array([0.5, 2.0, 4.0, -3.0, 1.5]),
+    }
+
+    def assert_batch_equal(self, math_expr, functions=None, case_sensitive=False):
+        """
+        Assert that batch_evaluator gives the same results as evaluator, sample by sample
+        """
+        functions = functions or {}
+        results = calc.batch_evaluator(self.SAMPLES, functions, math_expr, case_sensitive=case_sensitive)
+        for index, result in enumerate(results):
+            variables = {name: values[index] for name, values in self.SAMPLES.iteritems()}
+            expected = calc.evaluator(variables, functions, math_expr, case_sensitive=case_sensitive)
+            self.assertAlmostEqual(result, expected, msg=u"{} at sample {}".format(math_expr, index))
+
+    def test_operators(self):
+        for math_expr in ["x + y", "-x - y + 1", "x * y / 2", "x^2 + y^3", "2^x^2", "(x + y) * (x - y)", "x || y"]:
+            self.assert_batch_equal(math_expr)
+
+    def test_functions(self):
+        for math_expr in ["sin(x) + cos(y)", "sqrt(y^2)", "sec(x) * coth(y)", "arccot(x)", "fact(3) * x", "exp(-x)"]:
+            self.assert_batch_equal(math_expr)
+        self.assert_batch_equal("f(x) + F(y)", functions={'f': abs, 'F': lambda v: v * 2}, case_sensitive=True)
+
+    def test_complex(self):
+        self.assert_batch_equal("x + i*y")
+        self.assert_batch_equal("(x + j*y)^2")
+
+    def test_constant_expression(self):
+        self.assertEqual(calc.batch_evaluator(self.SAMPLES, {}, "2*pi"), 2 * numpy.pi)
+
+    def test_parallel_with_zero(self):
+        results = calc.batch_evaluator({'x': numpy.array([1.0, 0.0])}, {}, "x || 2")
+        self.assertAlmostEqual(results[0], 2.0 / 3)
+        self.assertTrue(numpy.isnan(results[1]))
+
+    def test_invalid_operations(self):
+        """
+        Check that invalid operations give non-finite results instead of raising
+        """
+        results = calc.batch_evaluator({'x': numpy.array([1.0, 0.0])}, {}, "1/x")
+        self.assertEqual(results[0], 1.0)
+        self.assertFalse(numpy.isfinite(results[1]))
+
+    def test_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.batch_evaluator(self.SAMPLES, {}, "x + z")
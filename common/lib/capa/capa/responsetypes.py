@@ -37,7 +37,7 @@ from shapely.geometry import Point, MultiPoint
 import dogstats_wrapper as dog_stats_api
 
 # specific library imports
-from calc import evaluator, UndefinedVariable
+from calc import batch_evaluator, evaluator, UndefinedVariable
 from . import correctmap
 from .registry import TagRegistry
 from datetime import datetime
@@ -3206,9 +3206,16 @@ class FormulaResponse(LoncapaResponse):
         Takes in an answer and a list of dictionaries mapping variables to values.
         Each dictionary represents a test case for the answer.
         Returns a tuple of formula evaluation results.
+
+        The answer is evaluated for all the test cases at once if possible,
+        and otherwise for each test case in turn, which reports any error.
         """
         _ = self.capa_system.i18n.ugettext
 
+        out = self.batch_tupleize_answers(answer, var_dict_list)
+        if out is not None:
+            return out
+
         out = []
         for var_dict in var_dict_list:
             try:
@@ -3260,6 +3267,36 @@ class FormulaResponse(LoncapaResponse):
                 )
         return out
 
+    def batch_tupleize_answers(self, answer, var_dict_list):
+        """
+        Like tupleize_answers, but evaluates the answer for all the test cases
+        in a single vectorized pass.
+
+        Returns None if the answer can't be evaluated that way, or if any of
+        its results is not finite, so that errors such as dividing by zero
+        are left to tupleize_answers to report.
+        """
+        if not var_dict_list:
+            return None
+        variables = {
+            var: numpy.array([var_dict[var] for var_dict in var_dict_list])
+            for var in var_dict_list[0]
+        }
+        try:
+            results = numpy.asarray(batch_evaluator(
+                variables,
+                dict(),
+                answer,
+                case_sensitive=self.case_sensitive,
+            ))
+            if results.ndim == 0:
+                results = numpy.repeat(results, len(var_dict_list))
+            if results.shape != (len(var_dict_list),) or not numpy.all(numpy.isfinite(results)):
+                return None
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return results.tolist()
+
     def randomize_variables(self, samples):
         """
         Returns a list of dictionaries mapping variables to random values in range,
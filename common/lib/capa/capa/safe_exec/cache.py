@@ -0,0 +1,106 @@
+"""A cache of safe_exec results, shared by all the problems of a process."""
+
+from collections import OrderedDict
+import cPickle as pickle
+import threading
+import time
+
+from dogapi import dog_stats_api
+
+
+class SafeExecCache(object):
+    """
+    A cache of safe_exec results, to be passed as the `cache` argument of `safe_exec`.
+
+    Results are kept in a bounded, in-process LRU of at most `max_entries`
+    entries, in front of an optional `shared_cache`, an object with
+    .get(key) and .set(key, value, timeout) methods such as a Django cache,
+    which shares results across processes.  Entries expire from both tiers
+    after `timeout` seconds.
+
+    Since the results of safe_exec only depend on the code, the globals and
+    the random seed, which make up the key, entries never need to be
+    invalidated.  The local tier stores results pickled, so that callers
+    never share mutable results.
+
+    Hits, misses and lookup times are reported to datadog.
+    """
+    def __init__(self, shared_cache=None, max_entries=1000, timeout=24 * 60 * 60):
+        self.shared_cache = shared_cache
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __nonzero__(self):
+        # An empty cache is still a cache: don't let __len__ make it falsy.
+        return True
+
+    def get(self, key):
+        """
+        Returns the cached result for the given key, or None.
+        """
+        start_time = time.time()
+        value = self._get_local(key)
+        if value is not None:
+            dog_stats_api.increment('capa.safe_exec.cache.hit', tags=['tier:local'])
+        elif self.shared_cache is not None:
+            value = self.shared_cache.get(key)
+            if value is not None:
+                dog_stats_api.increment('capa.safe_exec.cache.hit', tags=['tier:shared'])
+                self._set_local(key, value)
+
+        if value is None:
+            dog_stats_api.increment('capa.safe_exec.cache.miss')
+        dog_stats_api.histogram('capa.safe_exec.cache.get_time', time.time() - start_time)
+        return value
+
+    def set(self, key, value):
+        """
+        Caches the given result in both tiers.
+        """
+        self._set_local(key, value)
+        if self.shared_cache is not None:
+            self.shared_cache.set(key, value, self.timeout)
+
+    def clear(self):
+        """
+        Removes all the entries of the local tier.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key):
+        """
+        Returns the result for the given key from the local tier, or None if
+        it is missing or has expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            expiration_time, pickled_value = entry
+            if expiration_time < time.time():
+                return None
+            # Move the entry to the most recently used end.
+            self._entries[key] = entry
+        return pickle.loads(pickled_value)
+
+    def _set_local(self, key, value):
+        """
+        Stores the given result in the local tier, evicting the least recently
+        used entries beyond max_entries.
+        """
+        entry = (time.time() + self.timeout, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            dog_stats_api.increment('capa.safe_exec.cache.eviction', evicted)
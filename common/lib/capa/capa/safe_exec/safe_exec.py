@@ -97,9 +97,9 @@ def safe_exec(
     `extra_files` is a list of (filename, contents) pairs.  These files are
     created in the sandbox.
 
-    `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
-    to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    `cache` is an object with .get(key) and .set(key, value) methods, such as a
+    `SafeExecCache`.  It will be used to cache the execution, taking into account
+    the code, the values of the globals, and the random seed.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -108,7 +108,7 @@ def safe_exec(
 
     """
     # Check the cache for a previous result.
-    if cache:
+    if cache is not None:
         safe_globals = json_safe(globals_dict)
         md5er = hashlib.md5()
         md5er.update(repr(code))
@@ -135,10 +135,11 @@ def safe_exec(
 
     # Run the code!  Results are side effects in globals_dict.
     try:
-        exec_fn(
-            code_prolog + LAZY_IMPORTS + code, globals_dict,
-            python_path=python_path, extra_files=extra_files, slug=slug,
-        )
+        with dog_stats_api.timer('capa.safe_exec.exec_time'):
+            exec_fn(
+                code_prolog + LAZY_IMPORTS + code, globals_dict,
+                python_path=python_path, extra_files=extra_files, slug=slug,
+            )
     except SafeExecException as e:
         emsg = e.message
     else:
@@ -146,7 +147,7 @@ def safe_exec(
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
-    if cache:
+    if cache is not None:
         cleaned_results = json_safe(globals_dict)
         cache.set(key, (emsg, cleaned_results))
 
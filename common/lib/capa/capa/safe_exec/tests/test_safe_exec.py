@@ -7,9 +7,10 @@ import random
 import textwrap
 import unittest
 
+from mock import patch
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import SafeExecCache, safe_exec, update_hash
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -177,6 +178,81 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class SharedDictCache(DictCache):
+    """A shared cache implementation over a simple dict, for testing."""
+
+    def set(self, key, value, timeout=None):  # pylint: disable=arguments-differ
+        super(SharedDictCache, self).set(key, value)
+
+
+class TestSafeExecCache(unittest.TestCase):
+    """Test the SafeExecCache used to share safe_exec results."""
+
+    def test_local_hit(self):
+        cache = SafeExecCache()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache)
+        self.assertEqual(len(cache), 1)
+
+        g = {}
+        with patch('capa.safe_exec.cache.dog_stats_api') as mock_dog_stats_api:
+            safe_exec("a = int(math.pi)", g, cache=cache)
+        mock_dog_stats_api.increment.assert_called_once_with('capa.safe_exec.cache.hit', tags=['tier:local'])
+        self.assertEqual(g['a'], 3)
+
+    def test_empty_cache_is_true(self):
+        self.assertTrue(SafeExecCache())
+
+    def test_results_are_not_shared(self):
+        cache = SafeExecCache()
+        cache.set('key', (None, {'a': [1]}))
+        cache.get('key')[1]['a'].append(2)
+        self.assertEqual(cache.get('key'), (None, {'a': [1]}))
+
+    def test_shared_hit(self):
+        shared = {}
+        safe_exec("a = int(math.pi)", {}, cache=SafeExecCache(shared_cache=SharedDictCache(shared)))
+        self.assertEqual(shared.values()[0], (None, {'a': 3}))
+
+        # Fiddle with the shared cache; another process, with its own local tier, gets the result from it.
+        shared[shared.keys()[0]] = (None, {'a': 17})
+        cache = SafeExecCache(shared_cache=SharedDictCache(shared))
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache)
+        self.assertEqual(g['a'], 17)
+        self.assertEqual(len(cache), 1)
+
+    def test_lru_eviction(self):
+        cache = SafeExecCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_timeout(self):
+        cache = SafeExecCache(timeout=10)
+        with patch('capa.safe_exec.cache.time.time', return_value=100):
+            cache.set('a', 1)
+        with patch('capa.safe_exec.cache.time.time', return_value=109):
+            self.assertEqual(cache.get('a'), 1)
+        with patch('capa.safe_exec.cache.time.time', return_value=111):
+            self.assertIsNone(cache.get('a'))
+
+    def test_metrics(self):
+        cache = SafeExecCache()
+        cache.set('a', 1)
+        with patch('capa.safe_exec.cache.dog_stats_api') as mock_dog_stats_api:
+            cache.get('a')
+            cache.get('b')
+        mock_dog_stats_api.increment.assert_any_call('capa.safe_exec.cache.hit', tags=['tier:local'])
+        mock_dog_stats_api.increment.assert_any_call('capa.safe_exec.cache.miss')
+        self.assertEqual(mock_dog_stats_api.histogram.call_count, 2)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
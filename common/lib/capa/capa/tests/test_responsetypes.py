@@ -591,6 +591,42 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(problem.responders.values()[0].validate_answer('14*x'))
         self.assertFalse(problem.responders.values()[0].validate_answer('3*y+2*x'))
 
+    def test_batch_tupleize_answers(self):
+        """
+        Test that answers are evaluated for all samples at once, with the same
+        results as when evaluated sample by sample.
+        """
+        sample_dict = {'x': (-10, 10), 'y': (1, 2)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance=0.01,
+                                     answer="x+2*y")
+        responder = problem.responders.values()[0]
+        var_dict_list = responder.randomize_variables(responder.samples)
+        for answer in ("x^2 + sin(y)/y", "x || y", "3", "fact(2)*y", "x + i*y"):
+            expected = [calc.evaluator(var_dict, {}, answer) for var_dict in var_dict_list]
+            with mock.patch('capa.responsetypes.evaluator') as mock_evaluator:
+                results = responder.tupleize_answers(answer, var_dict_list)
+            self.assertFalse(mock_evaluator.called)
+            self.assertEqual(len(results), len(expected))
+            for result, expected_result in zip(results, expected):
+                self.assertAlmostEqual(result, expected_result)
+
+    def test_batch_tupleize_answers_fallback(self):
+        """
+        Test that answers with non-finite results are evaluated sample by sample.
+        """
+        sample_dict = {'x': (1, 2)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance="1%",
+                                     answer="x")
+        responder = problem.responders.values()[0]
+        var_dict_list = responder.randomize_variables(responder.samples)
+        self.assertIsNone(responder.batch_tupleize_answers('1/(x-x)', var_dict_list))
+        with self.assertRaises(StudentInputError):
+            responder.tupleize_answers('1/(x-x)', var_dict_list)
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -219,7 +219,7 @@ class StaticContent(object):
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
     @staticmethod
-    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
+    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True, asset_manifest=None):
         """
         Returns a fully-qualified path to a piece of static content.
 
@@ -229,6 +229,10 @@ class StaticContent(object):
         Args:
             course_key: key to the course which owns this asset
             path: the path to said content
+            asset_manifest: the asset manifest of the course, as returned by
+                `ContentStore.get_asset_manifest`, to check the status of the
+                asset without querying the contentstore; if None, the asset
+                is looked up in the contentstore
 
         Returns:
             string: fully-qualified path to asset
@@ -244,7 +248,10 @@ class StaticContent(object):
         serve_from_cdn = False
         content_digest = None
         try:
-            content = AssetManager.find(asset_key, as_stream=True)
+            if asset_manifest is not None:
+                content = asset_manifest.find(asset_key)
+            else:
+                content = AssetManager.find(asset_key, as_stream=True)
             serve_from_cdn = not getattr(content, "locked", True)
             content_digest = getattr(content, "content_digest", None)
         except (ItemNotFoundError, NotFoundError):
@@ -265,7 +272,7 @@ class StaticContent(object):
         for query_name, query_val in query_params:
             if query_val.startswith("/static/"):
                 new_val = StaticContent.get_canonicalized_asset_path(
-                    course_key, query_val, base_url, excluded_exts, encode=False)
+                    course_key, query_val, base_url, excluded_exts, encode=False, asset_manifest=asset_manifest)
                 updated_query_params.append((query_name, new_val))
             else:
                 # Make sure we're encoding Unicode strings down to their byte string
@@ -370,6 +377,17 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_asset_manifest(self, course_key):
+        """
+        Returns the asset manifest of the given course: an object whose `find`
+        method takes an asset key and returns the `locked` state and
+        `content_digest` of the asset, or raises NotFoundError, without
+        querying the contentstore for the assets of the course.
+
+        Returns None if the manifest of the course is too large to be cached.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
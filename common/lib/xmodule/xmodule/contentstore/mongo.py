@@ -1,13 +1,21 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+from __future__ import absolute_import
+
 import os
 import json
+import time
+import cPickle as pickle
+from collections import namedtuple
+
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
 from fs.osfs import OSFS
 from bson.son import SON
+from django.conf import settings
+from django.core.cache import caches, InvalidCacheBackendError
 
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
@@ -18,6 +26,21 @@ from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from .content import StaticContent, ContentStore, StaticContentStream
 
+# How long, in seconds, the asset manifest of a course is cached, unless ASSET_MANIFEST_CACHE_TIMEOUT
+# is set.  Manifests are also invalidated whenever one of the course's assets is saved, deleted or has
+# its attributes changed.
+DEFAULT_ASSET_MANIFEST_CACHE_TIMEOUT = 60 * 60
+
+# Maximum size, in bytes of pickled data, of a cached asset manifest, unless ASSET_MANIFEST_CACHE_MAX_SIZE
+# is set: memcached rejects values larger than 1MB.
+DEFAULT_ASSET_MANIFEST_CACHE_MAX_SIZE = 1000000
+
+# Cached in place of the asset manifest of a course whose manifest is too large to be cached, so that it
+# isn't read again until the course's assets change.
+OVERSIZED_ASSET_MANIFEST = 'oversized'
+
+AssetManifestEntry = namedtuple('AssetManifestEntry', ['locked', 'content_digest'])
+
 
 class MongoContentStore(ContentStore):
     """
@@ -85,7 +108,7 @@ class MongoContentStore(ContentStore):
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
-        self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
+        self.fs.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
         thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
         with self.fs.new_file(_id=content_id, filename=unicode(content.location), content_type=content.content_type,
@@ -100,16 +123,21 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._bump_asset_manifest_version(content.location.course_key)
         return content
 
     def delete(self, location_or_id):
         """
         Delete an asset.
         """
+        course_key = None
         if isinstance(location_or_id, AssetKey):
+            course_key = location_or_id.course_key
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        if course_key is not None:
+            self._bump_asset_manifest_version(course_key)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -311,6 +339,7 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._bump_asset_manifest_version(location.course_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -367,6 +396,7 @@ class MongoContentStore(ContentStore):
                 # getattr b/c caching may mean some pickled instances don't have attr
                 locked=asset.get('locked', False)
             )
+        self._bump_asset_manifest_version(dest_course_key)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -379,6 +409,89 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+        self._bump_asset_manifest_version(course_key)
+
+    def get_asset_manifest(self, course_key):
+        """
+        Returns the AssetManifest of the given course, or None if it is too
+        large to be cached, in which case the assets must be looked up one by
+        one with `find`.
+
+        The manifest is read with a single query, and cached under the
+        current version of the course's assets.  That version is bumped
+        whenever one of the course's assets is saved, deleted or has its
+        attributes changed, so that a cached manifest is never served after
+        such a change.
+        """
+        timeout = getattr(settings, 'ASSET_MANIFEST_CACHE_TIMEOUT', DEFAULT_ASSET_MANIFEST_CACHE_TIMEOUT)
+        if not timeout:
+            return AssetManifest(self, course_key, self._get_asset_manifest_entries(course_key))
+
+        cache = _asset_manifest_cache()
+        version_key = self._asset_manifest_version_key(course_key)
+        cache_key = u'{}.{}'.format(version_key, self._asset_manifest_version(cache, version_key))
+        entries = cache.get(cache_key)
+        if entries is None:
+            entries = self._get_asset_manifest_entries(course_key)
+            max_size = getattr(settings, 'ASSET_MANIFEST_CACHE_MAX_SIZE', DEFAULT_ASSET_MANIFEST_CACHE_MAX_SIZE)
+            if max_size is not None and len(pickle.dumps(entries, pickle.HIGHEST_PROTOCOL)) > max_size:
+                entries = OVERSIZED_ASSET_MANIFEST
+            cache.set(cache_key, entries, timeout)
+        if entries == OVERSIZED_ASSET_MANIFEST:
+            return None
+        return AssetManifest(self, course_key, entries)
+
+    @autoretry_read()
+    def _get_asset_manifest_entries(self, course_key):
+        """
+        Returns the AssetManifestEntry of all of the assets and thumbnails of the
+        given course, keyed by their manifest id.
+        """
+        items = self.fs_files.find(query_for_course(course_key), {'_id': True, 'locked': True, 'md5': True})
+        return {
+            _manifest_id(self.make_id_son(item)): AssetManifestEntry(item.get('locked', False), item.get('md5'))
+            for item in items
+        }
+
+    def _asset_manifest_version_key(self, course_key):
+        """
+        Returns the cache key of the version of the assets of the given course
+        in this contentstore.
+        """
+        return u'asset_manifest.{}.{}'.format(
+            self.fs_files.full_name,
+            u'/'.join(unicode(part) for part in _course_id(course_key))
+        )
+
+    @staticmethod
+    def _asset_manifest_version(cache, version_key):
+        """
+        Returns the version of the assets of a course, stored under the given
+        key.
+
+        The version is initialized from the current time, rather than from 0,
+        so that a version evicted from the cache cannot be reused with a stale
+        manifest.
+        """
+        version = cache.get(version_key)
+        if version is None:
+            version = int(time.time() * 1000)
+            if not cache.add(version_key, version, None):
+                version = cache.get(version_key, version)
+        return version
+
+    def _bump_asset_manifest_version(self, course_key):
+        """
+        Invalidate the cached asset manifest of the given course by atomically
+        incrementing the version of its assets.
+        """
+        cache = _asset_manifest_cache()
+        version_key = self._asset_manifest_version_key(course_key)
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            # The version is not in the cache: start a new one.
+            cache.set(version_key, int(time.time() * 1000), None)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -503,6 +616,65 @@ class MongoContentStore(ContentStore):
         )
 
 
+class AssetManifest(object):
+    """
+    The lock state and content digest of all of the assets and thumbnails of a
+    course, as returned by :meth:`MongoContentStore.get_asset_manifest`.
+
+    `find` can be used in place of :meth:`MongoContentStore.find` to check the
+    lock state and digest of an asset without querying the contentstore.
+    """
+    def __init__(self, store, course_key, entries):
+        self.store = store
+        self.course_id = _course_id(course_key)
+        self.entries = entries
+
+    def find(self, asset_key):
+        """
+        Returns the AssetManifestEntry of the given asset.
+
+        Raises NotFoundError if the asset does not exist.  The assets of other
+        courses are looked up in the contentstore.
+        """
+        if _course_id(asset_key.course_key) != self.course_id:
+            return self.store.find(asset_key, as_stream=True)
+
+        content_id, __ = self.store.asset_db_key(asset_key)
+        try:
+            return self.entries[_manifest_id(content_id)]
+        except KeyError:
+            raise NotFoundError(content_id)
+
+
+def _asset_manifest_cache():
+    """
+    Returns the cache of the asset manifests: the "course_assets" cache if
+    there is one, else the default cache.
+    """
+    try:
+        return caches['course_assets']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _course_id(course_key):
+    """
+    Returns the fields identifying the assets of the given course in the
+    contentstore: deprecated courses have no run, as in `query_for_course`.
+    """
+    run = None if getattr(course_key, 'deprecated', False) else course_key.run
+    return (course_key.org, course_key.course, run)
+
+
+def _manifest_id(content_id):
+    """
+    Returns a hashable version of the given database id of an asset.
+    """
+    if isinstance(content_id, dict):
+        return tuple(content_id.items())
+    return content_id
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
@@ -8,6 +8,8 @@ import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +17,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -223,6 +226,132 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def copy_structure(structure):
+    """
+    Return a copy of the given structure (as returned by structure_from_mongo)
+    which can be modified without affecting the original: the structure, its
+    blocks, and the fields and edit info of each block are copied, while the
+    field values themselves are shared.
+    """
+    new_structure = dict(structure)
+    new_structure['blocks'] = {
+        block_key: _copy_block_data(block_data)
+        for block_key, block_data in structure['blocks'].iteritems()
+    }
+    return new_structure
+
+
+def _copy_block_data(block_data):
+    """
+    Return a copy of the given BlockData, with copies of its fields and edit info.
+    """
+    new_block_data = _shallow_copy(block_data)
+    new_block_data.fields = dict(block_data.fields)
+    new_block_data.edit_info = _shallow_copy(block_data.edit_info)
+    return new_block_data
+
+
+def _shallow_copy(obj):
+    """
+    Return a shallow copy of the given object. Much faster than `copy.copy` for
+    the plain objects making up structures.
+    """
+    new_obj = obj.__class__.__new__(obj.__class__)
+    new_obj.__dict__.update(obj.__dict__)
+    return new_obj
+
+
+class LocalStructureCache(object):
+    """
+    Bounded, in-process LRU cache of course structures, keyed by structure id,
+    used in front of the shared CourseStructureCache.
+
+    Structures are immutable, so entries never need to be invalidated. But
+    callers may modify the structures they get (e.g. when loading block
+    definitions), so structures are copied with `copy_structure` when they
+    are added to or read from the cache, which is still much cheaper than
+    decompressing and unpickling them.
+
+    The cache is bounded by `max_size`, the total size in bytes of the
+    pickled structures it holds.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, course_context=None):
+        """Return a copy of the cached structure, or None."""
+        with TIMER.timer("LocalStructureCache.get", course_context) as tagger:
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    # Move the entry to the most recently used end.
+                    self._entries[key] = entry
+            tagger.tag(from_cache=str(entry is not None).lower())
+
+            if entry is None:
+                return None
+
+            structure, size = entry
+            tagger.measure('uncompressed_size', size)
+            return copy_structure(structure)
+
+    def set(self, key, structure, size, course_context=None):
+        """
+        Cache a copy of the given structure, whose pickled data is `size` bytes
+        long, evicting the least recently used structures if needed.
+        """
+        if size > self.max_size:
+            return
+
+        with TIMER.timer("LocalStructureCache.set", course_context) as tagger:
+            tagger.measure('uncompressed_size', size)
+            entry = (copy_structure(structure), size)
+            evictions = 0
+            with self._lock:
+                previous_entry = self._entries.pop(key, None)
+                if previous_entry is not None:
+                    self.size -= previous_entry[1]
+                self._entries[key] = entry
+                self.size += size
+                while self.size > self.max_size:
+                    __, (__, evicted_size) = self._entries.popitem(last=False)
+                    self.size -= evicted_size
+                    evictions += 1
+            tagger.measure('evictions', evictions)
+            tagger.measure('total_size', self.size)
+
+    def clear(self):
+        """Remove all the cached structures."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_LOCAL_STRUCTURE_CACHES = {}
+
+
+def get_local_structure_cache():
+    """
+    Return the LocalStructureCache of this process, bounded by the
+    COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE setting, or None if that setting
+    is 0 (the default) or Django isn't available.
+    """
+    if not DJANGO_AVAILABLE:
+        return None
+    max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE', 0)
+    if not max_size:
+        return None
+    if max_size not in _LOCAL_STRUCTURE_CACHES:
+        _LOCAL_STRUCTURE_CACHES.setdefault(max_size, LocalStructureCache(max_size))
+    return _LOCAL_STRUCTURE_CACHES[max_size]
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
@@ -230,9 +359,13 @@ class CourseStructureCache(object):
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
+
+    If a `local_cache` (a LocalStructureCache) is given, it is checked first,
+    and updated with the structures read from or written to the django cache.
     """
-    def __init__(self):
+    def __init__(self, local_cache=None):
         self.cache = None
+        self.local_cache = local_cache
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
@@ -241,6 +374,11 @@ class CourseStructureCache(object):
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
+        if self.local_cache is not None:
+            structure = self.local_cache.get(key, course_context)
+            if structure is not None:
+                return structure
+
         if self.cache is None:
             return None
 
@@ -258,23 +396,31 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+
+        if self.local_cache is not None:
+            self.local_cache.set(key, structure, len(pickled_data), course_context)
+        return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            if self.cache is not None:
+                # 1 = Fastest (slightly larger results)
+                compressed_pickled_data = zlib.compress(pickled_data, 1)
+                tagger.measure('compressed_size', len(compressed_pickled_data))
+
+                # Stuctures are immutable, so we set a timeout of "never"
+                self.cache.set(key, compressed_pickled_data, None)
 
-            # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+        if self.local_cache is not None:
+            self.local_cache.set(key, structure, len(pickled_data), course_context)
 
 
 class MongoConnection(object):
@@ -318,7 +464,7 @@ class MongoConnection(object):
         This method will use a cached version of the structure if it is availble.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
-            cache = CourseStructureCache()
+            cache = CourseStructureCache(local_cache=get_local_structure_cache())
 
             structure = cache.get(key, course_context)
             tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
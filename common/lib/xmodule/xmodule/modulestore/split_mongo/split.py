@@ -84,6 +84,7 @@ from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_indexes import StructureIndexes, is_indexable
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -822,8 +823,32 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
             except KeyError:
                 pass
+            self.request_cache.data.setdefault('structure_indexes', {}).pop(course_version_guid, None)
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_indexes'] = {}
+
+    def _get_structure_indexes(self, course):
+        """
+        Return the StructureIndexes of the given course's structure, cached
+        in the request cache by structure version.
+
+        :param course: a CourseEnvelope
+        """
+        structure = course.structure
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        if self.request_cache is None or (
+                bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db
+        ):
+            # Structures created by a bulk operation may still be modified in place, so only
+            # cache the indexes of the structures which are in the database.
+            return StructureIndexes(structure)
+
+        indexes_cache = self.request_cache.data.setdefault('structure_indexes', {})
+        indexes = indexes_cache.get(structure['_id'])
+        if indexes is None:
+            indexes = indexes_cache[structure['_id']] = StructureIndexes(structure)
+        return indexes
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1217,21 +1242,22 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
-
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+        # narrow down the blocks to check using the indexes of the structure
+        indexes = self._get_structure_indexes(course)
+        block_keys = None
+        if 'block_type' in qualifiers and is_indexable(qualifiers['block_type']):
+            block_keys = indexes.blocks_of_type(qualifiers['block_type'])
+        for field_name, criteria in settings.iteritems():
+            if is_indexable(criteria):
+                matching_block_keys = indexes.blocks_with_field_value(field_name, criteria)
+                block_keys = matching_block_keys if block_keys is None else block_keys & matching_block_keys
+        if block_keys is None:
+            block_keys = course.structure['blocks'].viewkeys()
+
+        for block_id in block_keys:
+            if _block_matches_all(course.structure['blocks'][block_id]):
                 if not include_orphans:
-                    if (  # pylint: disable=bad-continuation
-                        block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
-                    ):
+                    if block_id.type in DETACHED_XBLOCK_TYPES or block_id in indexes.reachable:
                         items.append(block_id)
                 else:
                     items.append(block_id)
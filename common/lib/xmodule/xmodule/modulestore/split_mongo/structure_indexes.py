@@ -0,0 +1,119 @@
+"""
+Secondary indexes over the blocks of a split structure, used to answer
+get_items queries without scanning every block of the structure.
+"""
+from collections import defaultdict
+import re
+
+
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+def is_indexable(criteria):
+    """
+    Can the blocks matching the given get_items criteria be looked up in an
+    index? Only plain, hashable values can: regexes, functions and
+    `$in`/`$nin`/`$exists` dicts need each value to be tested.
+    """
+    if isinstance(criteria, (dict, re._pattern_type)) or callable(criteria):  # pylint: disable=protected-access
+        return False
+    try:
+        hash(criteria)
+    except TypeError:
+        return False
+    return True
+
+
+def _indexed_values(value):
+    """
+    Yield the hashable values under which a field value is indexed. As in
+    `_value_matches`, a list matches the values of any of its elements.
+    """
+    if isinstance(value, list):
+        for element in value:
+            for indexed_value in _indexed_values(element):
+                yield indexed_value
+    else:
+        try:
+            hash(value)
+        except TypeError:
+            return
+        yield value
+
+
+class StructureIndexes(object):
+    """
+    Lazily built indexes over the blocks of a single structure version:
+    block keys by block type, block keys by the value of a settings field,
+    the parents of each block, and the set of blocks reachable from the root.
+
+    Structure versions which are in the database are immutable, so their
+    indexes can be kept as long as the structure is.
+    """
+    def __init__(self, structure):
+        self.structure = structure
+        self._blocks_by_type = None
+        self._blocks_by_field_value = {}
+        self._parents = None
+        self._reachable = None
+
+    def blocks_of_type(self, block_type):
+        """
+        Return the set of keys of the blocks of the given type.
+        """
+        if self._blocks_by_type is None:
+            self._blocks_by_type = defaultdict(set)
+            for block_key in self.structure['blocks']:
+                self._blocks_by_type[block_key.type].add(block_key)
+        return self._blocks_by_type.get(block_type, set())
+
+    def blocks_with_field_value(self, field_name, value):
+        """
+        Return the set of keys of the blocks whose settings field `field_name`
+        is explicitly set to `value`, or to a list containing `value`.
+        """
+        if field_name not in self._blocks_by_field_value:
+            blocks_by_value = defaultdict(set)
+            for block_key, block_data in self.structure['blocks'].iteritems():
+                if field_name in block_data.fields:
+                    for indexed_value in _indexed_values(block_data.fields[field_name]):
+                        blocks_by_value[indexed_value].add(block_key)
+            self._blocks_by_field_value[field_name] = blocks_by_value
+        return self._blocks_by_field_value[field_name].get(value, set())
+
+    @property
+    def parents(self):
+        """
+        A dict of the keys of the parents of each block, as returned by
+        `build_block_key_to_parents_mapping`.
+        """
+        if self._parents is None:
+            self._parents = defaultdict(list)
+            for parent_key, block_data in self.structure['blocks'].iteritems():
+                for child_key in block_data.fields.get('children', []):
+                    self._parents[child_key].append(parent_key)
+        return self._parents
+
+    @property
+    def reachable(self):
+        """
+        The set of keys of the blocks which have a path to the root, i.e.
+        the blocks for which `has_path_to_root` is True.
+        """
+        if self._reachable is None:
+            parents = self.parents
+            to_visit = [
+                block_key for block_key in self.structure['blocks']
+                if block_key.type in ROOT_BLOCK_TYPES and not parents.get(block_key)
+            ]
+            reachable = set(to_visit)
+            while to_visit:
+                block_data = self.structure['blocks'].get(to_visit.pop())
+                if block_data is None:
+                    continue
+                for child_key in block_data.fields.get('children', []):
+                    if child_key not in reachable:
+                        reachable.add(child_key)
+                        to_visit.append(child_key)
+            self._reachable = reachable
+        return self._reachable
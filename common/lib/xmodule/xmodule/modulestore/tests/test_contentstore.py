@@ -9,6 +9,10 @@ from tempfile import mkdtemp
 import path
 import shutil
 
+from django.core.cache.backends.locmem import LocMemCache
+from django.test.utils import override_settings
+from mock import patch
+
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
@@ -208,3 +212,70 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         self.assertEqual(count, len(self.course2_files))
+
+    @ddt.data(True, False)
+    def test_asset_manifest(self, deprecated):
+        """
+        Test that the asset manifest matches find, for the course's own assets
+        and those of other courses
+        """
+        self.set_up_assets(deprecated)
+        manifest = self.contentstore.get_asset_manifest(self.course1_key)
+        for asset_key in [
+                self.course1_key.make_asset_key('asset', self.course1_files[0]),
+                self.course1_key.make_asset_key('asset', self.course1_files[1]),
+                self.course2_key.make_asset_key('asset', self.course2_files[2]),
+        ]:
+            content = self.contentstore.find(asset_key)
+            entry = manifest.find(asset_key)
+            self.assertEqual(entry.locked, content.locked)
+            self.assertEqual(entry.content_digest, content.content_digest)
+
+        with self.assertRaises(NotFoundError):
+            manifest.find(self.course1_key.make_asset_key('asset', 'no_such_file.gif'))
+
+    @ddt.data(True, False)
+    def test_asset_manifest_invalidation(self, deprecated):
+        """
+        Test that the cached asset manifest is updated when assets are locked,
+        deleted and saved
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        self.assertFalse(self.contentstore.get_asset_manifest(self.course1_key).find(asset_key).locked)
+
+        self.contentstore.set_attr(asset_key, 'locked', True)
+        self.assertTrue(self.contentstore.get_asset_manifest(self.course1_key).find(asset_key).locked)
+
+        self.contentstore.delete(asset_key)
+        with self.assertRaises(NotFoundError):
+            self.contentstore.get_asset_manifest(self.course1_key).find(asset_key)
+
+        self.save_asset(self.course1_files[0], asset_key, self.course1_files[0], False)
+        self.assertFalse(self.contentstore.get_asset_manifest(self.course1_key).find(asset_key).locked)
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        with self.assertRaises(NotFoundError):
+            self.contentstore.get_asset_manifest(self.course1_key).find(asset_key)
+
+    @ddt.data(True, False)
+    def test_oversized_asset_manifest(self, deprecated):
+        """
+        Test that an asset manifest too large to be cached is not returned,
+        nor read again until the course's assets change
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        cache = LocMemCache(uuid4().hex, {})
+        with patch('xmodule.contentstore.mongo._asset_manifest_cache', return_value=cache):
+            with override_settings(ASSET_MANIFEST_CACHE_TIMEOUT=60, ASSET_MANIFEST_CACHE_MAX_SIZE=1):
+                self.assertIsNone(self.contentstore.get_asset_manifest(self.course1_key))
+                with patch.object(self.contentstore, '_get_asset_manifest_entries') as mock_get_entries:
+                    self.assertIsNone(self.contentstore.get_asset_manifest(self.course1_key))
+                self.assertFalse(mock_get_entries.called)
+
+                # Once the course's assets change, the manifest is read again.
+                self.contentstore.set_attr(asset_key, 'locked', True)
+                with override_settings(ASSET_MANIFEST_CACHE_MAX_SIZE=None):
+                    manifest = self.contentstore.get_asset_manifest(self.course1_key)
+                self.assertTrue(manifest.find(asset_key).locked)
@@ -32,6 +32,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -990,6 +991,65 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_local_structure_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache(self, mock_get_cache, mock_get_local_structure_cache):
+        mock_get_cache.return_value = self.cache
+        local_cache = LocalStructureCache(max_size=10 * 1024 * 1024)
+        mock_get_local_structure_cache.return_value = local_cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+        self.assertEqual(len(local_cache), 1)
+
+        # when the local cache is warmed, neither mongo nor the django cache are used
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        self.assertEqual(cached_structure, not_cached_structure)
+
+        # the structures read from the local cache are copies
+        block_key, block_data = cached_structure['blocks'].items()[0]
+        block_data.fields['display_name'] = 'Modified'
+        block_data.edit_info.edited_by = 'Modified'
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        self.assertNotEqual(cached_structure['blocks'][block_key].fields.get('display_name'), 'Modified')
+        self.assertNotEqual(cached_structure['blocks'][block_key].edit_info.edited_by, 'Modified')
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_local_structure_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache_warmed_from_django_cache(self, mock_get_cache, mock_get_local_structure_cache):
+        mock_get_cache.return_value = self.cache
+        mock_get_local_structure_cache.return_value = None
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+
+        local_cache = LocalStructureCache(max_size=10 * 1024 * 1024)
+        mock_get_local_structure_cache.return_value = local_cache
+        with check_mongo_calls(0):
+            self._get_structure(self.new_course)
+        self.assertEqual(len(local_cache), 1)
+
+    def test_local_structure_cache_eviction(self):
+        structure = self._get_structure(self.new_course)
+        local_cache = LocalStructureCache(max_size=100)
+        local_cache.set('first', structure, 40)
+        local_cache.set('second', structure, 40)
+        self.assertIsNotNone(local_cache.get('first'))
+
+        # the least recently used structure is evicted
+        local_cache.set('third', structure, 40)
+        self.assertIsNone(local_cache.get('second'))
+        self.assertIsNotNone(local_cache.get('first'))
+        self.assertIsNotNone(local_cache.get('third'))
+        self.assertEqual(local_cache.size, 80)
+
+        # structures larger than the cache aren't cached
+        local_cache.set('fourth', structure, 101)
+        self.assertIsNone(local_cache.get('fourth'))
+        self.assertEqual(len(local_cache), 2)
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
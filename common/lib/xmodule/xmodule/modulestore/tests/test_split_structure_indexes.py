@@ -0,0 +1,89 @@
+"""
+Tests for split_mongo/structure_indexes.py
+"""
+import re
+import unittest
+
+import ddt
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_indexes import StructureIndexes, is_indexable
+
+
+@ddt.ddt
+class TestStructureIndexes(unittest.TestCase):
+    """
+    Tests for StructureIndexes, over the structure:
+
+            course
+              |
+          chapter_1
+           /     \\
+      problem_1  problem_2        orphan_chapter -- problem_3
+    """
+    def setUp(self):
+        super(TestStructureIndexes, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter_1')
+        self.problems = [BlockKey('problem', 'problem_{}'.format(index)) for index in range(1, 4)]
+        self.orphan = BlockKey('chapter', 'orphan_chapter')
+        self.structure = {
+            '_id': 'version',
+            'blocks': {
+                self.course: self._block_data('course', children=[self.chapter]),
+                self.chapter: self._block_data('chapter', children=self.problems[:2]),
+                self.problems[0]: self._block_data('problem', weight=1, tags=['a', 'b']),
+                self.problems[1]: self._block_data('problem', weight=2, tags=[['b']]),
+                self.problems[2]: self._block_data('problem', weight=1),
+                self.orphan: self._block_data('chapter', children=self.problems[2:]),
+            },
+        }
+        self.indexes = StructureIndexes(self.structure)
+
+    def _block_data(self, block_type, **fields):
+        """
+        Returns the BlockData of a block with the given settings fields.
+        """
+        return BlockData(block_type=block_type, fields=fields, edit_info={})
+
+    def test_blocks_of_type(self):
+        self.assertEqual(self.indexes.blocks_of_type('problem'), set(self.problems))
+        self.assertEqual(self.indexes.blocks_of_type('chapter'), {self.chapter, self.orphan})
+        self.assertEqual(self.indexes.blocks_of_type('html'), set())
+
+    def test_blocks_with_field_value(self):
+        self.assertEqual(self.indexes.blocks_with_field_value('weight', 1), {self.problems[0], self.problems[2]})
+        self.assertEqual(self.indexes.blocks_with_field_value('weight', 3), set())
+        self.assertEqual(self.indexes.blocks_with_field_value('children', self.chapter), {self.course})
+
+    def test_blocks_with_list_field_value(self):
+        self.assertEqual(self.indexes.blocks_with_field_value('tags', 'a'), {self.problems[0]})
+        self.assertEqual(self.indexes.blocks_with_field_value('tags', 'b'), set(self.problems[:2]))
+
+    def test_parents(self):
+        self.assertEqual(self.indexes.parents[self.problems[0]], [self.chapter])
+        self.assertEqual(self.indexes.parents[self.problems[2]], [self.orphan])
+        self.assertEqual(self.indexes.parents[self.course], [])
+
+    def test_reachable(self):
+        self.assertEqual(self.indexes.reachable, {self.course, self.chapter} | set(self.problems[:2]))
+
+    def test_reachable_with_cycle(self):
+        self.structure['blocks'][self.orphan].fields['children'].append(self.orphan)
+        self.assertNotIn(self.orphan, self.indexes.reachable)
+
+    @ddt.data(
+        ('problem', True),
+        (1, True),
+        (None, True),
+        (BlockKey('problem', 'problem_1'), True),
+        (re.compile('problem'), False),
+        (lambda value: value > 1, False),
+        ({'$in': [1, 2]}, False),
+        ({'$exists': True}, False),
+        ([1, 2], False),
+    )
+    @ddt.unpack
+    def test_is_indexable(self, criteria, expected_indexable):
+        self.assertEqual(is_indexable(criteria), expected_indexable)
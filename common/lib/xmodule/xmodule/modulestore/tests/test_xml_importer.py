@@ -9,7 +9,9 @@ from xmodule.x_module import XModuleMixin
 from opaque_keys.edx.locations import Location
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.inheritance import InheritanceMixin
-from xmodule.modulestore.xml_importer import _update_and_import_module, _update_module_location
+from xmodule.modulestore.xml_importer import (
+    _fingerprint_fields, _get_explicitly_set_fields, _update_and_import_module, _update_module_location
+)
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -333,3 +335,74 @@ class UpdateLocationTest(ModuleStoreNoSettings):
         # Expect these fields pass "is_set_on" test
         for field in self.CONTENT_FIELDS + self.SETTINGS_FIELDS + self.CHILDREN_FIELDS:
             self.assertTrue(new_version.fields[field].is_set_on(new_version))
+
+
+class FingerprintFieldsTest(unittest.TestCase):
+    """
+    Test the fingerprints used by incremental imports.
+    """
+    def setUp(self):
+        super(FingerprintFieldsTest, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.children = [
+            BlockUsageLocator(self.course_key, 'mutablestubxblock', 'child1'),
+            BlockUsageLocator(self.course_key, 'mutablestubxblock', 'child2'),
+        ]
+
+    def _make_xblock(self, children, settings_value='Explicitly set'):
+        """
+        Returns a stub XBlock with the given children and settings field value.
+        """
+        xblock = StubXBlockWithMutableFields(
+            mock.MagicMock(Runtime),
+            KvsFieldData(kvs=DictKeyValueStore()),
+            ScopeIds('Bob', 'mutablestubxblock', '123', 'import'),
+        )
+        xblock.location = Location('org', 'course', 'run', 'mutablestubxblock', 'stubxblock')
+        xblock.test_content_field = 'Explicitly set'
+        xblock.test_settings_field = settings_value
+        xblock.test_mutable_settings_field = ['a', 's', 'd']
+        xblock.children = children  # pylint:disable=attribute-defined-outside-init
+        xblock.save()
+        return xblock
+
+    def _fingerprint(self, xblock):
+        """
+        Returns the fingerprint of the explicitly set fields of the given xblock.
+        """
+        return _fingerprint_fields(xblock, _get_explicitly_set_fields(xblock))
+
+    def test_same_fields(self):
+        self.assertEqual(
+            self._fingerprint(self._make_xblock(self.children)),
+            self._fingerprint(self._make_xblock(self.children)),
+        )
+
+    def test_references_to_other_branches(self):
+        published_children = [child.for_branch(ModuleStoreEnum.BranchName.published) for child in self.children]
+        self.assertEqual(
+            self._fingerprint(self._make_xblock(self.children)),
+            self._fingerprint(self._make_xblock(published_children)),
+        )
+
+    def test_changed_fields(self):
+        fingerprint = self._fingerprint(self._make_xblock(self.children))
+        self.assertNotEqual(fingerprint, self._fingerprint(self._make_xblock(self.children[:1])))
+        self.assertNotEqual(fingerprint, self._fingerprint(self._make_xblock(self.children, 'Changed')))
+
+    def test_unchanged_module_not_imported(self):
+        xblock = self._make_xblock(self.children)
+        store = mock.Mock()
+        existing_fingerprints = {('mutablestubxblock', 'stubxblock'): self._fingerprint(xblock)}
+        self.assertIsNone(_update_and_import_module(
+            xblock, store, 999, self.course_key, self.course_key,
+            do_import_static=False, existing_fingerprints=existing_fingerprints,
+        ))
+        self.assertFalse(store.import_xblock.called)
+
+        existing_fingerprints[('mutablestubxblock', 'stubxblock')] = 'changed'
+        _update_and_import_module(
+            xblock, store, 999, self.course_key, self.course_key,
+            do_import_static=False, existing_fingerprints=existing_fingerprints,
+        )
+        self.assertTrue(store.import_xblock.called)
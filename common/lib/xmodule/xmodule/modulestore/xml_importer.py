@@ -20,8 +20,10 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -53,11 +55,23 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Size of the chunks in which static files are streamed to the content store
+# when they are imported by a pool of workers. Matches the GridFS chunk size.
+STATIC_CONTENT_IMPORT_CHUNK_SIZE = 255 * 1024
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
+        target_id, subpath='static', verbose=False, num_workers=None):
+    """
+    Import the static files under course_data_path/subpath into static_content_store,
+    and return the dict of the asset keys of the imported files by import path.
 
+    If num_workers is set, the files are imported by a pool of that many threads, which
+    stream each file to the content store instead of reading it into memory, make the
+    thumbnails from the files on disk, and skip the assets which already exist in the
+    course with the same content and attributes.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -76,75 +90,169 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
+    def _content_paths():
+        """
+        Yield the paths of the static files to import.
+        """
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
+
+                content_path = os.path.join(dirname, filename)
 
-            content_path = os.path.join(dirname, filename)
+                if re.match(ASSET_IGNORE_REGEX, filename):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
+                    continue
 
-            if re.match(ASSET_IGNORE_REGEX, filename):
                 if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
+                    log.debug('importing static content %s...', content_path)
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+                yield content_path
+
+    def _make_content(content_path, data):
+        """
+        Return the StaticContent of the given static file, with the given data.
+        """
+        filename = os.path.basename(content_path)
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+
+        # During export display name is used to create files, strip away slashes from name
+        displayname = escape_invalid_characters(
+            name=policy_ele.get('displayname', filename),
+            invalid_char_list=['/', '\\']
+        )
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+        return StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
 
+    def _save_content(content, tempfile_path=None):
+        """
+        Save the given StaticContent, and its thumbnail, to static_content_store.
+        """
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(
+            content, tempfile_path=tempfile_path
+        )
+
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
+
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                content.import_path, err
+            ))
+
+    if num_workers:
+        existing_assets = {
+            asset['asset_key'].name: asset
+            for asset in static_content_store.get_all_content_for_course(target_id)[0]
+        }
+
+        def _import_file(content_path):
+            """
+            Stream the given static file to static_content_store, unless it already exists
+            with the same content and attributes, and return its StaticContent, or None if
+            it is an unreadable OS X companion file.
+            """
             try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
+                content_file = open(content_path, 'rb')
             except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
+                if os.path.basename(content_path).startswith('._'):
+                    return None
                 raise
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+            with content_file:
+                content = _make_content(content_path, _read_chunks(content_file))
+                if _is_same_asset(existing_assets.get(content.location.name), content, content_file):
+                    log.debug('skipping unchanged static content %s...', content_path)
+                    return content
 
-            policy_ele = policy.get(asset_key.path, {})
+                content_file.seek(0)
+                _save_content(content, tempfile_path=content_path)
+                return content
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        pool = ThreadPool(num_workers)
+        try:
+            for content in pool.imap_unordered(_import_file, _content_paths()):
+                if content is not None:
+                    remap_dict[content.import_path] = content.location
+        finally:
+            pool.terminate()
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+        return remap_dict
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    for content_path in _content_paths():
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if os.path.basename(content_path).startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                continue
+            # Not a 'hidden file', then re-raise exception
+            raise
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+        content = _make_content(content_path, data)
+        _save_content(content)
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+        # store the remapping information which will be needed
+        # to subsitute in the module data
+        remap_dict[content.import_path] = content.location
 
     return remap_dict
 
 
+def _read_chunks(content_file, chunk_size=STATIC_CONTENT_IMPORT_CHUNK_SIZE):
+    """
+    Yield the contents of the given file in chunks of chunk_size bytes.
+    """
+    while True:
+        chunk = content_file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _is_same_asset(existing_asset, content, content_file):
+    """
+    Does the given existing asset (an asset dict, as returned by
+    `get_all_content_for_course`) have the same attributes as the given
+    StaticContent, and the same md5 digest as the given file?
+    """
+    if existing_asset is None:
+        return False
+    if (
+            existing_asset.get('displayname') != content.name or
+            existing_asset.get('contentType') != content.content_type or
+            existing_asset.get('import_path') != content.import_path or
+            existing_asset.get('locked', False) != content.locked
+    ):
+        return False
+
+    digest = hashlib.md5()
+    for chunk in _read_chunks(content_file):
+        digest.update(chunk)
+    return existing_asset.get('md5') == digest.hexdigest()
+
+
 class ImportManager(object):
     """
     Import xml-based courselikes from data_dir into modulestore.
@@ -177,6 +285,13 @@ class ImportManager(object):
             Otherwise, it throws an InvalidLocationError if the courselike does not exist.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_content_workers: If set, the number of threads importing the static files, which are
+            then streamed to static_content_store, and skipped if they are already in it unchanged.
+
+        incremental: If True, then the blocks which already exist, unchanged, in both the draft and
+            published branches of the courselike are not imported again. Blocks are compared by the
+            fingerprints of their explicitly set fields.
     """
     store_class = XMLModuleStore
 
@@ -186,7 +301,7 @@ class ImportManager(object):
             load_error_modules=True, static_content_store=None,
             target_id=None, verbose=False,
             do_import_static=True, create_if_not_present=False,
-            raise_on_failure=False
+            raise_on_failure=False, static_content_workers=None, incremental=False,
     ):
         self.store = store
         self.user_id = user_id
@@ -199,6 +314,8 @@ class ImportManager(object):
         self.do_import_static = do_import_static
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_content_workers = static_content_workers
+        self.incremental = incremental
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -227,7 +344,8 @@ class ImportManager(object):
             # first pass to find everything in /static/
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath='static', verbose=self.verbose
+                dest_id, subpath='static', verbose=self.verbose,
+                num_workers=self.static_content_workers,
             )
 
         elif self.verbose and not self.do_import_static:
@@ -250,7 +368,8 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath=simport, verbose=self.verbose
+                dest_id, subpath=simport, verbose=self.verbose,
+                num_workers=self.static_content_workers,
             )
 
     def import_asset_metadata(self, data_dir, course_id):
@@ -379,6 +498,8 @@ class ImportManager(object):
         all_locs = set(self.xml_module_store.modules[courselike_key].keys())
         all_locs.remove(source_courselike.location)
 
+        existing_fingerprints = self.get_existing_fingerprints(dest_id) if self.incremental else None
+
         def depth_first(subtree):
             """
             Import top down just so import code can make assumptions about parents always being available
@@ -402,6 +523,7 @@ class ImportManager(object):
                         dest_id,
                         do_import_static=self.do_import_static,
                         runtime=courselike.runtime,
+                        existing_fingerprints=existing_fingerprints,
                     )
 
                     depth_first(child)
@@ -420,8 +542,31 @@ class ImportManager(object):
                 dest_id,
                 do_import_static=self.do_import_static,
                 runtime=courselike.runtime,
+                existing_fingerprints=existing_fingerprints,
             )
 
+    def get_existing_fingerprints(self, dest_id):
+        """
+        Return the fingerprints of the blocks of the destination courselike which are the
+        same in its draft and published branches, by (block type, block id).
+        """
+        fingerprints_by_branch = []
+        for branch in (ModuleStoreEnum.Branch.published_only, ModuleStoreEnum.Branch.draft_preferred):
+            with self.store.branch_setting(branch, dest_id):
+                fingerprints_by_branch.append({
+                    (block.location.block_type, block.location.block_id): _fingerprint_fields(
+                        block, _get_explicitly_set_fields(block)
+                    )
+                    for block in self.store.get_items(dest_id, lazy=False)
+                })
+
+        published_fingerprints, draft_fingerprints = fingerprints_by_branch
+        return {
+            block_key: fingerprint
+            for block_key, fingerprint in published_fingerprints.iteritems()
+            if draft_fingerprints.get(block_key) == fingerprint
+        }
+
     def run_imports(self):
         """
         Iterate over the given directories and yield courses.
@@ -668,10 +813,14 @@ def import_library_from_xml(*args, **kwargs):
 def _update_and_import_module(
         module, store, user_id,
         source_course_id, dest_course_id,
-        do_import_static=True, runtime=None):
+        do_import_static=True, runtime=None, existing_fingerprints=None):
     """
     Update all the module reference fields to the destination course id,
     then import the module into the destination course.
+
+    If existing_fingerprints (a dict of the fingerprints of the blocks of the destination
+    course, by (block type, block id)) is given, then the module isn't imported, and None
+    is returned, if it already exists unchanged in the destination course.
     """
     logging.debug(u'processing import of module %s...', unicode(module.location))
 
@@ -739,12 +888,60 @@ def _update_and_import_module(
     fields = _update_module_references(module, source_course_id, dest_course_id)
     asides = module.get_asides() if isinstance(module, XModuleMixin) else None
 
+    # asides aren't fingerprinted, so modules with asides are always imported
+    if existing_fingerprints is not None and not asides:
+        block_key = (module.location.block_type, module.location.block_id)
+        if existing_fingerprints.get(block_key) == _fingerprint_fields(module, fields):
+            log.debug(u'skipping unchanged module %s', unicode(module.location))
+            return None
+
     return store.import_xblock(
         user_id, dest_course_id, module.location.category,
         module.location.block_id, fields, runtime, asides=asides
     )
 
 
+def _get_explicitly_set_fields(block):
+    """
+    Return the values of the explicitly set fields of the given block, by field name.
+    """
+    return {
+        field_name: field.read_from(block)
+        for field_name, field in block.fields.iteritems()
+        if field.scope != Scope.parent and field.is_set_on(block)
+    }
+
+
+def _fingerprint_fields(block, fields):
+    """
+    Return a fingerprint of the given values of the fields of the given block, which
+    doesn't depend on the course, branch or version of the blocks they reference.
+    """
+    def _reference_key(reference):
+        """
+        Return the part of a reference which is fingerprinted.
+        """
+        return None if reference is None else [reference.block_type, reference.block_id]
+
+    serialized_fields = {}
+    for field_name, value in fields.iteritems():
+        field = block.fields[field_name]
+        if isinstance(field, Reference):
+            serialized_fields[field_name] = _reference_key(value)
+        elif isinstance(field, ReferenceList):
+            serialized_fields[field_name] = [_reference_key(reference) for reference in value]
+        elif isinstance(field, ReferenceValueDict):
+            serialized_fields[field_name] = {
+                key: _reference_key(reference) for key, reference in value.iteritems()
+            }
+        else:
+            serialized_fields[field_name] = field.to_json(value)
+
+    return hashlib.sha1(json.dumps(
+        [block.location.block_type, serialized_fields], sort_keys=True, default=unicode
+    )).hexdigest()
+
+
 def _import_course_draft(
         xml_module_store,
         store,
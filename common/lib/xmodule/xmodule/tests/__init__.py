@@ -86,7 +86,7 @@ class TestModuleSystem(ModuleSystem):  # pylint: disable=abstract-method
         return rt_repr
 
 
-def get_test_system(course_id=SlashSeparatedCourseKey('org', 'course', 'run')):
+def get_test_system(course_id=SlashSeparatedCourseKey('org', 'course', 'run'), cache=None):
     """
     Construct a test ModuleSystem instance.
 
@@ -145,6 +145,7 @@ def get_test_system(course_id=SlashSeparatedCourseKey('org', 'course', 'run')):
         get_user_role=Mock(name='get_test_system.get_user_role', is_staff=False),
         user_location=Mock(name='get_test_system.user_location'),
         descriptor_runtime=descriptor_system,
+        cache=cache,
     )
 
 
@@ -31,6 +31,7 @@ from xblock.fields import ScopeIds
 from . import get_test_system
 from pytz import UTC
 from capa.correctmap import CorrectMap
+from capa.safe_exec import SafeExecCache
 from ..capa_base_constants import RANDOMIZATION
 
 
@@ -207,6 +208,34 @@ class CapaModuleTest(unittest.TestCase):
         self.assertNotEqual(module.url_name, other_module.url_name,
                             "Factory should be creating unique names for each problem")
 
+    def test_safe_exec_cache(self):
+        """
+        Check that the scripts of problems are run through the safe_exec cache of the runtime.
+        """
+        xml = textwrap.dedent("""\
+            <problem>
+            <script type="loncapa/python">answer = 6 * 7</script>
+            <stringresponse answer="$answer"><textline/></stringresponse>
+            </problem>
+        """)
+        system = get_test_system(cache=SafeExecCache())
+        system.filestore.root_path = DATA_DIR
+        system.render_template = Mock(return_value="<div>Test Template HTML</div>")
+        self.assertIsInstance(system.cache, SafeExecCache)
+
+        for tier_hits in ([], [(('capa.safe_exec.cache.hit',), {'tags': ['tier:local']})]):
+            location = Location("edX", "capa_test", "2012_Fall", "problem", "SafeExecCache", None)
+            with patch('capa.safe_exec.cache.dog_stats_api') as mock_dog_stats_api:
+                module = CapaModule(
+                    Mock(weight="1"), system, DictFieldData({'data': xml}), ScopeIds(None, None, location, location)
+                )
+            hits = [
+                call for call in mock_dog_stats_api.increment.call_args_list
+                if call[0][0] == 'capa.safe_exec.cache.hit'
+            ]
+            self.assertEqual(hits, tier_hits)
+            self.assertEqual(module.lcp.context['answer'], 42)
+
     def test_correct(self):
         """
         Check that the factory creates correct and incorrect problems properly.
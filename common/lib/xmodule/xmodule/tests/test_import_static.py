@@ -1,8 +1,9 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
-from mock import Mock
+from mock import ANY, Mock
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -39,3 +40,58 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class StaticContentWorkersTestCase(unittest.TestCase):
+    """
+    Tests for importing static files with a pool of workers.
+    """
+    def setUp(self):
+        super(StaticContentWorkersTestCase, self).setUp()
+        self.course_dir = DATA_DIR / "dot-underscore"
+        self.course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
+        self.saved_data = {}
+        self.content_store = Mock()
+        self.content_store.generate_thumbnail.return_value = (None, None)
+        self.content_store.get_all_content_for_course.return_value = ([], 0)
+        self.content_store.save.side_effect = self._save
+
+    def _save(self, content):
+        """
+        Consumes the streamed data of the saved content.
+        """
+        self.saved_data[content.name] = ''.join(content.data)
+
+    def _existing_asset(self, name, data):
+        """
+        Returns the asset dict of an existing text asset.
+        """
+        return {
+            'asset_key': self.course_id.make_asset_key('asset', name),
+            'displayname': name,
+            'contentType': 'text/plain',
+            'import_path': name,
+            'md5': hashlib.md5(data).hexdigest(),
+        }
+
+    def test_import_with_workers(self):
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id, num_workers=2)
+        self.assertEqual(set(remap_dict), {"example.txt", ".example.txt"})
+        self.assertEqual(set(self.saved_data), {"example.txt", ".example.txt"})
+        self.assertIn("GREEN", self.saved_data["example.txt"])
+        self.assertIn("BLUE", self.saved_data[".example.txt"])
+        self.content_store.generate_thumbnail.assert_any_call(
+            ANY,
+            tempfile_path=self.course_dir / "static" / "example.txt",
+        )
+
+    def test_import_with_workers_skips_unchanged_assets(self):
+        with open(self.course_dir / "static" / "example.txt", 'rb') as example_file:
+            example_data = example_file.read()
+        self.content_store.get_all_content_for_course.return_value = ([
+            self._existing_asset("example.txt", example_data),
+            self._existing_asset(".example.txt", "changed"),
+        ], 2)
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id, num_workers=2)
+        self.assertEqual(set(remap_dict), {"example.txt", ".example.txt"})
+        self.assertEqual(set(self.saved_data), {".example.txt"})
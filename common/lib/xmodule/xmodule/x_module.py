@@ -1764,7 +1764,7 @@ class ModuleSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):
         if publish:
             self.publish = publish
 
-        self.cache = cache or DoNothingCache()
+        self.cache = cache if cache is not None else DoNothingCache()
         self.can_execute_unsafe_code = can_execute_unsafe_code or (lambda: False)
         self.get_python_lib_zip = get_python_lib_zip or (lambda: None)
         self.replace_course_urls = replace_course_urls
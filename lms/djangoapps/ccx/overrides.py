@@ -4,12 +4,15 @@ by the individual custom courses feature.
 """
 import json
 import logging
+import time
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 import request_cache
 
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import FieldOverrideProvider, clear_override_cache
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from ccx_keys.locator import CCXLocator, CCXBlockUsageLocator
 
@@ -29,26 +32,20 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
         """
         Just call the get_override_for_ccx method if there is a ccx
         """
-        # The incoming block might be a CourseKey instance of some type, a
-        # UsageKey instance of some type, or it might be something that has a
-        # location attribute.  That location attribute will be a UsageKey
-        ccx = course_key = None
-        identifier = getattr(block, 'id', None)
-        if isinstance(identifier, CourseKey):
-            course_key = block.id
-        elif isinstance(identifier, UsageKey):
-            course_key = block.id.course_key
-        elif hasattr(block, 'location'):
-            course_key = block.location.course_key
-        else:
-            msg = "Unable to get course id when calculating ccx overide for block type %r"
-            log.error(msg, type(block))
-        if course_key is not None:
-            ccx = get_current_ccx(course_key)
+        ccx = _get_ccx_for_block(block)
         if ccx:
             return get_override_for_ccx(ccx, block, name, default)
         return default
 
+    def overridden_fields(self, block):
+        """
+        Returns the names of the fields overridden on any block of the ccx.
+        """
+        ccx = _get_ccx_for_block(block)
+        if not ccx:
+            return frozenset()
+        return frozenset(name for block_overrides in _get_overrides_for_ccx(ccx).itervalues() for name in block_overrides)
+
     @classmethod
     def enabled_for(cls, block):
         """
@@ -57,6 +54,29 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
         return getattr(block.location, 'ccx', None) or getattr(block, 'enable_ccx', False)
 
 
+def _get_ccx_for_block(block):
+    """
+    Return the ccx that is active for the course of the given block, if any.
+    """
+    # The incoming block might be a CourseKey instance of some type, a
+    # UsageKey instance of some type, or it might be something that has a
+    # location attribute.  That location attribute will be a UsageKey
+    course_key = None
+    identifier = getattr(block, 'id', None)
+    if isinstance(identifier, CourseKey):
+        course_key = block.id
+    elif isinstance(identifier, UsageKey):
+        course_key = block.id.course_key
+    elif hasattr(block, 'location'):
+        course_key = block.location.course_key
+    else:
+        msg = "Unable to get course id when calculating ccx overide for block type %r"
+        log.error(msg, type(block))
+    if course_key is not None:
+        return get_current_ccx(course_key)
+    return None
+
+
 def get_current_ccx(course_key):
     """
     Return the ccx that is active for this course.
@@ -85,9 +105,7 @@ def get_override_for_ccx(ccx, block, name, default=None):
     """
     overrides = _get_overrides_for_ccx(ccx)
 
-    clean_ccx_key = _clean_ccx_key(block.location)
-
-    block_overrides = overrides.get(clean_ccx_key, {})
+    block_overrides = overrides.get(_ccx_override_key(block.location), {})
     if name in block_overrides:
         try:
             return block.fields[name].from_json(block_overrides[name])
@@ -112,30 +130,88 @@ def _clean_ccx_key(block_location):
     return clean_key.version_agnostic().for_branch(None)
 
 
+def _ccx_override_key(block_location):
+    """
+    Returns the key of the overrides of the block at the given location in
+    the CCX overrides map: its cleaned location, serialized.
+    """
+    return unicode(_clean_ccx_key(block_location))
+
+
 def _get_overrides_for_ccx(ccx):
     """
     Returns a dictionary mapping field name to overriden value for any
     overrides set on this block for this CCX.
+
+    The overrides of each block are keyed by the serialized, cleaned location
+    of the block (see `_ccx_override_key`).  Besides its JSON value, the id of
+    the CcxFieldOverride of each field is stored under the field name
+    suffixed with "_id".
+
+    The overrides are loaded from a shared cache, keyed by the CCX id and the
+    version of its overrides, and otherwise from the database.
     """
     overrides_cache = request_cache.get_cache('ccx-overrides')
 
     if ccx not in overrides_cache:
-        overrides = {}
-        query = CcxFieldOverride.objects.filter(
-            ccx=ccx,
-        )
+        shared_cache_key = _ccx_overrides_cache_key(ccx.id)
+        overrides = cache.get(shared_cache_key)
+        if overrides is None:
+            overrides = {}
+            query = CcxFieldOverride.objects.filter(
+                ccx=ccx,
+            )
 
-        for override in query:
-            block_overrides = overrides.setdefault(override.location, {})
-            block_overrides[override.field] = json.loads(override.value)
-            block_overrides[override.field + "_id"] = override.id
-            block_overrides[override.field + "_instance"] = override
+            for override in query:
+                block_overrides = overrides.setdefault(_ccx_override_key(override.location), {})
+                block_overrides[override.field] = json.loads(override.value)
+                block_overrides[override.field + "_id"] = override.id
+
+            cache.set(shared_cache_key, overrides, settings.CCX_OVERRIDES_CACHE_TIMEOUT)
 
         overrides_cache[ccx] = overrides
 
     return overrides_cache[ccx]
 
 
+def _ccx_overrides_version_key(ccx_id):
+    """
+    Returns the shared cache key of the version of the overrides of a CCX.
+    """
+    return u'ccx-overrides-version.{}'.format(ccx_id)
+
+
+def _ccx_overrides_cache_key(ccx_id):
+    """
+    Returns the shared cache key of the current version of the overrides of
+    a CCX.
+
+    The version is initialized from the current time, rather than from 0,
+    so that a version evicted from the cache cannot be reused with stale
+    overrides.
+    """
+    version_key = _ccx_overrides_version_key(ccx_id)
+    version = cache.get(version_key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    return u'ccx-overrides.{}.{}'.format(ccx_id, version)
+
+
+def _bump_ccx_overrides_version(ccx):
+    """
+    Invalidates the shared cache of the overrides of the given CCX by
+    atomically incrementing the version of its overrides.
+    """
+    version_key = _ccx_overrides_version_key(ccx.id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # The version is not in the cache: start a new one.
+        cache.set(version_key, int(time.time() * 1000), None)
+
+
 @transaction.atomic
 def override_field_for_ccx(ccx, block, name, value):
     """
@@ -147,30 +223,31 @@ def override_field_for_ccx(ccx, block, name, value):
     value_json = field.to_json(value)
     serialized_value = json.dumps(value_json)
     override_has_changes = False
-    clean_ccx_key = _clean_ccx_key(block.location)
+    block_overrides = _get_overrides_for_ccx(ccx).setdefault(_ccx_override_key(block.location), {})
 
-    override = get_override_for_ccx(ccx, block, name + "_instance")
-    if override:
-        override_has_changes = serialized_value != override.value
-
-    if not override:
+    override_id = block_overrides.get(name + "_id")
+    if override_id:
+        override_has_changes = value_json != block_overrides.get(name)
+    else:
         override, created = CcxFieldOverride.objects.get_or_create(
             ccx=ccx,
             location=block.location,
             field=name,
             defaults={'value': serialized_value},
         )
+        override_id = override.id
+        block_overrides[name + "_id"] = override_id
         if created:
-            _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_id"] = override.id
+            _bump_ccx_overrides_version(ccx)
         else:
             override_has_changes = serialized_value != override.value
 
     if override_has_changes:
-        override.value = serialized_value
-        override.save()
+        CcxFieldOverride.objects.filter(id=override_id).update(value=serialized_value)
+        _bump_ccx_overrides_version(ccx)
 
-    _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
-    _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    block_overrides[name] = value_json
+    clear_override_cache()
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -187,6 +264,7 @@ def clear_override_for_ccx(ccx, block, name):
             field=name).delete()
 
         clear_ccx_field_info_from_ccx_map(ccx, block, name)
+        _bump_ccx_overrides_version(ccx)
 
     except CcxFieldOverride.DoesNotExist:
         pass
@@ -197,13 +275,12 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):  # pylint: disable=inva
     Remove field information from ccx overrides mapping dictionary
     """
     try:
-        clean_ccx_key = _clean_ccx_key(block.location)
-        ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})
+        ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(_ccx_override_key(block.location), {})
         ccx_override_map.pop(name)
         ccx_override_map.pop(name + "_id")
-        ccx_override_map.pop(name + "_instance")
     except KeyError:
         pass
+    clear_override_cache()
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
@@ -214,3 +291,5 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        _bump_ccx_overrides_version(ccx)
+        clear_override_cache()
@@ -21,7 +21,12 @@ from xmodule.modulestore.tests.django_utils import (
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from lms.djangoapps.ccx.models import CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.overrides import (
+    bulk_delete_ccx_override_fields,
+    clear_override_for_ccx,
+    get_override_for_ccx,
+    override_field_for_ccx,
+)
 
 from lms.djangoapps.ccx.tests.utils import flatten, iter_blocks
 
@@ -173,3 +178,54 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+
+@attr('shard_1')
+class TestFieldOverridesSharedCache(TestFieldOverrides):
+    """
+    Make sure field overrides behave in the expected manner when they are
+    cached across requests.
+    """
+    ENABLED_CACHES = ['default']
+
+    def _get_start_in_new_request(self, block):
+        """
+        Returns the overridden start date of the block, as read by a new request.
+        """
+        RequestCache.clear_request_cache()
+        return get_override_for_ccx(self.ccx, block, 'start')
+
+    def test_overrides_read_from_shared_cache(self):
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get_start_in_new_request(chapter), ccx_start)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_start_in_new_request(chapter), ccx_start)
+
+    def test_override_invalidates_shared_cache(self):
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        new_ccx_start = datetime.datetime(2015, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        self.assertEqual(self._get_start_in_new_request(chapter), ccx_start)
+        override_field_for_ccx(self.ccx, chapter, 'start', new_ccx_start)
+        self.assertEqual(self._get_start_in_new_request(chapter), new_ccx_start)
+
+    def test_clear_invalidates_shared_cache(self):
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        self.assertEqual(self._get_start_in_new_request(chapter), ccx_start)
+        clear_override_for_ccx(self.ccx, chapter, 'start')
+        self.assertIsNone(self._get_start_in_new_request(chapter))
+
+    def test_bulk_delete_invalidates_shared_cache(self):
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        override_id = get_override_for_ccx(self.ccx, chapter, 'start_id')
+        self.assertEqual(self._get_start_in_new_request(chapter), ccx_start)
+        bulk_delete_ccx_override_fields(self.ccx, [override_id])
+        self.assertIsNone(self._get_start_in_new_request(chapter))
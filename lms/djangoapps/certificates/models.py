@@ -498,37 +498,55 @@ def certificate_status_for_student(student, course_id):
     If the student has been graded, the dictionary also contains their
     grade for the course with the key "grade".
     '''
-    # Import here instead of top of file since this module gets imported before
-    # the course_modes app is loaded, resulting in a Django deprecation warning.
-    from course_modes.models import CourseMode
-
     try:
         generated_certificate = GeneratedCertificate.objects.get(  # pylint: disable=no-member
             user=student, course_id=course_id)
-        cert_status = {
-            'status': generated_certificate.status,
-            'mode': generated_certificate.mode,
-            'uuid': generated_certificate.verify_uuid,
-        }
-        if generated_certificate.grade:
-            cert_status['grade'] = generated_certificate.grade
+    except GeneratedCertificate.DoesNotExist:
+        generated_certificate = None
+    return certificate_status(generated_certificate)
 
-        if generated_certificate.mode == 'audit':
-            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(course_id)]
-            # Short term fix to make sure old audit users with certs still see their certs
-            # only do this if there if no honor mode
-            if 'honor' not in course_mode_slugs:
-                cert_status['status'] = CertificateStatuses.auditing
-                return cert_status
 
-        if generated_certificate.status == CertificateStatuses.downloadable:
-            cert_status['download_url'] = generated_certificate.download_url
+def certificate_status(generated_certificate, course_modes=None):
+    """
+    Returns the status dictionary described in `certificate_status_for_student`
+    for the given certificate, which is None if the student has none.
+
+    Arguments:
+        generated_certificate (GeneratedCertificate): The certificate, or None.
+        course_modes (list of `Mode`): If provided, the non-expired course
+            modes of the certificate's course, as returned by
+            `CourseMode.modes_for_course`.  This can be used to avoid an
+            additional database query for audit certificates.
+    """
+    # Import here instead of top of file since this module gets imported before
+    # the course_modes app is loaded, resulting in a Django deprecation warning.
+    from course_modes.models import CourseMode
 
-        return cert_status
+    if generated_certificate is None:
+        return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
 
-    except GeneratedCertificate.DoesNotExist:
-        pass
-    return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+    cert_status = {
+        'status': generated_certificate.status,
+        'mode': generated_certificate.mode,
+        'uuid': generated_certificate.verify_uuid,
+    }
+    if generated_certificate.grade:
+        cert_status['grade'] = generated_certificate.grade
+
+    if generated_certificate.mode == 'audit':
+        if course_modes is None:
+            course_modes = CourseMode.modes_for_course(generated_certificate.course_id)
+        course_mode_slugs = [mode.slug for mode in course_modes]
+        # Short term fix to make sure old audit users with certs still see their certs
+        # only do this if there if no honor mode
+        if 'honor' not in course_mode_slugs:
+            cert_status['status'] = CertificateStatuses.auditing
+            return cert_status
+
+    if generated_certificate.status == CertificateStatuses.downloadable:
+        cert_status['download_url'] = generated_certificate.download_url
+
+    return cert_status
 
 
 def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
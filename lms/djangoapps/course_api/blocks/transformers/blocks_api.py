@@ -1,6 +1,7 @@
 """
 Blocks API Transformer
 """
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
 from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
 from .block_counts import BlockCountsTransformer
 from .block_depth import BlockDepthTransformer
@@ -36,6 +37,21 @@ class BlocksAPITransformer(BlockStructureTransformer):
     def name(cls):
         return "blocks_api"
 
+    @classmethod
+    def collected_data_dependencies(cls):
+        """
+        The containing transformers store their collected data under
+        their own names, and the Course Blocks API serializes the staff
+        visibility collected by the VisibilityTransformer.
+        """
+        return [
+            StudentViewTransformer,
+            BlockCountsTransformer,
+            BlockDepthTransformer,
+            BlockNavigationTransformer,
+            VisibilityTransformer,
+        ]
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -28,6 +28,10 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+OVERRIDE_RESOLUTION_CACHE_KEY = u'courseware.field_overrides.resolved'
+# Maximum number of users whose resolved overrides are kept in the request
+# cache, so that tasks which go through many users don't accumulate them.
+OVERRIDE_RESOLUTION_CACHE_MAX_USERS = 10
 
 
 def resolve_dotted(name):
@@ -49,17 +53,6 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
-
-
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -90,6 +83,15 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+def clear_override_cache():
+    """
+    Clears the overrides resolved by `OverrideFieldData` in the current
+    request.  Must be called by the APIs which set or clear overrides, so
+    that the new overrides are in effect for the rest of the request.
+    """
+    RequestCache.get_request_cache().data.pop(OVERRIDE_RESOLUTION_CACHE_KEY, None)
+
+
 class FieldOverrideProvider(object):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -130,6 +132,19 @@ class FieldOverrideProvider(object):
         """
         return False
 
+    def overridden_fields(self, block):  # pylint: disable=unused-argument
+        """
+        Return the names of all the fields which this provider may override
+        on any block of the course of `block`, or None if any field may be
+        overridden.  Fields which are not in this set are never looked up
+        in this provider.
+
+        Concrete implementations may implement this method to spare
+        `OverrideFieldData` from calling `get` for fields which they never
+        override.
+        """
+        return None
+
 
 class OverrideFieldData(FieldData):
     """
@@ -198,19 +213,95 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user) for provider in providers)
+        # Overrides only depend on the user and the providers, so they are
+        # shared in the request cache by the instances for the same user.
+        self._resolution_cache_key = (getattr(user, 'id', user), tuple(providers))
+
+    def _resolution_cache(self):
+        """
+        Returns the request cache of the overrides resolved for the user and
+        providers of this instance.
+        """
+        cache = RequestCache.get_request_cache(OVERRIDE_RESOLUTION_CACHE_KEY)
+        if self._resolution_cache_key not in cache:
+            if len(cache) >= OVERRIDE_RESOLUTION_CACHE_MAX_USERS:
+                cache.clear()
+            cache[self._resolution_cache_key] = {}
+        return cache[self._resolution_cache_key]
+
+    def _overridden_fields(self, block):
+        """
+        Returns, for each provider, the names of the fields it may override
+        in the course of `block`, or None if it may override any field.
+        """
+        course_key = getattr(getattr(block, 'location', None), 'course_key', None)
+        cache = self._resolution_cache()
+        cache_key = ('overridden_fields', course_key)
+        if cache_key not in cache:
+            cache[cache_key] = tuple(provider.overridden_fields(block) for provider in self.providers)
+        return cache[cache_key]
+
+    def _may_be_overridden(self, block, name):
+        """
+        Returns whether any provider may override the field identified by
+        `name` on any block in the course of `block`.
+        """
+        return any(fields is None or name in fields for fields in self._overridden_fields(block))
 
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
         Returns the overridden value or `NOTSET` if no override is found.
         """
-        if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
-                if value is not NOTSET:
-                    return value
+        if overrides_disabled():
+            return NOTSET
+
+        location = getattr(block, 'location', None)
+        if location is None:
+            return self._get_provider_override(block, name)
+
+        cache = self._resolution_cache()
+        cache_key = ('override', location, name)
+        if cache_key not in cache:
+            cache[cache_key] = self._get_provider_override(block, name)
+        return cache[cache_key]
+
+    def _get_provider_override(self, block, name):
+        """
+        Asks the providers which may override the field identified by `name`
+        for an override in `block`.  Returns the value of the first override
+        found, or `NOTSET`.
+        """
+        for provider, fields in zip(self.providers, self._overridden_fields(block)):
+            if fields is not None and name not in fields:
+                continue
+            value = provider.get(block, name, NOTSET)
+            if value is not NOTSET:
+                return value
         return NOTSET
 
+    def _get_inherited_override(self, block, name):
+        """
+        Returns the override for the inheritable field identified by `name`
+        in the closest ancestor of `block` which has one, or `NOTSET`.
+        """
+        location = getattr(block, 'location', None)
+        cache = self._resolution_cache()
+        cache_key = ('inherited_override', location, name)
+        if location is not None and cache_key in cache:
+            return cache[cache_key]
+
+        value = NOTSET
+        parent = block.get_parent()
+        if parent:
+            value = self.get_override(parent, name)
+            if value is NOTSET:
+                value = self._get_inherited_override(parent, name)
+
+        if location is not None:
+            cache[cache_key] = value
+        return value
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -227,16 +318,17 @@ class OverrideFieldData(FieldData):
         if not self.providers:
             return self.fallback.has(block, name)
 
+        if overrides_disabled() or not self._may_be_overridden(block, name):
+            return self.fallback.has(block, name)
+
         has = self.get_override(block, name)
         if has is NOTSET:
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in InheritanceMixin.fields:
+                if self._get_inherited_override(block, name) is not NOTSET:
+                    return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -247,12 +339,10 @@ class OverrideFieldData(FieldData):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
         if self.providers and not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+            if name in InheritanceMixin.fields and self._may_be_overridden(block, name):
+                value = self._get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
 
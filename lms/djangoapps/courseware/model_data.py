@@ -988,6 +988,29 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids):
+        """
+        Create ScoresClients, keyed by user id, with pre-fetched data for all
+        the scores of the given users in the course, using a single query.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        # Rows without a max_grade are treated the same as missing rows by
+        # the graders, so there is no need to load them.
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=clients.keys(),
+            course_id=course_id,
+            max_grade__isnull=False,
+        )
+        for user_id, location, correct, total in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade'
+        ):
+            usage_key = UsageKey.from_string(location).map_into_course(course_id)
+            clients[user_id]._locations_to_scores[usage_key] = cls.Score(correct, total)  # pylint: disable=protected-access
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
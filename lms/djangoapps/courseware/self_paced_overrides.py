@@ -23,6 +23,10 @@ class SelfPacedDateOverrideProvider(FieldOverrideProvider):
 
         return default
 
+    def overridden_fields(self, block):
+        """Only due dates and release dates are overridden."""
+        return frozenset(['due', 'start'])
+
     @classmethod
     def enabled_for(cls, block):
         """This provider is enabled for self-paced courses only."""
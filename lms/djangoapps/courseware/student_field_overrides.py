@@ -4,10 +4,17 @@ by the individual due dates feature.
 """
 import json
 
-from .field_overrides import FieldOverrideProvider
+from django.conf import settings
+
+import request_cache
+
+from .field_overrides import FieldOverrideProvider, clear_override_cache
 from .models import StudentFieldOverride
 
 
+INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER = 'courseware.student_field_overrides.IndividualStudentOverrideProvider'
+
+
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of
@@ -17,12 +24,28 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def overridden_fields(self, block):
+        """
+        Returns the names of the fields overridden for the user on any block
+        of the course.
+        """
+        course_overrides = _get_overrides_for_course(self.user.id, block.runtime.course_id)
+        return frozenset(name for block_overrides in course_overrides.itervalues() for name in block_overrides)
+
     @classmethod
     def enabled_for(cls, course):
         """This simple override provider is always enabled"""
         return True
 
 
+def is_individual_overrides_provider_enabled():
+    """
+    Returns whether the IndividualStudentOverrideProvider is one of the
+    configured field override providers.
+    """
+    return INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER in getattr(settings, 'FIELD_OVERRIDE_PROVIDERS', ())
+
+
 def get_override_for_user(user, block, name, default=None):
     """
     Gets the value of the overridden field for the `user`.  `block` and `name`
@@ -43,19 +66,83 @@ def _get_overrides_for_user(user, block):
     Gets all of the individual student overrides for given user and block.
     Returns a dictionary of field override values keyed by field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
+    course_overrides = _get_overrides_for_course(user.id, block.runtime.course_id)
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for name, value in course_overrides.get(_location_key(block.location), {}).iteritems():
+        field = block.fields[name]
+        overrides[name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _get_overrides_for_course(user_id, course_key):
+    """
+    Gets all of the individual student overrides of the given user in the
+    given course, with a single query for the whole course.  Returns a
+    dictionary of the serialized override values of each block, keyed by
+    `_location_key` and then by field name.
+
+    The overrides are kept in the request cache, where they may have been
+    prefetched by `prefetch_overrides_for_users`.
+    """
+    overrides_cache = request_cache.get_cache('student-field-overrides')
+    cache_key = (user_id, course_key)
+    if cache_key not in overrides_cache:
+        prefetch_overrides_for_users(course_key, [user_id])
+    return overrides_cache[cache_key]
+
+
+def prefetch_overrides_for_users(course_key, users):
+    """
+    Loads all of the individual student overrides of the given users in the
+    given course into the request cache, with a single query.  `users` may
+    be users or user ids.
+
+    This lets code which renders or grades the course for many users, such
+    as instructor tasks, avoid one query per user and per block.
+    """
+    user_ids = [getattr(user, 'id', user) for user in users]
+    overrides_cache = request_cache.get_cache('student-field-overrides')
+    overrides_by_user = {user_id: {} for user_id in user_ids}
+    query = StudentFieldOverride.objects.filter(course_id=course_key)
+    if len(user_ids) == 1:
+        query = query.filter(student_id=user_ids[0])
+    else:
+        query = query.filter(student_id__in=user_ids)
+    for override in query:
+        block_overrides = overrides_by_user[override.student_id].setdefault(_location_key(override.location), {})
+        block_overrides[override.field] = override.value
+    for user_id, overrides in overrides_by_user.iteritems():
+        overrides_cache[(user_id, course_key)] = overrides
+
+
+def _location_key(location):
+    """
+    Returns the key of the overrides of the block at `location` in the
+    cached overrides: the location as it is stored in the database, without
+    any branch or version.
+    """
+    if hasattr(location, 'version_agnostic') and hasattr(location, 'for_branch'):
+        location = location.for_branch(None).version_agnostic()
+    return unicode(location)
+
+
+def _update_cached_overrides(user, block, name, value=None):
+    """
+    Updates the request cached overrides of the `user` for the field `name`
+    of `block` to the serialized `value`, or removes it if `value` is None.
+    """
+    overrides_cache = request_cache.get_cache('student-field-overrides')
+    course_overrides = overrides_cache.get((user.id, block.runtime.course_id))
+    if course_overrides is not None:
+        block_overrides = course_overrides.setdefault(_location_key(block.location), {})
+        if value is None:
+            block_overrides.pop(name, None)
+        else:
+            block_overrides[name] = value
+    getattr(block, '_student_overrides', {}).pop(user.id, None)
+    clear_override_cache()
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -70,6 +157,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _update_cached_overrides(user, block, name, override.value)
 
 
 def clear_override_for_user(user, block, name):
@@ -87,3 +175,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _update_cached_overrides(user, block, name)
@@ -3,15 +3,18 @@ Tests for `field_overrides` module.
 """
 # pylint: disable=missing-docstring
 import unittest
+from mock import Mock
 from nose.plugins.attrib import attr
 
 from django.test.utils import override_settings
 from xblock.field_data import DictFieldData
+from request_cache.middleware import RequestCache
 from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
 from ..field_overrides import (
     resolve_dotted,
+    clear_override_cache,
     disable_overrides,
     FieldOverrideProvider,
     OverrideFieldData,
@@ -142,6 +145,86 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         self.assertIsInstance(data, DictFieldData)
 
 
+class TestDueDateOverrideProvider(FieldOverrideProvider):
+    """
+    A `FieldOverrideProvider` which overrides the due dates of the blocks in
+    `overrides`, and records the blocks it is asked about.
+    """
+    overrides = {}
+    calls = []
+
+    def get(self, block, name, default):
+        self.calls.append((block.location, name))
+        if name == 'due':
+            return self.overrides.get(block.location, default)
+        return default
+
+    def overridden_fields(self, block):
+        return frozenset(['due'])
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+@attr('shard_1')
+class OverrideFieldDataResolutionTests(unittest.TestCase):
+    """
+    Tests for the caching of the overrides resolved by `OverrideFieldData`.
+    """
+    def setUp(self):
+        super(OverrideFieldDataResolutionTests, self).setUp()
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+        TestDueDateOverrideProvider.overrides = {}
+        TestDueDateOverrideProvider.calls = []
+
+        self.chapter = self.make_block(None)
+        self.sequential = self.make_block(self.chapter)
+        self.vertical = self.make_block(self.sequential)
+        fallback = Mock()
+        fallback.has.return_value = False
+        fallback.default.return_value = 'never'
+        self.data = OverrideFieldData(TESTUSER, fallback, (TestDueDateOverrideProvider,))
+
+    def make_block(self, parent):
+        """
+        Returns a mock block with the given parent.
+        """
+        block = Mock(location=Mock(course_key='course'))
+        block.get_parent.return_value = parent
+        return block
+
+    def test_inherited_override(self):
+        TestDueDateOverrideProvider.overrides[self.chapter.location] = 'tomorrow'
+        self.assertEqual(self.data.default(self.vertical, 'due'), 'tomorrow')
+        self.assertFalse(self.data.has(self.vertical, 'due'))
+        self.assertEqual(self.data.default(self.sequential, 'due'), 'tomorrow')
+
+    def test_overrides_resolved_once(self):
+        self.data.default(self.vertical, 'due')
+        self.data.has(self.vertical, 'due')
+        self.data.default(self.sequential, 'due')
+        self.assertEqual(len(TestDueDateOverrideProvider.calls), 3)
+
+    def test_fields_not_overridden_skip_providers(self):
+        self.assertEqual(self.data.default(self.vertical, 'start'), 'never')
+        self.assertFalse(self.data.has(self.vertical, 'start'))
+        self.assertEqual(TestDueDateOverrideProvider.calls, [])
+
+    def test_clear_override_cache(self):
+        self.assertEqual(self.data.default(self.vertical, 'due'), 'never')
+        TestDueDateOverrideProvider.overrides[self.sequential.location] = 'tomorrow'
+        clear_override_cache()
+        self.assertEqual(self.data.default(self.vertical, 'due'), 'tomorrow')
+
+    def test_disabled_overrides_not_cached(self):
+        TestDueDateOverrideProvider.overrides[self.vertical.location] = 'tomorrow'
+        with disable_overrides():
+            self.assertFalse(self.data.has(self.vertical, 'due'))
+        self.assertTrue(self.data.has(self.vertical, 'due'))
+
+
 @attr('shard_1')
 class ResolveDottedTests(unittest.TestCase):
     """
@@ -0,0 +1,83 @@
+"""
+Tests for `student_field_overrides` module.
+"""
+import datetime
+
+from django.test.utils import override_settings
+from django.utils.timezone import utc
+from nose.plugins.attrib import attr
+
+from courseware.student_field_overrides import (
+    clear_override_for_user,
+    get_override_for_user,
+    is_individual_overrides_provider_enabled,
+    override_field_for_user,
+    prefetch_overrides_for_users,
+)
+from request_cache.middleware import RequestCache
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+@attr('shard_1')
+class StudentFieldOverridesTest(ModuleStoreTestCase):
+    """
+    Tests for the individual student overrides API.
+    """
+    def setUp(self):
+        super(StudentFieldOverridesTest, self).setUp()
+        self.due = datetime.datetime(2010, 5, 12, 2, 42, tzinfo=utc)
+        self.extended = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=utc)
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter', due=self.due)
+        self.sequentials = [
+            ItemFactory.create(parent=self.chapter, category='sequential', due=self.due) for __ in range(3)
+        ]
+        self.users = [UserFactory.create() for __ in range(2)]
+        for user in self.users:
+            for sequential in self.sequentials:
+                override_field_for_user(user, sequential, 'due', self.extended)
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_one_query_per_course(self):
+        with self.assertNumQueries(1):
+            for block in [self.chapter] + self.sequentials:
+                get_override_for_user(self.users[0], block, 'due')
+        self.assertEqual(get_override_for_user(self.users[0], self.sequentials[0], 'due'), self.extended)
+        self.assertIsNone(get_override_for_user(self.users[0], self.chapter, 'due'))
+
+    def test_prefetch_for_users(self):
+        with self.assertNumQueries(1):
+            prefetch_overrides_for_users(self.course.id, self.users)
+        with self.assertNumQueries(0):
+            for user in self.users:
+                for sequential in self.sequentials:
+                    self.assertEqual(get_override_for_user(user, sequential, 'due'), self.extended)
+
+    def test_prefetch_user_without_overrides(self):
+        user = UserFactory.create()
+        prefetch_overrides_for_users(self.course.id, [user])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_override_for_user(user, self.sequentials[0], 'due', 'default'), 'default')
+
+    def test_override_updates_cached_overrides(self):
+        get_override_for_user(self.users[0], self.chapter, 'due')
+        override_field_for_user(self.users[0], self.chapter, 'due', self.extended)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_override_for_user(self.users[0], self.chapter, 'due'), self.extended)
+
+    def test_clear_updates_cached_overrides(self):
+        get_override_for_user(self.users[0], self.sequentials[0], 'due')
+        clear_override_for_user(self.users[0], self.sequentials[0], 'due')
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_override_for_user(self.users[0], self.sequentials[0], 'due'))
+        self.assertEqual(get_override_for_user(self.users[1], self.sequentials[0], 'due'), self.extended)
+
+    def test_provider_enabled(self):
+        self.assertFalse(is_individual_overrides_provider_enabled())
+        with override_settings(FIELD_OVERRIDE_PROVIDERS=(
+            'courseware.student_field_overrides.IndividualStudentOverrideProvider',
+        )):
+            self.assertTrue(is_individual_overrides_provider_enabled())
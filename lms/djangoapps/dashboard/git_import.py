@@ -186,6 +186,7 @@ def add_repo(repo, rdir_in, branch=None):
 
     git_repo_dir = getattr(settings, 'GIT_REPO_DIR', DEFAULT_GIT_REPO_DIR)
     git_import_static = getattr(settings, 'GIT_IMPORT_STATIC', True)
+    git_import_incremental = getattr(settings, 'GIT_IMPORT_INCREMENTAL', False)
 
     # Set defaults even if it isn't defined in settings
     mongo_db = {
@@ -274,7 +275,8 @@ def add_repo(repo, rdir_in, branch=None):
 
     try:
         management.call_command('import', git_repo_dir, rdir,
-                                nostatic=not git_import_static)
+                                nostatic=not git_import_static,
+                                incremental=git_import_incremental)
     except CommandError:
         raise GitImportErrorXmlImportFailed()
     except NotImplementedError:
@@ -10,6 +10,7 @@ from django.utils.timezone import UTC as django_utc
 from django.core.urlresolvers import reverse
 from django.test import TestCase, RequestFactory
 from edxmako import add_lookup
+from request_cache.middleware import RequestCache
 
 from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
@@ -317,6 +318,49 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         self.assertTrue(utils.discussion_category_id_access(self.course, self.user, 'private_discussion_id'))
         self.assertFalse(utils.discussion_category_id_access(self.course, user, 'private_discussion_id'))
 
+    def test_get_cached_discussion_xblocks(self):
+        xblocks = utils.get_cached_discussion_xblocks(
+            self.course,
+            ['test_discussion_id', 'test_discussion_id_2', 'bad_discussion_id', 'bogus_id'],
+            self.user
+        )
+        self.assertEqual(
+            {discussion_id: xblock.location for discussion_id, xblock in xblocks.iteritems()},
+            {'test_discussion_id': self.discussion.location, 'test_discussion_id_2': self.discussion2.location}
+        )
+
+    def test_discussion_id_map_loaded_once_per_request(self):
+        with mock.patch.object(utils, '_load_discussion_id_map', wraps=utils._load_discussion_id_map) as mock_load:
+            utils.get_cached_discussion_id_map(self.course, ['test_discussion_id'], self.user)
+            utils.get_cached_discussion_key(self.course, 'test_discussion_id_2')
+            self.assertTrue(utils.discussion_category_id_access(self.course, self.user, 'test_discussion_id'))
+            self.assertEqual(mock_load.call_count, 1)
+
+            RequestCache.clear_request_cache()
+            utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+            self.assertEqual(mock_load.call_count, 2)
+
+    def test_discussion_id_map_kept_by_process(self):
+        utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        RequestCache.clear_request_cache()
+        with mock.patch.object(
+            CourseStructure, 'discussion_id_map', new_callable=mock.PropertyMock
+        ) as mock_discussion_id_map:
+            with self.assertNumQueries(1):
+                usage_key = utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+            self.assertEqual(usage_key, self.discussion.location)
+            self.assertFalse(mock_discussion_id_map.called)
+
+    def test_discussion_id_map_reloaded_when_modified(self):
+        utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        RequestCache.clear_request_cache()
+        structure = CourseStructure.objects.get(course_id=self.course.id)
+        structure.discussion_id_map_json = json.dumps({'new_discussion_id': unicode(self.discussion.location)})
+        structure.save()
+
+        self.assertIsNone(utils.get_cached_discussion_key(self.course, 'test_discussion_id'))
+        self.assertEqual(utils.get_cached_discussion_key(self.course, 'new_discussion_id'), self.discussion.location)
+
 
 class CategoryMapTestMixin(object):
     """
@@ -11,6 +11,7 @@ from django.db import connection
 from django.http import HttpResponse
 from django.utils.timezone import UTC
 import pystache_custom as pystache
+import request_cache
 from opaque_keys.edx.locations import i4xEncoder
 from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
@@ -32,6 +33,10 @@ from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# The discussion id maps most recently loaded by this process, keyed by
+# course id, as (modification time of the course structure, map) pairs.
+_DISCUSSION_ID_MAPS = {}
+
 
 def extract(dic, keys):
     """
@@ -155,19 +160,77 @@ class DiscussionIdMapIsNotCached(Exception):
     pass
 
 
+def _get_cached_discussion_id_map(course):
+    """
+    Returns the cached mapping of discussion ids to usage keys for course,
+    loaded at most once per request.  Raises a DiscussionIdMapIsNotCached
+    exception if the discussion id map is not cached for course.
+
+    The map is loaded with a single query.  Since parsing it is costly for
+    large courses, parsed maps are also kept by the process, for as long as
+    the course structure they were read from is not modified.
+    """
+    id_maps = request_cache.get_cache('discussion-id-map')
+    if course.id not in id_maps:
+        id_maps[course.id] = _load_discussion_id_map(course.id)
+    mapping = id_maps[course.id]
+    if not mapping:
+        raise DiscussionIdMapIsNotCached()
+    return mapping
+
+
+def _load_discussion_id_map(course_key):
+    """
+    Returns the mapping of discussion ids to usage keys stored in the course
+    structure of the given course, or None if there is no course structure.
+    """
+    structures = CourseStructure.objects.filter(course_id=course_key).values_list('modified', 'discussion_id_map_json')
+    if not structures:
+        return None
+    modified, discussion_id_map_json = structures[0]
+
+    cached = _DISCUSSION_ID_MAPS.get(course_key)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+
+    # The map is only decompressed and parsed if the course structure changed.
+    mapping = CourseStructure(course_id=course_key, discussion_id_map_json=discussion_id_map_json).discussion_id_map
+    _DISCUSSION_ID_MAPS[course_key] = (modified, mapping)
+    return mapping
+
+
 def get_cached_discussion_key(course, discussion_id):
     """
     Returns the usage key of the discussion xblock associated with discussion_id if it is cached. If the discussion id
     map is cached but does not contain discussion_id, returns None. If the discussion id map is not cached for course,
     raises a DiscussionIdMapIsNotCached exception.
     """
-    try:
-        cached_mapping = CourseStructure.objects.get(course_id=course.id).discussion_id_map
-        if not cached_mapping:
-            raise DiscussionIdMapIsNotCached()
-        return cached_mapping.get(discussion_id)
-    except CourseStructure.DoesNotExist:
-        raise DiscussionIdMapIsNotCached()
+    return _get_cached_discussion_id_map(course).get(discussion_id)
+
+
+def get_cached_discussion_xblocks(course, discussion_ids, user):
+    """
+    Returns a dict mapping each of the discussion_ids which is cached and visible to the user to its discussion xblock.
+    If the discussion id map is not cached for course, raises a DiscussionIdMapIsNotCached exception.
+
+    All the ids are resolved with the discussion id map loaded once for the request, and the result of the access
+    check of each xblock is kept for the rest of the request.
+    """
+    id_map = _get_cached_discussion_id_map(course)
+    accessible_xblocks = request_cache.get_cache('discussion-xblock-access')
+    xblocks = {}
+    for discussion_id in set(discussion_ids):
+        key = id_map.get(discussion_id)
+        if not key:
+            continue
+        if (user.id, key) not in accessible_xblocks:
+            xblock = modulestore().get_item(key)
+            if not (has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)):
+                xblock = None
+            accessible_xblocks[(user.id, key)] = xblock
+        if accessible_xblocks[(user.id, key)] is not None:
+            xblocks[discussion_id] = accessible_xblocks[(user.id, key)]
+    return xblocks
 
 
 def get_cached_discussion_id_map(course, discussion_ids, user):
@@ -176,16 +239,8 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
     user. If not, returns the result of get_discussion_id_map
     """
     try:
-        entries = []
-        for discussion_id in discussion_ids:
-            key = get_cached_discussion_key(course, discussion_id)
-            if not key:
-                continue
-            xblock = modulestore().get_item(key)
-            if not (has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)):
-                continue
-            entries.append(get_discussion_id_map_entry(xblock))
-        return dict(entries)
+        xblocks = get_cached_discussion_xblocks(course, discussion_ids, user)
+        return dict(get_discussion_id_map_entry(xblock) for xblock in xblocks.itervalues())
     except DiscussionIdMapIsNotCached:
         return get_discussion_id_map(course, user)
 
@@ -399,10 +454,7 @@ def discussion_category_id_access(course, user, discussion_id, xblock=None):
         return True
     try:
         if not xblock:
-            key = get_cached_discussion_key(course, discussion_id)
-            if not key:
-                return False
-            xblock = modulestore().get_item(key)
+            return discussion_id in get_cached_discussion_xblocks(course, [discussion_id], user)
         return has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)
     except DiscussionIdMapIsNotCached:
         return discussion_id in get_discussion_categories_ids(course, user)
@@ -2,12 +2,14 @@
 Functionality for course-level grades.
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
 
 from opaque_keys.edx.keys import CourseKey
 from courseware.courses import get_course_by_id
+from .new.bulk_grade import BulkGradeContext
 from .new.course_grade import CourseGradeFactory
 
 
@@ -16,8 +18,11 @@ log = getLogger(__name__)
 
 GradeResult = namedtuple('StudentGrade', ['student', 'gradeset', 'err_msg'])
 
+# Number of students whose scores are loaded together when iterating grades.
+GRADES_CHUNK_SIZE = 100
 
-def iterate_grades_for(course_or_id, students):
+
+def iterate_grades_for(course_or_id, students, chunk_size=GRADES_CHUNK_SIZE):
     """
     Given a course_id and an iterable of students (User), yield a GradeResult
     for every student enrolled in the course.  GradeResult is a named tuple of:
@@ -36,34 +41,63 @@ def iterate_grades_for(course_or_id, students):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    Students are graded in chunks of chunk_size, loading the scores of each
+    chunk in bulk and sharing course structures between students of a chunk
+    where possible.
     """
     if isinstance(course_or_id, (basestring, CourseKey)):
         course = get_course_by_id(course_or_id)
     else:
         course = course_or_id
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                gradeset = summary(student, course)
-                yield GradeResult(student, gradeset, "")
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
-                )
-                yield GradeResult(student, {}, exc.message)
-
-
-def summary(student, course):
+    students = iter(students)
+    while True:
+        students_chunk = list(islice(students, chunk_size))
+        if not students_chunk:
+            break
+        bulk_context = _create_bulk_context(course, students_chunk)
+        for student in students_chunk:
+            with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+                try:
+                    grading_kwargs = bulk_context.grading_kwargs(student) if bulk_context else {}
+                    gradeset = summary(student, course, **grading_kwargs)
+                    yield GradeResult(student, gradeset, "")
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Keep marching on even if this student couldn't be graded for
+                    # some reason, but log it for future reference.
+                    log.exception(
+                        'Cannot grade student %s (%s) in course %s because of exception: %s',
+                        student.username,
+                        student.id,
+                        course.id,
+                        exc.message
+                    )
+                    yield GradeResult(student, {}, exc.message)
+
+
+def _create_bulk_context(course, students):
+    """
+    Returns the BulkGradeContext for the given students, or None if their
+    grading data could not be prefetched, in which case every student is
+    graded individually.
+    """
+    try:
+        return BulkGradeContext(course, students)
+    except Exception:  # pylint: disable=broad-except
+        log.exception('Cannot prefetch grading data for %d students in course %s', len(students), course.id)
+        return None
+
+
+def summary(student, course, course_structure=None, scores_client=None, submissions_scores=None):
     """
     Returns the grade summary of the student for the given course.
 
+    The optional arguments are the student's prefetched grading data (see
+    CourseGradeFactory.create).
+
     Also sends a signal to update the minimum grade requirement status.
     """
-    return CourseGradeFactory(student).create(course).summary
+    return CourseGradeFactory(student).create(
+        course, course_structure, scores_client, submissions_scores,
+    ).summary
@@ -0,0 +1,140 @@
+"""
+Models used for robust grading.
+
+Robust grading allows student scores to be saved per-subsection independent
+of any changes that may occur to the course after the score is achieved.
+
+WE'RE USING MIGRATIONS!
+
+If you make changes to this model, be sure to create an appropriate migration
+file and check it in at the same time as your model changes. To do that,
+
+1. Go to the edx-platform dir
+2. ./manage.py lms makemigrations grades --settings=devstack
+"""
+from hashlib import sha1
+import json
+import logging
+
+from django.db import models, transaction
+from model_utils.models import TimeStampedModel
+
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+log = logging.getLogger(__name__)
+
+
+def hash_visible_blocks(block_locations):
+    """
+    Returns a stable hash of the given ordered list of block locations.
+
+    Used to detect that the set of scorable blocks a student can see in a
+    subsection has changed since their grade was saved (e.g. because their
+    cohort or content group changed).
+    """
+    return sha1(u'|'.join(unicode(location) for location in block_locations).encode('utf-8')).hexdigest()
+
+
+class PersistentSubsectionGradeQuerySet(models.QuerySet):
+    """
+    QuerySet for PersistentSubsectionGrade, supporting bulk reads and
+    invalidation of saved grades.
+    """
+    def for_user_and_course(self, user_id, course_key):
+        """
+        Returns a dict of all the saved subsection grades for the given user
+        and course, keyed by subsection usage key.
+        """
+        return {
+            grade.usage_key.map_into_course(course_key): grade
+            for grade in self.filter(user_id=user_id, course_id=course_key)
+        }
+
+    def invalidate(self, user_id, course_key, usage_keys):
+        """
+        Deletes the saved grades of the given user for the given subsections.
+        """
+        return self.filter(user_id=user_id, course_id=course_key, usage_key__in=list(usage_keys)).delete()
+
+
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    A django model tracking persistent grades at the subsection level.
+
+    A saved grade is only valid for the course version and the list of
+    scorable blocks that were visible to the student when it was computed;
+    stale rows are recomputed and replaced on read.
+    """
+
+    class Meta(object):
+        app_label = "grades"
+        unique_together = [
+            # A user can only have a single grade per subsection
+            ('course_id', 'user_id', 'usage_key'),
+        ]
+
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(blank=False, max_length=255)
+    usage_key = UsageKeyField(blank=False, max_length=255)
+
+    # Version of the course structure the grade was computed against.
+    course_version = models.CharField(blank=True, max_length=255)
+
+    # Hash of the ordered list of scorable blocks visible to the student.
+    visible_blocks_hash = models.CharField(blank=False, max_length=40)
+
+    # Aggregated scores for the subsection.
+    earned_all = models.FloatField(blank=False)
+    possible_all = models.FloatField(blank=False)
+    earned_graded = models.FloatField(blank=False)
+    possible_graded = models.FloatField(blank=False)
+
+    # JSON list of [usage_key, earned, possible, graded] for every scored problem.
+    problem_scores = models.TextField(blank=True, default='[]')
+
+    objects = PersistentSubsectionGradeQuerySet.as_manager()
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {}/{} ({}/{})".format(
+            self.usage_key, self.earned_graded, self.possible_graded, self.earned_all, self.possible_all,
+        )
+
+    def is_valid_for(self, course_version, visible_blocks_hash):
+        """
+        Returns whether this saved grade was computed against the given
+        version of the course structure and set of visible blocks.
+        """
+        return self.course_version == course_version and self.visible_blocks_hash == visible_blocks_hash
+
+    @property
+    def problem_scores_list(self):
+        """
+        Returns the saved problem scores as a list of
+        (usage_key_string, earned, possible, graded) tuples.
+        """
+        return [tuple(score) for score in json.loads(self.problem_scores)]
+
+    @classmethod
+    def bulk_save(cls, grades):
+        """
+        Replaces the saved grades for the given unsaved PersistentSubsectionGrade
+        objects in as few queries as possible.
+        """
+        if not grades:
+            return
+        with transaction.atomic():
+            for (user_id, course_key), usage_keys in _group_usage_keys(grades).iteritems():
+                cls.objects.invalidate(user_id, course_key, usage_keys)
+            cls.objects.bulk_create(grades)
+        log.debug(u"Saved %d persistent subsection grades", len(grades))
+
+
+def _group_usage_keys(grades):
+    """
+    Returns a dict mapping (user_id, course_id) to the usage keys of the given grades.
+    """
+    grouped = {}
+    for grade in grades:
+        grouped.setdefault((grade.user_id, grade.course_id), []).append(grade.usage_key)
+    return grouped
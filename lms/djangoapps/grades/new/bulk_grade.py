@@ -0,0 +1,116 @@
+"""
+BulkGradeContext Class
+"""
+from django.db.models import Q
+
+from courseware.model_data import ScoresClient
+from courseware.student_field_overrides import is_individual_overrides_provider_enabled, prefetch_overrides_for_users
+from lms.djangoapps.course_blocks.transformers.user_partitions import UserPartitionTransformer, get_user_partition_groups
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from student.models import CourseAccessRole, anonymous_id_for_user
+from submissions.models import ScoreSummary
+
+from .course_grade import get_course_blocks_for_grading
+
+
+class BulkGradeContext(object):
+    """
+    Grading data for a chunk of students in a course, prefetched with one
+    query per data type so that the whole chunk can be graded in memory.
+    Individual student field overrides are prefetched into the request cache.
+
+    Transformed course structures are shared between students who are
+    guaranteed to see the same blocks: students without any course or org
+    role, in a course without randomized library content, who belong to the
+    same group in every user partition.  All other students get their own
+    course structure.
+    """
+    def __init__(self, course, students):
+        self.course = course
+        self.students = students
+
+        user_ids = [student.id for student in students]
+        self._scores_clients = ScoresClient.create_for_users(course.id, user_ids)
+        self._submissions_scores = _get_submissions_scores(course.id, students)
+        self._users_with_roles = set(
+            CourseAccessRole.objects.filter(
+                Q(course_id=course.id) | Q(org__iexact=course.id.org),
+                user_id__in=user_ids,
+            ).values_list('user_id', flat=True)
+        )
+        if is_individual_overrides_provider_enabled():
+            prefetch_overrides_for_users(course.id, students)
+
+        collected_structure = get_course_in_cache(course.id)
+        self._user_partitions = collected_structure.get_transformer_data(
+            UserPartitionTransformer, 'user_partitions'
+        ) or []
+        self._has_library_content = any(
+            block_key.block_type == 'library_content' for block_key in collected_structure
+        )
+        self._course_structures_by_shape = {}
+
+    def grading_kwargs(self, student):
+        """
+        Returns the prefetched data to pass to CourseGradeFactory.create for
+        the given student.
+        """
+        return {
+            'course_structure': self._course_structure(student),
+            'scores_client': self._scores_clients[student.id],
+            'submissions_scores': self._submissions_scores[student.id],
+        }
+
+    def _course_structure(self, student):
+        """
+        Returns the course structure as seen by the given student, reusing
+        the structure of a student with the same shape when possible.
+        """
+        shape = self._structure_shape(student)
+        if shape is None:
+            return get_course_blocks_for_grading(student, self.course.location)
+        if shape not in self._course_structures_by_shape:
+            self._course_structures_by_shape[shape] = get_course_blocks_for_grading(student, self.course.location)
+        return self._course_structures_by_shape[shape]
+
+    def _structure_shape(self, student):
+        """
+        Returns a hashable key identifying the set of blocks visible to the
+        given student, or None if the course structure cannot be shared.
+        """
+        if (
+                self._has_library_content or
+                student.is_staff or
+                student.is_superuser or
+                student.id in self._users_with_roles
+        ):
+            return None
+        partition_groups = get_user_partition_groups(self.course.id, self._user_partitions, student)
+        return tuple(sorted(
+            (partition_id, group.id) for partition_id, group in partition_groups.iteritems()
+        ))
+
+
+def _get_submissions_scores(course_key, students):
+    """
+    Returns a dict of the submissions scores of the given students, keyed by
+    user id, using a single query.
+
+    The values are in the same format as submissions.api.get_scores.
+    """
+    anonymous_ids_to_user_ids = {
+        anonymous_id_for_user(student, course_key, save=False): student.id for student in students
+    }
+    scores = {student.id: {} for student in students}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=unicode(course_key),
+        student_item__student_id__in=anonymous_ids_to_user_ids.keys(),
+    ).select_related('latest', 'student_item')
+    for summary in score_summaries:
+        if summary.latest.is_hidden():
+            continue
+        user_id = anonymous_ids_to_user_ids[summary.student_item.student_id]
+        scores[user_id][summary.student_item.item_id] = (
+            summary.latest.points_earned, summary.latest.points_possible
+        )
+    return scores
@@ -6,10 +6,12 @@ from collections import defaultdict
 from django.conf import settings
 from lazy import lazy
 from logging import getLogger
-from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.api import get_course_blocks, COURSE_BLOCK_ACCESS_TRANSFORMERS
+from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
 from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
 from xmodule import block_metadata_utils
 
+from ..transformer import GradesTransformer
 from .subsection_grade import SubsectionGradeFactory
 
 
@@ -81,11 +83,14 @@ class CourseGrade(object):
 
         return grade_summary
 
-    def compute(self):
+    def compute(self, scores_client=None, submissions_scores=None):
         """
         Computes the grade for the given student and course.
+
+        If given, the prefetched scores_client and submissions_scores of the
+        student are used instead of querying their scores.
         """
-        subsection_grade_factory = SubsectionGradeFactory(self.student)
+        subsection_grade_factory = SubsectionGradeFactory(self.student, scores_client, submissions_scores)
         for chapter_key in self.course_structure.get_children(self.course.location):
             chapter = self.course_structure[chapter_key]
             subsection_grades = []
@@ -103,6 +108,7 @@ class CourseGrade(object):
                 'sections': subsection_grades
             })
 
+        subsection_grade_factory.bulk_create_unsaved()
         self._signal_listeners_when_grade_computed()
 
     def score_for_module(self, location):
@@ -175,22 +181,27 @@ class CourseGradeFactory(object):
     def __init__(self, student):
         self.student = student
 
-    def create(self, course):
+    def create(self, course, course_structure=None, scores_client=None, submissions_scores=None):
         """
         Returns the CourseGrade object for the given student and course.
+
+        The course_structure, scores_client and submissions_scores of the
+        student may be passed in when they have been prefetched in bulk
+        (see BulkGradeContext).
         """
-        course_structure = get_course_blocks(self.student, course.location)
+        if course_structure is None:
+            course_structure = get_course_blocks_for_grading(self.student, course.location)
         return (
             self._get_saved_grade(course, course_structure) or
-            self._compute_and_update_grade(course, course_structure)
+            self._compute_and_update_grade(course, course_structure, scores_client, submissions_scores)
         )
 
-    def _compute_and_update_grade(self, course, course_structure):
+    def _compute_and_update_grade(self, course, course_structure, scores_client=None, submissions_scores=None):
         """
         Freshly computes and updates the grade for the student and course.
         """
         course_grade = CourseGrade(self.student, course, course_structure)
-        course_grade.compute()
+        course_grade.compute(scores_client, submissions_scores)
         return course_grade
 
     def _get_saved_grade(self, course, course_structure):  # pylint: disable=unused-argument
@@ -207,3 +218,15 @@ def _pretend_to_save_course_grades():
     Stub to facilitate testing feature flag until robust grade work lands.
     """
     pass
+
+
+def get_course_blocks_for_grading(student, course_location):
+    """
+    Returns the course blocks accessible to the given student, along with
+    the collected data of the GradesTransformer that grading reads.
+    """
+    return get_course_blocks(
+        student,
+        course_location,
+        BlockStructureTransformers(COURSE_BLOCK_ACCESS_TRANSFORMERS + [GradesTransformer()]),
+    )
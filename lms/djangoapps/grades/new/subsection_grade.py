@@ -2,11 +2,14 @@
 SubsectionGrade Class
 """
 from collections import OrderedDict
+import json
 from lazy import lazy
 
 from django.conf import settings
+from opaque_keys.edx.keys import UsageKey
 
 from courseware.model_data import ScoresClient
+from lms.djangoapps.grades.models import PersistentSubsectionGrade, hash_visible_blocks
 from lms.djangoapps.grades.scores import get_score, possibly_scored
 from student.models import anonymous_id_for_user
 from submissions import api as submissions_api
@@ -42,15 +45,7 @@ class SubsectionGrade(object):
         """
         Compute the grade of this subsection for the given student and course.
         """
-        for descendant_key in course_structure.post_order_traversal(
-                filter_func=possibly_scored,
-                start_node=self.location,
-        ):
-            descendant = course_structure[descendant_key]
-
-            if not getattr(descendant, 'has_score', False):
-                continue
-
+        for descendant in self.scored_descendants(course_structure):
             (earned, possible) = get_score(
                 student,
                 descendant,
@@ -75,26 +70,87 @@ class SubsectionGrade(object):
             self.scores, self.display_name,
         )
 
+    def load_from_data(self, saved_grade, course_structure):
+        """
+        Load the grade of this subsection from the given saved
+        PersistentSubsectionGrade, without querying any scores.
+        """
+        for usage_key_string, earned, possible, graded in saved_grade.problem_scores_list:
+            location = UsageKey.from_string(usage_key_string).map_into_course(self.location.course_key)
+            self.locations_to_scores[location] = Score(
+                earned,
+                possible,
+                graded,
+                block_metadata_utils.display_name_with_default_escaped(course_structure[location]),
+                location,
+            )
+
+        self.all_total = Score(saved_grade.earned_all, saved_grade.possible_all, False, self.display_name, None)
+        self.graded_total = Score(saved_grade.earned_graded, saved_grade.possible_graded, True, self.display_name, None)
+
+    def to_model(self, student, course_version, visible_blocks_hash):
+        """
+        Returns an unsaved PersistentSubsectionGrade representing this grade.
+        """
+        return PersistentSubsectionGrade(
+            user_id=student.id,
+            course_id=self.location.course_key,
+            usage_key=self.location,
+            course_version=course_version,
+            visible_blocks_hash=visible_blocks_hash,
+            earned_all=self.all_total.earned,
+            possible_all=self.all_total.possible,
+            earned_graded=self.graded_total.earned,
+            possible_graded=self.graded_total.possible,
+            problem_scores=json.dumps([
+                [unicode(location), score.earned, score.possible, score.graded]
+                for location, score in self.locations_to_scores.iteritems()
+            ]),
+        )
+
+    def scored_descendants(self, course_structure):
+        """
+        Yields the blocks in this subsection, as seen by the student in the
+        given course structure, that have a score.
+        """
+        for descendant_key in course_structure.post_order_traversal(
+                filter_func=possibly_scored,
+                start_node=self.location,
+        ):
+            descendant = course_structure[descendant_key]
+            if getattr(descendant, 'has_score', False):
+                yield descendant
+
 
 class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
-    def __init__(self, student):
+    def __init__(self, student, scores_client=None, submissions_scores=None):
         self.student = student
 
-        self._scores_client = None
-        self._submissions_scores = None
+        self._scores_client = scores_client
+        self._submissions_scores = submissions_scores
+        self._saved_grades = None
+        self._unsaved_grades = []
 
     def create(self, subsection, course_structure, course):
         """
         Returns the SubsectionGrade object for the student and subsection.
         """
         return (
-            self._get_saved_grade(subsection, course) or
+            self._get_saved_grade(subsection, course_structure, course) or
             self._compute_and_update_grade(subsection, course_structure, course)
         )
 
+    def bulk_create_unsaved(self):
+        """
+        Saves, in a single bulk operation, all the grades that were freshly
+        computed by this factory since the last call.
+        """
+        PersistentSubsectionGrade.bulk_save(self._unsaved_grades)
+        self._unsaved_grades = []
+
     def _compute_and_update_grade(self, subsection, course_structure, course):
         """
         Freshly computes and updates the grade for the student and subsection.
@@ -102,24 +158,57 @@ class SubsectionGradeFactory(object):
         self._prefetch_scores(course_structure, course)
         subsection_grade = SubsectionGrade(subsection)
         subsection_grade.compute(self.student, course_structure, self._scores_client, self._submissions_scores)
-        self._update_saved_grade(subsection_grade, subsection, course)
+        self._update_saved_grade(subsection_grade, subsection, course_structure, course)
         return subsection_grade
 
-    def _get_saved_grade(self, subsection, course):  # pylint: disable=unused-argument
+    def _get_saved_grade(self, subsection, course_structure, course):
         """
-        Returns the saved grade for the given course and student.
+        Returns the saved grade for the given course and student, if it
+        exists and is still valid for the current course structure.
         """
-        if settings.FEATURES.get('ENABLE_SUBSECTION_GRADES_SAVED') and course.enable_subsection_grades_saved:
-            # TODO Retrieve the saved grade for the subsection, if it exists.
-            pass
+        if not _saved_grades_enabled(course):
+            return None
+
+        if self._saved_grades is None:
+            self._saved_grades = PersistentSubsectionGrade.objects.for_user_and_course(self.student.id, course.id)
+
+        saved_grade = self._saved_grades.get(subsection.location)
+        if saved_grade is None or not saved_grade.is_valid_for(
+                *self._version_info(subsection, course_structure, course)
+        ):
+            return None
 
-    def _update_saved_grade(self, subsection_grade, subsection, course):  # pylint: disable=unused-argument
+        subsection_grade = SubsectionGrade(subsection)
+        subsection_grade.load_from_data(saved_grade, course_structure)
+        return subsection_grade
+
+    def _update_saved_grade(self, subsection_grade, subsection, course_structure, course):
+        """
+        Queues the freshly computed grade to be saved by bulk_create_unsaved.
+        """
+        if _saved_grades_enabled(course):
+            self._unsaved_grades.append(
+                subsection_grade.to_model(self.student, *self._version_info(subsection, course_structure, course))
+            )
+
+    def _version_info(self, subsection, course_structure, course):
         """
-        Returns the saved grade for the given course and student.
+        Returns the (course_version, visible_blocks_hash) against which the
+        student's grade for the subsection is versioned.
+
+        Courses in old mongo have no course_version, so the time the
+        subsection's subtree was last edited is used instead.
         """
-        if settings.FEATURES.get('ENABLE_SUBSECTION_GRADES_SAVED') and course.enable_subsection_grades_saved:
-            # TODO Update the saved grade for the subsection.
-            _pretend_to_save_subsection_grades()
+        course_version = course_structure.get_xblock_field(course.location, 'course_version')
+        if course_version is None:
+            subtree_edited_on = getattr(subsection, 'subtree_edited_on', None)
+            course_version = subtree_edited_on.isoformat() if subtree_edited_on else u''
+        return (
+            unicode(course_version),
+            hash_visible_blocks(
+                block.location for block in SubsectionGrade(subsection).scored_descendants(course_structure)
+            ),
+        )
 
     def _prefetch_scores(self, course_structure, course):
         """
@@ -135,8 +224,8 @@ class SubsectionGradeFactory(object):
             )
 
 
-def _pretend_to_save_subsection_grades():
+def _saved_grades_enabled(course):
     """
-    Stub to facilitate testing feature flag until robust grade work lands.
+    Returns whether subsection grades are saved for the given course.
     """
-    pass
+    return settings.FEATURES.get('ENABLE_SUBSECTION_GRADES_SAVED') and course.enable_subsection_grades_saved
@@ -1,10 +1,16 @@
 """
 Grades related signals.
 """
+from django.conf import settings
 from django.dispatch import receiver, Signal
 from logging import getLogger
+from opaque_keys.edx.keys import CourseKey, UsageKey
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
+from xmodule.modulestore.django import modulestore
+
+from .models import PersistentSubsectionGrade
 
 
 log = getLogger(__name__)
@@ -106,3 +112,45 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def invalidate_subsection_grades_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal and delete the saved grades of the
+    user for every block containing the scored block, so that only the
+    affected subsection grades are recomputed on the next read.
+    """
+    if not settings.FEATURES.get('ENABLE_SUBSECTION_GRADES_SAVED'):
+        return
+
+    course_key = CourseKey.from_string(unicode(kwargs['course_id']))
+    # Only load the block structure of courses which save subsection grades.
+    course = modulestore().get_course(course_key, depth=0)
+    if course is None or not course.enable_subsection_grades_saved:
+        return
+
+    usage_key = UsageKey.from_string(unicode(kwargs['usage_id'])).map_into_course(course_key)
+    PersistentSubsectionGrade.objects.invalidate(
+        kwargs['user_id'],
+        course_key,
+        _get_ancestors(get_course_in_cache(course_key), usage_key),
+    )
+
+
+def _get_ancestors(block_structure, usage_key):
+    """
+    Returns the set of all ancestors of the given block in the collected
+    block structure of its course.
+    """
+    ancestors = set()
+    blocks_to_visit = [usage_key]
+    while blocks_to_visit:
+        block_key = blocks_to_visit.pop()
+        if block_key not in block_structure:
+            continue
+        for parent_key in block_structure.get_parents(block_key):
+            if parent_key not in ancestors:
+                ancestors.add(parent_key)
+                blocks_to_visit.append(parent_key)
+    return ancestors
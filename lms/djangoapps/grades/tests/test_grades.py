@@ -18,7 +18,6 @@ from courseware.tests.helpers import (
     LoginEnrollmentTestCase,
     get_request_for_user
 )
-from lms.djangoapps.course_blocks.api import get_course_blocks
 from student.tests.factories import UserFactory
 from student.models import CourseEnrollment
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -27,11 +26,11 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from .. import course_grades
 from ..course_grades import summary as grades_summary
 from ..module_grades import get_module_score
-from ..new.course_grade import CourseGrade, CourseGradeFactory
+from ..new.course_grade import CourseGrade, CourseGradeFactory, get_course_blocks_for_grading
 from ..new.subsection_grade import SubsectionGradeFactory
 
 
-def _grade_with_errors(student, course):
+def _grade_with_errors(student, course, **kwargs):
     """This fake grade method will throw exceptions for student3 and
     student4, but allow any other students to go through normal grading.
 
@@ -42,7 +41,7 @@ def _grade_with_errors(student, course):
     if student.username in ['student3', 'student4']:
         raise Exception("I don't like {}".format(student.username))
 
-    return grades_summary(student, course)
+    return grades_summary(student, course, **kwargs)
 
 
 @attr('shard_1')
@@ -129,8 +128,25 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertTrue(all_gradesets[student2])
         self.assertTrue(all_gradesets[student5])
 
+    def test_bulk_grades_match_individual_grades(self):
+        """Grading students in chunks should yield the same gradesets as
+        grading every student individually."""
+        all_gradesets, all_errors = self._gradesets_and_errors_for(self.course.id, self.students, chunk_size=2)
+        self.assertEqual(len(all_errors), 0)
+        for student in self.students:
+            self.assertEqual(all_gradesets[student], grades_summary(student, self.course))
+
+    @patch('lms.djangoapps.grades.course_grades.BulkGradeContext')
+    def test_bulk_prefetch_failure(self, mock_bulk_context):
+        """If the grading data of a chunk cannot be prefetched, its students
+        are graded individually."""
+        mock_bulk_context.side_effect = Exception("Prefetch failed")
+        all_gradesets, all_errors = self._gradesets_and_errors_for(self.course.id, self.students)
+        self.assertEqual(len(all_errors), 0)
+        self.assertEqual(len(all_gradesets), 5)
+
     ################################# Helpers #################################
-    def _gradesets_and_errors_for(self, course_id, students):
+    def _gradesets_and_errors_for(self, course_id, students, **kwargs):
         """Simple helper method to iterate through student grades and give us
         two dictionaries -- one that has all students and their respective
         gradesets, and one that has only students that could not be graded and
@@ -138,7 +154,7 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         students_to_gradesets = {}
         students_to_errors = {}
 
-        for student, gradeset, err_msg in course_grades.iterate_grades_for(course_id, students):
+        for student, gradeset, err_msg in course_grades.iterate_grades_for(course_id, students, **kwargs):
             students_to_gradesets[student] = gradeset
             if err_msg:
                 students_to_errors[student] = err_msg
@@ -347,14 +363,33 @@ class TestCourseGradeFactory(SharedModuleStoreTestCase):
         # Grades are only saved if the feature flag and the advanced setting are
         # both set to True.
         grade_factory = SubsectionGradeFactory(self.request.user)
-        course_structure = get_course_blocks(self.request.user, self.course.location)
+        course_structure = get_course_blocks_for_grading(self.request.user, self.course.location)
         with patch(
-            'lms.djangoapps.grades.new.subsection_grade._pretend_to_save_subsection_grades'
+            'lms.djangoapps.grades.new.subsection_grade.PersistentSubsectionGrade.bulk_save'
         ) as mock_save_grades:
             with patch.dict(settings.FEATURES, {'ENABLE_SUBSECTION_GRADES_SAVED': feature_flag}):
                 with patch.object(self.course, 'enable_subsection_grades_saved', new=course_setting):
                     grade_factory.create(self.sequence, course_structure, self.course)
-        self.assertEqual(mock_save_grades.called, feature_flag and course_setting)
+                    grade_factory.bulk_create_unsaved()
+        saved_grades = mock_save_grades.call_args[0][0]
+        self.assertEqual(bool(saved_grades), feature_flag and course_setting)
+
+    def test_saved_subsection_grade_is_reused(self):
+        course_structure = get_course_blocks_for_grading(self.request.user, self.course.location)
+        with patch.dict(settings.FEATURES, {'ENABLE_SUBSECTION_GRADES_SAVED': True}):
+            with patch.object(self.course, 'enable_subsection_grades_saved', new=True):
+                grade_factory = SubsectionGradeFactory(self.request.user)
+                computed_grade = grade_factory.create(self.sequence, course_structure, self.course)
+                grade_factory.bulk_create_unsaved()
+
+                # Only the bulk read of the saved grades is needed; no scores are fetched.
+                with self.assertNumQueries(1):
+                    saved_grade = SubsectionGradeFactory(self.request.user).create(
+                        self.sequence, course_structure, self.course
+                    )
+        self.assertEqual(saved_grade.graded_total, computed_grade.graded_total)
+        self.assertEqual(saved_grade.all_total, computed_grade.all_total)
+        self.assertEqual(saved_grade.locations_to_scores, computed_grade.locations_to_scores)
 
 
 class TestGetModuleScore(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
@@ -0,0 +1,72 @@
+"""
+Unit tests for grades models.
+"""
+from django.test import TestCase
+from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
+
+from ..models import PersistentSubsectionGrade, hash_visible_blocks
+
+
+class PersistentSubsectionGradeTest(TestCase):
+    """
+    Test the bulk read, write and invalidation of PersistentSubsectionGrade.
+    """
+    def setUp(self):
+        super(PersistentSubsectionGradeTest, self).setUp()
+        self.course_key = CourseLocator(org='some_org', course='some_course', run='some_run')
+        self.subsection_keys = [
+            BlockUsageLocator(self.course_key, block_type='sequential', block_id='subsection_{}'.format(index))
+            for index in range(3)
+        ]
+        self.problem_key = BlockUsageLocator(self.course_key, block_type='problem', block_id='problem')
+
+    def _grade(self, usage_key, earned=1.0, user_id=1):
+        """
+        Returns an unsaved grade for the given subsection.
+        """
+        return PersistentSubsectionGrade(
+            user_id=user_id,
+            course_id=self.course_key,
+            usage_key=usage_key,
+            course_version=u'deadbeef',
+            visible_blocks_hash=hash_visible_blocks([self.problem_key]),
+            earned_all=earned,
+            possible_all=2.0,
+            earned_graded=earned,
+            possible_graded=2.0,
+            problem_scores=u'[["{}", {}, 2.0, true]]'.format(self.problem_key, earned),
+        )
+
+    def test_bulk_save_and_read(self):
+        PersistentSubsectionGrade.bulk_save([self._grade(key) for key in self.subsection_keys])
+        with self.assertNumQueries(1):
+            saved_grades = PersistentSubsectionGrade.objects.for_user_and_course(1, self.course_key)
+        self.assertEqual(set(saved_grades), set(self.subsection_keys))
+        self.assertEqual(
+            saved_grades[self.subsection_keys[0]].problem_scores_list,
+            [(unicode(self.problem_key), 1.0, 2.0, True)],
+        )
+
+    def test_bulk_save_replaces_existing(self):
+        PersistentSubsectionGrade.bulk_save([self._grade(self.subsection_keys[0])])
+        PersistentSubsectionGrade.bulk_save([self._grade(self.subsection_keys[0], earned=2.0)])
+        saved_grades = PersistentSubsectionGrade.objects.for_user_and_course(1, self.course_key)
+        self.assertEqual(saved_grades[self.subsection_keys[0]].earned_graded, 2.0)
+
+    def test_invalidate(self):
+        PersistentSubsectionGrade.bulk_save(
+            [self._grade(key) for key in self.subsection_keys] + [self._grade(self.subsection_keys[0], user_id=2)]
+        )
+        PersistentSubsectionGrade.objects.invalidate(1, self.course_key, [self.subsection_keys[0]])
+        self.assertEqual(
+            set(PersistentSubsectionGrade.objects.for_user_and_course(1, self.course_key)),
+            set(self.subsection_keys[1:]),
+        )
+        self.assertEqual(len(PersistentSubsectionGrade.objects.for_user_and_course(2, self.course_key)), 1)
+
+    def test_is_valid_for(self):
+        grade = self._grade(self.subsection_keys[0])
+        visible_blocks_hash = hash_visible_blocks([self.problem_key])
+        self.assertTrue(grade.is_valid_for(u'deadbeef', visible_blocks_hash))
+        self.assertFalse(grade.is_valid_for(u'cafebabe', visible_blocks_hash))
+        self.assertFalse(grade.is_valid_for(u'deadbeef', hash_visible_blocks([])))
@@ -2,10 +2,16 @@
 Tests for the score change signals defined in the courseware models module.
 """
 
+import ddt
+from django.conf import settings
 from django.test import TestCase
 from mock import patch, MagicMock
 
-from ..signals import submissions_score_set_handler, submissions_score_reset_handler
+from ..signals import (
+    invalidate_subsection_grades_handler,
+    submissions_score_set_handler,
+    submissions_score_reset_handler,
+)
 
 
 SUBMISSION_SET_KWARGS = {
@@ -148,3 +154,33 @@ class SubmissionSignalRelayTest(TestCase):
         self.get_user_mock = self.setup_patch('lms.djangoapps.grades.signals.user_by_anonymous_id', None)
         submissions_score_reset_handler(None, **SUBMISSION_RESET_KWARGS)
         self.signal_mock.assert_not_called()
+
+
+@ddt.ddt
+class InvalidateSubsectionGradesTest(TestCase):
+    """
+    Tests that the SCORE_CHANGED handler only loads the block structure of
+    the course when its subsection grades are saved.
+    """
+    @ddt.data(
+        (False, False),
+        (False, True),
+        (True, False),
+        (True, True),
+    )
+    @ddt.unpack
+    def test_block_structure_loaded_when_grades_saved(self, feature_flag, course_setting):
+        course = MagicMock(enable_subsection_grades_saved=course_setting)
+        with patch.dict(settings.FEATURES, {'ENABLE_SUBSECTION_GRADES_SAVED': feature_flag}):
+            with patch('lms.djangoapps.grades.signals.modulestore') as mock_modulestore:
+                mock_modulestore.return_value.get_course.return_value = course
+                with patch('lms.djangoapps.grades.signals.get_course_in_cache') as mock_get_course_in_cache:
+                    with patch('lms.djangoapps.grades.signals.PersistentSubsectionGrade.objects.invalidate'):
+                        invalidate_subsection_grades_handler(
+                            None,
+                            user_id=42,
+                            course_id='course-v1:org+course+run',
+                            usage_id='block-v1:org+course+run+type@problem+block@problem',
+                        )
+        self.assertEqual(mock_modulestore.called, feature_flag)
+        self.assertEqual(mock_get_course_in_cache.called, feature_flag and course_setting)
@@ -17,10 +17,10 @@ import csv
 import json
 import hashlib
 import os.path
+from tempfile import SpooledTemporaryFile
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
 from django.db import models, transaction
 
 from openedx.core.storage import get_storage
@@ -31,6 +31,10 @@ from xmodule_django.models import CourseKeyField
 QUEUING = 'QUEUING'
 PROGRESS = 'PROGRESS'
 
+# Size above which report CSVs are spooled to a temporary file on disk
+# instead of being kept in memory while they are written.
+REPORT_CSV_MAX_MEMORY = 5 * 1024 * 1024
+
 
 class InstructorTask(models.Model):
     """
@@ -178,9 +182,8 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. CSV files can be written incrementally with `csv_writer`, so
+    that reports don't need to hold their whole dataset in memory.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -263,12 +266,43 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+        `rows` can be any iterable, including a generator.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        with self.csv_writer(course_id, filename) as writer:
+            writer.writerows(rows)
+
+    def csv_writer(self, course_id, filename):
+        """
+        Return a `ReportCSVWriter` to which the rows of the CSV file named
+        `filename` of the given `course_id` can be written one at a time.
+        """
+        return ReportCSVWriter(self, course_id, filename)
+
+    def open(self, course_id, filename):
+        """
+        Return a file object, opened for reading in binary mode, for the
+        stored file named `filename` of the given `course_id`.
+        """
+        return self.storage.open(self.path_to(course_id, filename), 'rb')
+
+    def delete(self, course_id, filename):
+        """
+        Delete the stored file named `filename` of the given `course_id`.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
+
+    def listdir(self, course_id, dirname):
+        """
+        Return the names of the files stored in the directory `dirname` of
+        the given `course_id`.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            # Django's FileSystemStorage fails with an OSError if the
+            # directory does not exist; other storage types return an empty list.
+            return []
+        return filenames
 
     def links_for(self, course_id):
         """
@@ -296,3 +330,67 @@ class DjangoStorageReportStore(ReportStore):
         """
         hashed_course_id = hashlib.sha1(course_id.to_deprecated_string()).hexdigest()
         return os.path.join(hashed_course_id, filename)
+
+
+class ReportCSVWriter(object):
+    """
+    Writes the rows of a report CSV file incrementally, and stores the file
+    in a ReportStore once all its rows have been written.
+
+    Rows are buffered in a temporary file that is kept in memory until it
+    grows larger than REPORT_CSV_MAX_MEMORY, and is spooled to disk after
+    that, so the memory used by a report doesn't grow with its size.  The
+    file is only stored once complete, so that any file visible in the
+    ReportStore is a complete one.
+
+    Used as a context manager, the file is stored on exit, unless an
+    exception was raised or the file was discarded.
+    """
+    def __init__(self, report_store, course_id, filename, max_memory=REPORT_CSV_MAX_MEMORY):
+        self.report_store = report_store
+        self.course_id = course_id
+        self.filename = filename
+        self.rows_written = 0
+        self.stored = False
+        self._closed = False
+        self._buffer = SpooledTemporaryFile(max_size=max_memory)
+        self._csvwriter = csv.writer(self._buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self._closed:
+            self.store()
+        self.discard()
+
+    def writerow(self, row):
+        """
+        Write a single row, an iterable of strings, to the CSV file.
+        """
+        self.writerows([row])
+
+    def writerows(self, rows):
+        """
+        Write all the rows of the given iterable to the CSV file.
+        """
+        for row in self.report_store._get_utf8_encoded_rows(rows):  # pylint: disable=protected-access
+            self._csvwriter.writerow(row)
+            self.rows_written += 1
+
+    def store(self):
+        """
+        Store the CSV file in the report store, and release its buffer.
+        """
+        self._buffer.seek(0)
+        self.report_store.store(self.course_id, self.filename, self._buffer)
+        self.stored = True
+        self.discard()
+
+    def discard(self):
+        """
+        Release the buffer of the CSV file without storing it.
+        """
+        if not self._closed:
+            self._buffer.close()
+            self._closed = True
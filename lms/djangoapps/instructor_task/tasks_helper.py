@@ -4,25 +4,30 @@ running state of a course.
 
 """
 import json
+import os
 import re
 from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from django.conf import settings
 from eventtracking import tracker
 from itertools import chain
 from time import time
+import traceback
 import unicodecsv
 import logging
 
 from celery import Task, current_task
-from celery.states import SUCCESS, FAILURE
+from celery.states import SUCCESS, FAILURE, READY_STATES
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.storage import DefaultStorage
 from django.db import reset_queries
 from django.db.models import Q
 import dogstats_wrapper as dog_stats_api
 from pytz import UTC
 from StringIO import StringIO
+from tempfile import SpooledTemporaryFile
 from edxmako.shortcuts import render_to_string
 from instructor.paidcourse_enrollment_report import PaidCourseEnrollmentReportProvider
 from shoppingcart.models import (
@@ -46,7 +51,7 @@ from certificates.models import (
 )
 from certificates.api import generate_user_certificates
 from courseware.courses import get_course_by_id, get_problems_in_section
-from grades.course_grades import iterate_grades_for
+from lms.djangoapps.grades.course_grades import iterate_grades_for
 from courseware.models import StudentModule
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
@@ -59,6 +64,13 @@ from instructor_analytics.basic import (
 from instructor_analytics.csvs import format_dictlist
 from openassessment.data import OraAggregateData
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    track_memory_usage,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -83,6 +95,12 @@ UPDATE_STATUS_SKIPPED = 'skipped'
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
+GRADE_REPORT_ERR_HEADER = ["id", "username", "error_msg"]
+# The merge of a sharded grade report should complete well within this lock's expiration.
+GRADE_REPORT_MERGE_LOCK_EXPIRE = 60 * 60
+# Size above which merged grade reports are spooled to disk instead of memory.
+GRADE_REPORT_MERGE_MAX_MEMORY = 10 * 1024 * 1024
+
 
 class BaseInstructorTask(Task):
     """
@@ -606,7 +624,7 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
 
     Arguments:
         rows: CSV data in the following format (first column may be a
-            header):
+            header), as a list or any other iterable, such as a generator:
             [
                 [row1_colum1, row1_colum2, ...],
                 ...
@@ -614,17 +632,36 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
+    with report_csv_writer(csv_name, course_id, timestamp, config_name) as writer:
+        writer.writerows(rows)
+
+
+@contextmanager
+def report_csv_writer(csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Context manager yielding a `ReportCSVWriter` to which the rows of a CSV
+    report can be written one at a time, so that reports never need to hold
+    all of their rows in memory.
+
+    The report is uploaded using ReportStore when the context exits, unless
+    it was discarded by calling `discard()` on the writer.
+    """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
+    with report_store.csv_writer(course_id, _report_csv_filename(course_id, csv_name, timestamp)) as writer:
+        yield writer
+    if writer.stored:
+        tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
+
+
+def _report_csv_filename(course_id, csv_name, timestamp):
+    """
+    Returns the name of the report CSV file `csv_name` generated at `timestamp`.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
     )
-    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
 def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at, config_name='FINANCIAL_REPORTS'):
@@ -658,19 +695,29 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
-
-    As we start to add more CSV downloads, it will probably be worthwhile to
-    make a more general CSVDoc class instead of building out the rows like we
-    do here.
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    written to a spooled temporary file as students are graded, and the file
+    is only uploaded once complete, so we'll never write part of a CSV file
+    to S3 -- i.e. any files that are visible in ReportStore will be complete
+    ones.
+
+    If `settings.GRADES_DOWNLOAD_STUDENTS_PER_SHARD` is set and there are more
+    enrolled students than that, the grading is instead split into shards that
+    are graded in parallel by subtasks (see `upload_grades_csv_shard`).
     """
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
-    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
+    total_enrolled_students = enrolled_students.count()
+
+    students_per_shard = getattr(settings, 'GRADES_DOWNLOAD_STUDENTS_PER_SHARD', None)
+    if students_per_shard and total_enrolled_students > students_per_shard and _entry_id is not None:
+        return _queue_grade_report_shards(
+            _entry_id, action_name, enrolled_students, total_enrolled_students, students_per_shard, start_time
+        )
+
+    task_progress = TaskProgress(action_name, total_enrolled_students, start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
     task_info_string = fmt.format(
@@ -681,26 +728,8 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    course = get_course_by_id(course_id)
-    course_is_cohorted = is_course_cohorted(course.id)
-    teams_enabled = course.teams_enabled
-    cohorts_header = ['Cohort Name'] if course_is_cohorted else []
-    teams_header = ['Team Name'] if teams_enabled else []
-
-    experiment_partitions = get_split_user_partitions(course.user_partitions)
-    group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
-
-    certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
-    certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
-    whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
-
-    # Loop over all our students and build our CSV lists in memory
-    header = None
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
-    total_enrolled_students = enrolled_students.count()
     student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
@@ -710,17 +739,43 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
         total_enrolled_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
+    # Stream the rows of both CSV files as students are graded.  The grade
+    # report is uploaded first, when the inner context exits.
+    with report_csv_writer('grade_report_err', course_id, start_date) as err_writer, \
+            report_csv_writer('grade_report', course_id, start_date) as writer:
+        err_writer.writerow(GRADE_REPORT_ERR_HEADER)
+        for student, row, err_row in _iterate_grade_report_rows(course_id, enrolled_students):
+            if student is None:
+                # This is the header row of the grade report.
+                writer.writerow(row)
+                continue
+
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
+
+            # Now add a log entry after each student is graded to get a sense
+            # of the task's progress
+            student_counter += 1
+            TASK_LOG.info(
+                u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+                task_info_string,
+                action_name,
+                current_step,
+                student_counter,
+                total_enrolled_students
+            )
+
+            if row is not None:
+                task_progress.succeeded += 1
+                writer.writerow(row)
+            else:
+                task_progress.failed += 1
+                err_writer.writerow(err_row)
 
-        # Now add a log entry after each student is graded to get a sense
-        # of the task's progress
-        student_counter += 1
         TASK_LOG.info(
-            u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+            u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
             task_info_string,
             action_name,
             current_step,
@@ -728,95 +783,356 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             total_enrolled_students
         )
 
-        if gradeset:
-            # We were able to successfully grade this student for this course.
-            task_progress.succeeded += 1
-            if not header:
-                header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
-                    ["id", "email", "username", "grade"] + header + cohorts_header +
-                    group_configs_header + teams_header +
-                    ['Enrollment Track', 'Verification Status'] + certificate_info_header
-                )
+        # By this point, we've written all the rows of our CSV files.
+        current_step = {'step': 'Uploading CSVs'}
+        task_progress.update_task_state(extra_meta=current_step)
+        TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-            percents = {
-                section['label']: section.get('percent', 0.0)
-                for section in gradeset[u'section_breakdown']
-                if 'label' in section
-            }
+        # Only upload the error report if there are any error rows (don't count the header)
+        if err_writer.rows_written <= 1:
+            err_writer.discard()
 
-            cohorts_group_name = []
-            if course_is_cohorted:
-                group = get_cohort(student, course_id, assign=False)
-                cohorts_group_name.append(group.name if group else '')
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
 
-            group_configs_group_names = []
-            for partition in experiment_partitions:
-                group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
-                group_configs_group_names.append(group.name if group else '')
 
-            team_name = []
-            if teams_enabled:
-                try:
-                    membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
-                    team_name.append(membership.team.name)
-                except CourseTeamMembership.DoesNotExist:
-                    team_name.append('')
-
-            enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
-            verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
-                student,
-                course_id,
-                enrollment_mode
-            )
-            certificate_info = certificate_info_for_user(
-                student,
-                course_id,
-                gradeset['grade'],
-                student.id in whitelisted_user_ids
-            )
+def _iterate_grade_report_rows(course_id, students, section_labels=None):
+    """
+    Grades the given students and yields a `(student, row, err_row)` tuple
+    for each of them, where `row` is their grade report row if they could be
+    graded, and `err_row` their error report row otherwise.
 
-            # Not everybody has the same gradable items. If the item is not
-            # found in the user's gradeset, just assume it's a 0. The aggregated
-            # grades for their sections and overall course will be calculated
-            # without regard for the item they didn't have access to, so it's
-            # possible for a student to have a 0.0 show up in their row but
-            # still have 100% for the course.
-            row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
-                [student.id, student.email, student.username, gradeset['percent']] +
-                row_percents + cohorts_group_name + group_configs_group_names + team_name +
-                [enrollment_mode] + [verification_status] + certificate_info
-            )
-        else:
+    Before the row of the first successfully graded student, the header of
+    the grade report is yielded as `(None, header_row, None)`.
+
+    The section columns of the report are the given `section_labels`, or
+    else those of the first successfully graded student.
+    """
+    course = get_course_by_id(course_id)
+    course_is_cohorted = is_course_cohorted(course.id)
+    teams_enabled = course.teams_enabled
+    experiment_partitions = get_split_user_partitions(course.user_partitions)
+
+    certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
+    whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
+
+    header = section_labels
+    header_yielded = False
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students):
+        if not gradeset:
             # An empty gradeset means we failed to grade a student.
-            task_progress.failed += 1
-            err_rows.append([student.id, student.username, err_msg])
+            yield student, None, [student.id, student.username, err_msg]
+            continue
 
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
-        task_info_string,
+        # We were able to successfully grade this student for this course.
+        if not header_yielded:
+            if header is None:
+                header = [section['label'] for section in gradeset[u'section_breakdown']]
+            header_yielded = True
+            yield None, _grade_report_header_row(course, header), None
+
+        percents = {
+            section['label']: section.get('percent', 0.0)
+            for section in gradeset[u'section_breakdown']
+            if 'label' in section
+        }
+
+        cohorts_group_name = []
+        if course_is_cohorted:
+            group = get_cohort(student, course_id, assign=False)
+            cohorts_group_name.append(group.name if group else '')
+
+        group_configs_group_names = []
+        for partition in experiment_partitions:
+            group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
+            group_configs_group_names.append(group.name if group else '')
+
+        team_name = []
+        if teams_enabled:
+            try:
+                membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
+                team_name.append(membership.team.name)
+            except CourseTeamMembership.DoesNotExist:
+                team_name.append('')
+
+        enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
+        verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
+            student,
+            course_id,
+            enrollment_mode
+        )
+        certificate_info = certificate_info_for_user(
+            student,
+            course_id,
+            gradeset['grade'],
+            student.id in whitelisted_user_ids
+        )
+
+        # Not everybody has the same gradable items. If the item is not
+        # found in the user's gradeset, just assume it's a 0. The aggregated
+        # grades for their sections and overall course will be calculated
+        # without regard for the item they didn't have access to, so it's
+        # possible for a student to have a 0.0 show up in their row but
+        # still have 100% for the course.
+        row_percents = [percents.get(label, 0.0) for label in header]
+        yield student, (
+            [student.id, student.email, student.username, gradeset['percent']] +
+            row_percents + cohorts_group_name + group_configs_group_names + team_name +
+            [enrollment_mode] + [verification_status] + certificate_info
+        ), None
+
+
+def _grade_report_header_row(course, section_labels):
+    """
+    Returns the header row of the grade report of the given course, with
+    the given section columns.
+    """
+    cohorts_header = ['Cohort Name'] if is_course_cohorted(course.id) else []
+    teams_header = ['Team Name'] if course.teams_enabled else []
+    experiment_partitions = get_split_user_partitions(course.user_partitions)
+    group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
+    certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
+    return (
+        ["id", "email", "username", "grade"] + section_labels + cohorts_header +
+        group_configs_header + teams_header +
+        ['Enrollment Track', 'Verification Status'] + certificate_info_header
+    )
+
+
+def _grade_report_section_labels(course_id, students):
+    """
+    Returns the section columns of a grade report of the given students.
+
+    Like the unsharded grade report, they are the labels of the section
+    breakdown of the first student who can be graded.  Students are graded
+    one at a time until then.
+    """
+    for __, gradeset, __ in iterate_grades_for(course_id, students, chunk_size=1):
+        if gradeset:
+            return [section['label'] for section in gradeset[u'section_breakdown']]
+    return []
+
+
+def _queue_grade_report_shards(entry_id, action_name, enrolled_students, total_enrolled_students,
+                               students_per_shard, start_time):
+    """
+    Splits the enrolled students into shards of `students_per_shard`, and
+    queues a subtask to grade each of them.  The last shard to complete
+    merges the shards into the final grade report.
+
+    Returns the task progress as stored in the InstructorTask object.
+    """
+    # Avoid a circular import, since tasks imports this module.
+    from instructor_task.tasks import calculate_grades_csv_shard
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # Like bulk email, don't redefine the shards if this task is run again
+    # after they have already been queued.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already queued its grade report shards: %s", entry.task_id, entry)
+        return json.loads(entry.task_output)
+
+    # Every shard has the same columns, so that their rows can be merged under a single header.
+    section_labels = _grade_report_section_labels(entry.course_id, enrolled_students.order_by('id').iterator())
+
+    def _create_grade_report_shard_subtask(student_list, initial_subtask_status):
+        """Creates a subtask to grade the given shard of students."""
+        return calculate_grades_csv_shard.subtask(
+            (
+                entry_id,
+                [student['pk'] for student in student_list],
+                section_labels,
+                start_time,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    return queue_subtasks_for_query(
+        entry,
         action_name,
-        current_step,
-        student_counter,
-        total_enrolled_students
+        _create_grade_report_shard_subtask,
+        # Order the students so that the shards, and the merged report, are sorted by user id.
+        [enrolled_students.order_by('id')],
+        [],
+        students_per_shard,
+        total_enrolled_students,
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+def upload_grades_csv_shard(entry_id, student_ids, section_labels, start_time, subtask_status_dict):
+    """
+    Grades the given shard of students of a sharded grade report and writes
+    its grade and error rows, without headers, to temporary report storage.
+    If this is the last shard of the report to complete, the shards are then
+    merged into the final grade report CSVs.
 
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+    `section_labels` are the section columns of the report, shared by all of
+    its shards.
 
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+    Returns the updated status of this subtask, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+
+    # Make sure that the shard hasn't already been graded by a duplicate of this subtask.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    # The user ids are sorted, so the first one gives the shard its place in the merged report.
+    shard_name = u'{:012d}'.format(student_ids[0])
+    shards_dir = _grade_report_shards_dir(entry_id)
+    grades_path = os.path.join(shards_dir, 'grades', shard_name + '.csv')
+    errors_path = os.path.join(shards_dir, 'errors', shard_name + '.csv')
+    try:
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        students = User.objects.filter(id__in=student_ids).order_by('id')
+        with track_memory_usage('instructor_tasks.grade_report_shard.memory', course_id), \
+                report_store.csv_writer(course_id, errors_path) as err_writer, \
+                report_store.csv_writer(course_id, grades_path) as writer:
+            for student, row, err_row in _iterate_grade_report_rows(course_id, students, section_labels):
+                if student is None:
+                    # The header row is written when merging the shards.
+                    continue
+                elif row is not None:
+                    writer.writerow(row)
+                    subtask_status.increment(succeeded=1)
+                else:
+                    err_writer.writerow(err_row)
+                    subtask_status.increment(failed=1)
+            if not err_writer.rows_written:
+                err_writer.discard()
+    except Exception as exception:
+        TASK_LOG.exception(u"Grade report shard %s of instructor task %s: failed unexpectedly!", current_task_id, entry_id)
+        # Since we don't know how far the shard got, report all of its students as failed.
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        subtask_status.increment(
+            failed=len(student_ids),
+            state=_write_failed_grade_report_shard(course_id, student_ids, grades_path, errors_path, exception),
+        )
+        update_subtask_status(entry_id, current_task_id, subtask_status, complete_task=False)
+        _merge_grade_report_shards_if_complete(entry_id, course_id, section_labels, start_time)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status, complete_task=False)
+    _merge_grade_report_shards_if_complete(entry_id, course_id, section_labels, start_time)
+    return subtask_status.to_dict()
+
+
+def _write_failed_grade_report_shard(course_id, student_ids, grades_path, errors_path, exception):
+    """
+    Replaces the rows of a grade report shard that failed with an error row
+    for each of its students, so that the merged report accounts for them.
+
+    Returns the state of the shard's subtask: SUCCESS if the error rows were
+    written, or else FAILURE, which fails the whole report when it is merged.
+    """
+    try:
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        report_store.delete(course_id, grades_path)
+        usernames = dict(User.objects.filter(id__in=student_ids).values_list('id', 'username'))
+        with report_store.csv_writer(course_id, errors_path) as err_writer:
+            err_writer.writerows(
+                [student_id, usernames.get(student_id, ''), exception.message] for student_id in student_ids
+            )
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception(u"Unable to write the error rows of failed grade report shard %s", errors_path)
+        return FAILURE
+    return SUCCESS
+
+
+def _grade_report_shards_dir(entry_id):
+    """
+    Returns the report storage directory holding the shards of the grade
+    report of the given InstructorTask.
+    """
+    return u'grade_report_shards/{}'.format(entry_id)
+
+
+def _merge_grade_report_shards_if_complete(entry_id, course_id, section_labels, start_time):
+    """
+    Merges the shards of a sharded grade report into the final grade report
+    CSVs, if all of the report's shards have completed, and only then marks
+    the InstructorTask as succeeded.  The InstructorTask is marked as failed
+    instead if the merge fails, or if any shard failed without reporting its
+    students in the error rows.
+
+    A cache lock ensures that the merge happens only once, even if several
+    shards complete at the same time.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+        return
+    lock_key = u'grade-report-merge-{}'.format(entry_id)
+    if not cache.add(lock_key, 'true', GRADE_REPORT_MERGE_LOCK_EXPIRE):
+        return
+
+    try:
+        # The lock is released once the merge is done, so check it hasn't already happened.
+        entry = InstructorTask.objects.get(pk=entry_id)
+        if entry.task_state in READY_STATES:
+            return
+
+        start_date = datetime.fromtimestamp(start_time, UTC)
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        shards_dir = _grade_report_shards_dir(entry_id)
+        try:
+            subtask_dict = json.loads(entry.subtasks)
+            if subtask_dict['failed']:
+                raise ValueError(
+                    u"{failed} of the {total} grade report shards failed".format(**subtask_dict)
+                )
+            with track_memory_usage('instructor_tasks.grade_report_merge.memory', course_id):
+                _merge_csv_shards(
+                    report_store, course_id, os.path.join(shards_dir, 'grades'), 'grade_report', start_date,
+                    header=_grade_report_header_row(get_course_by_id(course_id), section_labels),
+                )
+                _merge_csv_shards(
+                    report_store, course_id, os.path.join(shards_dir, 'errors'), 'grade_report_err', start_date,
+                    header=GRADE_REPORT_ERR_HEADER,
+                )
+        except Exception as exception:
+            TASK_LOG.exception(u"Grade report merge of instructor task %s: failed unexpectedly!", entry_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exception, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+            raise
+
+        entry.task_state = SUCCESS
+        entry.save_now()
+    finally:
+        cache.delete(lock_key)
+
+
+def _merge_csv_shards(report_store, course_id, shards_dir, csv_name, timestamp, header):
+    """
+    Concatenates the CSV shards stored in `shards_dir`, in order of their
+    names, into a single report CSV starting with the `header` row, and
+    deletes the shards.  Nothing is written if there are no shards.
+    """
+    shard_names = sorted(report_store.listdir(course_id, shards_dir))
+    if not shard_names:
+        return
+
+    with SpooledTemporaryFile(max_size=GRADE_REPORT_MERGE_MAX_MEMORY) as merged_file:
+        csvwriter = unicodecsv.writer(merged_file, encoding='utf-8')
+        csvwriter.writerow(header)
+        for shard_name in shard_names:
+            shard_path = os.path.join(shards_dir, shard_name)
+            with report_store.open(course_id, shard_path) as shard_file:
+                # The shards are already utf-8 encoded, so copy their rows as they are.
+                for line in shard_file:
+                    merged_file.write(line)
+            report_store.delete(course_id, shard_path)
+        merged_file.seek(0)
+        report_store.store(course_id, _report_csv_filename(course_id, csv_name, timestamp), merged_file)
+    tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
 def _order_problems(blocks):
@@ -928,51 +1244,54 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
             extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
         )
 
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
-    error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
-        student_fields = [getattr(student, field_name) for field_name in header_row]
-        task_progress.attempted += 1
+    with report_csv_writer('problem_grade_report_err', course_id, start_date) as err_writer, \
+            report_csv_writer('problem_grade_report', course_id, start_date) as writer:
+        # Just generate the static fields for now.
+        writer.writerow(list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values())))
+        err_writer.writerow(list(header_row.values()) + ['error_msg'])
 
-        if 'percent' not in gradeset or 'raw_scores' not in gradeset:
-            # There was an error grading this student.
-            # Generally there will be a non-empty err_msg, but that is not always the case.
-            if not err_msg:
-                err_msg = u"Unknown error"
-            error_rows.append(student_fields + [err_msg])
-            task_progress.failed += 1
-            continue
+        for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+            student_fields = [getattr(student, field_name) for field_name in header_row]
+            task_progress.attempted += 1
 
-        final_grade = gradeset['percent']
-        # Only consider graded problems
-        problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
-        earned_possible_values = list()
-        for problem_id in problems:
-            try:
-                problem_score = problem_scores[problem_id]
-                earned_possible_values.append([problem_score.earned, problem_score.possible])
-            except KeyError:
-                # The student has not been graded on this problem.  For example,
-                # iterate_grades_for skips problems that students have never
-                # seen in order to speed up report generation.  It could also be
-                # the case that the student does not have access to it (e.g. A/B
-                # test or cohorted courseware).
-                earned_possible_values.append(['N/A', 'N/A'])
-        rows.append(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
-
-        task_progress.succeeded += 1
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
+            if 'percent' not in gradeset or 'raw_scores' not in gradeset:
+                # There was an error grading this student.
+                # Generally there will be a non-empty err_msg, but that is not always the case.
+                if not err_msg:
+                    err_msg = u"Unknown error"
+                err_writer.writerow(student_fields + [err_msg])
+                task_progress.failed += 1
+                continue
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
-    if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+            final_grade = gradeset['percent']
+            # Only consider graded problems
+            problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
+            earned_possible_values = list()
+            for problem_id in problems:
+                try:
+                    problem_score = problem_scores[problem_id]
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                except KeyError:
+                    # The student has not been graded on this problem.  For example,
+                    # iterate_grades_for skips problems that students have never
+                    # seen in order to speed up report generation.  It could also be
+                    # the case that the student does not have access to it (e.g. A/B
+                    # test or cohorted courseware).
+                    earned_possible_values.append(['N/A', 'N/A'])
+            writer.writerow(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
+
+            task_progress.succeeded += 1
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+
+        # Perform the upload if any students have been successfully graded
+        if writer.rows_written <= 1:
+            writer.discard()
+        # If there are any error rows, write them out as well
+        if err_writer.rows_written <= 1:
+            err_writer.discard()
 
     return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
 
@@ -1031,8 +1350,6 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
     header = None
     current_step = {'step': 'Gathering Profile Information'}
     enrollment_report_provider = PaidCourseEnrollmentReportProvider()
@@ -1046,85 +1363,87 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    for student in students_in_course:
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
-
-        # Now add a log entry after certain intervals to get a hint that task is in progress
-        student_counter += 1
-        if student_counter % 100 == 0:
-            TASK_LOG.info(
-                u'%s, Task type: %s, Current step: %s, gathering enrollment profile for students in progress: %s/%s',
-                task_info_string,
-                action_name,
-                current_step,
-                student_counter,
-                total_students
-            )
-
-        user_data = enrollment_report_provider.get_user_profile(student.id)
-        course_enrollment_data = enrollment_report_provider.get_enrollment_info(student, course_id)
-        payment_data = enrollment_report_provider.get_payment_info(student, course_id)
-
-        # display name map for the column headers
-        enrollment_report_headers = {
-            'User ID': _('User ID'),
-            'Username': _('Username'),
-            'Full Name': _('Full Name'),
-            'First Name': _('First Name'),
-            'Last Name': _('Last Name'),
-            'Company Name': _('Company Name'),
-            'Title': _('Title'),
-            'Language': _('Language'),
-            'Year of Birth': _('Year of Birth'),
-            'Gender': _('Gender'),
-            'Level of Education': _('Level of Education'),
-            'Mailing Address': _('Mailing Address'),
-            'Goals': _('Goals'),
-            'City': _('City'),
-            'Country': _('Country'),
-            'Enrollment Date': _('Enrollment Date'),
-            'Currently Enrolled': _('Currently Enrolled'),
-            'Enrollment Source': _('Enrollment Source'),
-            'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
-            'Enrollment Role': _('Enrollment Role'),
-            'List Price': _('List Price'),
-            'Payment Amount': _('Payment Amount'),
-            'Coupon Codes Used': _('Coupon Codes Used'),
-            'Registration Code Used': _('Registration Code Used'),
-            'Payment Status': _('Payment Status'),
-            'Transaction Reference Number': _('Transaction Reference Number')
-        }
+    with report_csv_writer(
+            'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS'
+    ) as writer:
+        for student in students_in_course:
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
 
-        if not header:
-            header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
-            display_headers = []
-            for header_element in header:
-                # translate header into a localizable display string
-                display_headers.append(enrollment_report_headers.get(header_element, header_element))
-            rows.append(display_headers)
+            # Now add a log entry after certain intervals to get a hint that task is in progress
+            student_counter += 1
+            if student_counter % 100 == 0:
+                TASK_LOG.info(
+                    u'%s, Task type: %s, Current step: %s, '
+                    u'gathering enrollment profile for students in progress: %s/%s',
+                    task_info_string,
+                    action_name,
+                    current_step,
+                    student_counter,
+                    total_students
+                )
 
-        rows.append(user_data.values() + course_enrollment_data.values() + payment_data.values())
-        task_progress.succeeded += 1
+            user_data = enrollment_report_provider.get_user_profile(student.id)
+            course_enrollment_data = enrollment_report_provider.get_enrollment_info(student, course_id)
+            payment_data = enrollment_report_provider.get_payment_info(student, course_id)
+
+            # display name map for the column headers
+            enrollment_report_headers = {
+                'User ID': _('User ID'),
+                'Username': _('Username'),
+                'Full Name': _('Full Name'),
+                'First Name': _('First Name'),
+                'Last Name': _('Last Name'),
+                'Company Name': _('Company Name'),
+                'Title': _('Title'),
+                'Language': _('Language'),
+                'Year of Birth': _('Year of Birth'),
+                'Gender': _('Gender'),
+                'Level of Education': _('Level of Education'),
+                'Mailing Address': _('Mailing Address'),
+                'Goals': _('Goals'),
+                'City': _('City'),
+                'Country': _('Country'),
+                'Enrollment Date': _('Enrollment Date'),
+                'Currently Enrolled': _('Currently Enrolled'),
+                'Enrollment Source': _('Enrollment Source'),
+                'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
+                'Enrollment Role': _('Enrollment Role'),
+                'List Price': _('List Price'),
+                'Payment Amount': _('Payment Amount'),
+                'Coupon Codes Used': _('Coupon Codes Used'),
+                'Registration Code Used': _('Registration Code Used'),
+                'Payment Status': _('Payment Status'),
+                'Transaction Reference Number': _('Transaction Reference Number')
+            }
 
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Detailed enrollment report generated for students: %s/%s',
-        task_info_string,
-        action_name,
-        current_step,
-        student_counter,
-        total_students
-    )
+            if not header:
+                header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
+                display_headers = []
+                for header_element in header:
+                    # translate header into a localizable display string
+                    display_headers.append(enrollment_report_headers.get(header_element, header_element))
+                writer.writerow(display_headers)
+
+            writer.writerow(user_data.values() + course_enrollment_data.values() + payment_data.values())
+            task_progress.succeeded += 1
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+        TASK_LOG.info(
+            u'%s, Task type: %s, Current step: %s, Detailed enrollment report generated for students: %s/%s',
+            task_info_string,
+            action_name,
+            current_step,
+            student_counter,
+            total_students
+        )
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS')
+        # By this point, we've written all the rows of our CSV file, which is
+        # uploaded when the writer exits.
+        current_step = {'step': 'Uploading CSVs'}
+        task_progress.update_task_state(extra_meta=current_step)
+        TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
     # One last update before we close out...
     TASK_LOG.info(u'%s, Task type: %s, Finalizing detailed enrollment task', task_info_string, action_name)
@@ -1622,6 +1941,10 @@ def upload_ora2_data(
 ):
     """
     Collect ora2 responses and upload them to S3 as a CSV
+
+    `OraAggregateData.collect_ora2_data` returns all of the responses as a
+    list, so they are all in memory at once; only their CSV is written to a
+    spooled temporary file instead of a second in-memory copy.
     """
 
     start_date = datetime.now(UTC)
@@ -1654,7 +1977,7 @@ def upload_ora2_data(
 
     try:
         header, datarows = OraAggregateData.collect_ora2_data(course_id)
-        rows = [header] + [row for row in datarows]
+        rows = chain([header], datarows)
     # Update progress to failed regardless of error type
     except Exception:  # pylint: disable=broad-except
         TASK_LOG.exception('Failed to get ORA data.')
@@ -2,6 +2,7 @@
 Tests for instructor_task/models.py.
 """
 import copy
+import csv
 from cStringIO import StringIO
 import time
 
@@ -11,7 +12,7 @@ from django.test import SimpleTestCase, override_settings
 from mock import patch
 
 from common.test.utils import MockS3Mixin
-from instructor_task.models import ReportStore
+from instructor_task.models import ReportCSVWriter, ReportStore
 from instructor_task.tests.test_base import TestReportMixin
 from opaque_keys.edx.locator import CourseLocator
 
@@ -49,6 +50,21 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_csv_writer_stores_on_exit(self):
+        """
+        Test that a CSV written with ReportStore.csv_writer() is stored
+        only once the writer exits, and not if it was discarded.
+        """
+        report_store = self.create_report_store()
+        with report_store.csv_writer(self.course_id, 'report.csv') as writer:
+            writer.writerow([u'header'])
+            self.assertEqual(report_store.links_for(self.course_id), [])
+        with report_store.csv_writer(self.course_id, 'discarded.csv') as writer:
+            writer.writerow([u'header'])
+            writer.discard()
+
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -112,3 +128,44 @@ class DjangoStorageReportStoreS3TestCase(MockS3Mixin, ReportStoreTestMixin, Test
             connection = boto.connect_s3()
             connection.create_bucket(settings.GRADES_DOWNLOAD['STORAGE_KWARGS']['bucket'])
             return ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+
+class ReportCSVWriterTestCase(TestReportMixin, SimpleTestCase):
+    """
+    Test writing report CSVs incrementally with ReportCSVWriter.
+    """
+    def setUp(self):
+        super(ReportCSVWriterTestCase, self).setUp()
+        self.course_id = CourseLocator(org="testx", course="coursex", run="runx")
+        self.report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    def read_rows(self, filename):
+        """
+        Return the rows of the stored CSV file `filename`, decoded from utf-8.
+        """
+        with self.report_store.open(self.course_id, filename) as report_file:
+            return [[value.decode('utf-8') for value in row] for row in csv.reader(report_file)]
+
+    def test_store_rows_from_generator(self):
+        rows = ([unicode(index), u'caf\xe9'] for index in range(1000))
+        self.report_store.store_rows(self.course_id, 'report.csv', rows)
+        self.assertEqual(
+            self.read_rows('report.csv'),
+            [[unicode(index), u'caf\xe9'] for index in range(1000)],
+        )
+
+    def test_spooled_to_disk(self):
+        with ReportCSVWriter(self.report_store, self.course_id, 'report.csv', max_memory=100) as writer:
+            for index in range(100):
+                writer.writerow([index, u'some value'])
+            self.assertEqual(writer.rows_written, 100)
+        self.assertTrue(writer.stored)
+        self.assertEqual(len(self.read_rows('report.csv')), 100)
+
+    def test_not_stored_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.report_store.csv_writer(self.course_id, 'report.csv') as writer:
+                writer.writerow([u'header'])
+                raise ValueError()
+        self.assertFalse(writer.stored)
+        self.assertEqual(self.report_store.links_for(self.course_id), [])
@@ -8,17 +8,21 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 from datetime import datetime
 import urllib
+from uuid import uuid4
 
+from celery.states import FAILURE, SUCCESS
 import ddt
 from freezegun import freeze_time
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 import tempfile
 import unicodecsv
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
@@ -44,7 +48,8 @@ from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnro
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from instructor_task.models import ReportStore
+from instructor_task.models import PROGRESS, InstructorTask, ReportStore
+from instructor_task.tests.factories import InstructorTaskFactory
 from survey.models import SurveyForm, SurveyAnswer
 from instructor_task.tasks_helper import (
     cohort_students_and_upload,
@@ -60,6 +65,7 @@ from instructor_task.tasks_helper import (
     upload_ora2_data,
     UPDATE_STATUS_FAILED,
     UPDATE_STATUS_SUCCEEDED,
+    _iterate_grade_report_rows,
 )
 from instructor_analytics.basic import UNAVAILABLE
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
@@ -305,6 +311,149 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         result = upload_grades_csv(None, None, self.course.id, None, 'graded')
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_SHARD=2)
+    def test_sharded_grade_report(self):
+        """
+        Test that grade reports of courses with more students than a shard
+        are graded by subtasks and merged into a single report.
+        """
+        students = [
+            self.create_student('student{}'.format(index), 'student{}@example.com'.format(index))
+            for index in range(5)
+        ]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output)
+        )
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{'username': student.username} for student in sorted(students, key=lambda student: student.id)],
+            ignore_other_columns=True,
+        )
+
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_SHARD=2)
+    def test_sharded_grade_report_header(self):
+        """
+        Test that every shard of a sharded grade report has the section
+        columns computed by the parent task.
+        """
+        students = [
+            self.create_student('student{}'.format(index), 'student{}@example.com'.format(index))
+            for index in range(5)
+        ]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course', task_id=str(uuid4()))
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            with patch(
+                'instructor_task.tasks_helper._grade_report_section_labels', return_value=['Not Attempted']
+            ) as mock_section_labels:
+                upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertEqual(mock_section_labels.call_count, 1)
+        self.verify_rows_in_csv(
+            [
+                {'username': student.username, 'Not Attempted': '0.0'}
+                for student in sorted(students, key=lambda student: student.id)
+            ],
+            ignore_other_columns=True,
+        )
+
+    @ddt.data(None, ValueError('Merge failed'))
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_SHARD=2)
+    def test_sharded_grade_report_merge(self, merge_error):
+        """
+        Test that a sharded grade report only succeeds once its shards are
+        merged, and that the merge lock is released whether it succeeds or not.
+        """
+        for index in range(3):
+            self.create_student('student{}'.format(index), 'student{}@example.com'.format(index))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course', task_id=str(uuid4()))
+        task_states = []
+
+        def _merge_csv_shards(*args, **kwargs):  # pylint: disable=unused-argument
+            """Records the state of the task while its shards are merged."""
+            task_states.append(InstructorTask.objects.get(pk=entry.id).task_state)
+            if merge_error:
+                raise merge_error
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            with patch('instructor_task.tasks_helper._merge_csv_shards', side_effect=_merge_csv_shards):
+                upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertEqual(task_states[0], PROGRESS)
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, FAILURE if merge_error else SUCCESS)
+        self.assertTrue(cache.add(u'grade-report-merge-{}'.format(entry.id), 'true'))
+
+    @ddt.data(SUCCESS, FAILURE)
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_SHARD=2)
+    def test_sharded_grade_report_failed_shard(self, error_rows_state):
+        """
+        Test that the students of a shard that fails are reported in the
+        error rows of the merged report, and that the report fails if even
+        the error rows can't be written.
+        """
+        students = sorted(
+            [
+                self.create_student('student{}'.format(index), 'student{}@example.com'.format(index))
+                for index in range(5)
+            ],
+            key=lambda student: student.id,
+        )
+        failed_students = students[2:4]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course', task_id=str(uuid4()))
+
+        def _iterate_failing_grade_report_rows(course_id, shard_students, section_labels):
+            """Fails while grading the shard of `failed_students`."""
+            if failed_students[0] in shard_students:
+                raise ValueError('Shard failed')
+            return _iterate_grade_report_rows(course_id, shard_students, section_labels)
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            with patch(
+                'instructor_task.tasks_helper._iterate_grade_report_rows',
+                side_effect=_iterate_failing_grade_report_rows,
+            ):
+                if error_rows_state == SUCCESS:
+                    upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+                else:
+                    with patch(
+                        'instructor_task.tasks_helper._write_failed_grade_report_shard', return_value=FAILURE
+                    ):
+                        upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, error_rows_state)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_names = [name for name, _ in report_store.links_for(self.course.id)]
+        if error_rows_state == FAILURE:
+            self.assertDictContainsSubset({'succeeded': 2, 'failed': 1, 'total': 3}, json.loads(entry.subtasks))
+            self.assertEqual(json.loads(entry.task_output)['message'], u'1 of the 3 grade report shards failed')
+            self.assertEqual(report_names, [])
+            return
+
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 3, 'failed': 2, 'total': 5}, json.loads(entry.task_output)
+        )
+        self.assertEqual(len(report_names), 2)
+        err_report_name = next(name for name in report_names if 'grade_report_err' in name)
+        with report_store.open(self.course.id, err_report_name) as csv_file:
+            err_rows = list(unicodecsv.DictReader(csv_file))
+        self.assertEqual(
+            [(row['id'], row['username'], row['error_msg']) for row in err_rows],
+            [(unicode(student.id), student.username, u'Shard failed') for student in failed_students],
+        )
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
@@ -312,6 +312,9 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", COMMENTS_SERVICE_POOL_SIZE)
+COMMENTS_SERVICE_MAX_RETRIES = ENV_TOKENS.get("COMMENTS_SERVICE_MAX_RETRIES", COMMENTS_SERVICE_MAX_RETRIES)
+COMMENTS_SERVICE_FAN_OUT_WORKERS = ENV_TOKENS.get("COMMENTS_SERVICE_FAN_OUT_WORKERS", COMMENTS_SERVICE_FAN_OUT_WORKERS)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -336,6 +339,8 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_CACHE_MAX_ENTRIES = ENV_TOKENS.get("SAFE_EXEC_CACHE_MAX_ENTRIES", SAFE_EXEC_CACHE_MAX_ENTRIES)
+SAFE_EXEC_CACHE_TIMEOUT = ENV_TOKENS.get("SAFE_EXEC_CACHE_TIMEOUT", SAFE_EXEC_CACHE_TIMEOUT)
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -595,6 +600,49 @@ VERIFY_STUDENT = AUTH_TOKENS.get("VERIFY_STUDENT", VERIFY_STUDENT)
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADES_DOWNLOAD_STUDENTS_PER_SHARD = ENV_TOKENS.get(
+    "GRADES_DOWNLOAD_STUDENTS_PER_SHARD", GRADES_DOWNLOAD_STUDENTS_PER_SHARD
+)
+
+# Block structures
+BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    "BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE", BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE
+)
+
+# Course assets cached on disk
+CONTENTSERVER_DISK_CACHE_DIR = ENV_TOKENS.get("CONTENTSERVER_DISK_CACHE_DIR", CONTENTSERVER_DISK_CACHE_DIR)
+CONTENTSERVER_DISK_CACHE_CHUNK_SIZE = ENV_TOKENS.get(
+    "CONTENTSERVER_DISK_CACHE_CHUNK_SIZE", CONTENTSERVER_DISK_CACHE_CHUNK_SIZE
+)
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    "CONTENTSERVER_DISK_CACHE_MAX_SIZE", CONTENTSERVER_DISK_CACHE_MAX_SIZE
+)
+
+# Course structures cached in each process
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    "COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE", COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE
+)
+
+# Field overrides of CCXs cached across requests
+CCX_OVERRIDES_CACHE_TIMEOUT = ENV_TOKENS.get("CCX_OVERRIDES_CACHE_TIMEOUT", CCX_OVERRIDES_CACHE_TIMEOUT)
+
+# Configuration model entries cached in each process and request
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = ENV_TOKENS.get(
+    "CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT", CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT
+)
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = ENV_TOKENS.get(
+    "CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED", CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED
+)
+
+# Enrollments of a user cached across and within requests
+COURSE_ENROLLMENT_CACHE_TIMEOUT = ENV_TOKENS.get("COURSE_ENROLLMENT_CACHE_TIMEOUT", COURSE_ENROLLMENT_CACHE_TIMEOUT)
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = ENV_TOKENS.get(
+    "COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED", COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED
+)
+
+# Asset manifests of courses used to rewrite /static/ urls
+ASSET_MANIFEST_CACHE_TIMEOUT = ENV_TOKENS.get("ASSET_MANIFEST_CACHE_TIMEOUT", ASSET_MANIFEST_CACHE_TIMEOUT)
+ASSET_MANIFEST_CACHE_MAX_SIZE = ENV_TOKENS.get("ASSET_MANIFEST_CACHE_MAX_SIZE", ASSET_MANIFEST_CACHE_MAX_SIZE)
 
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
@@ -769,6 +769,12 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Results of sandboxed code are cached in a per-process cache of at most
+# SAFE_EXEC_CACHE_MAX_ENTRIES entries, in front of the "default" cache, for
+# SAFE_EXEC_CACHE_TIMEOUT seconds.
+SAFE_EXEC_CACHE_MAX_ENTRIES = 1000
+SAFE_EXEC_CACHE_TIMEOUT = 24 * 60 * 60
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1891,7 +1897,7 @@ INSTALLED_APPS = (
     'openedx.core.djangoapps.course_groups',
     'bulk_email',
     'branding',
-    'grades',
+    'lms.djangoapps.grades',
 
     # Student support tools
     'support',
@@ -2342,6 +2348,10 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# If set, grade reports of courses with more enrolled students than this are
+# generated by subtasks that each grade a shard of this many students.
+GRADES_DOWNLOAD_STUDENTS_PER_SHARD = None
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
@@ -2944,3 +2954,90 @@ AFFILIATE_COOKIE_NAME = 'affiliate_id'
 # The cache is cleared when Redirect models are saved/deleted
 REDIRECT_CACHE_TIMEOUT = None  # The length of time we cache Redirect model data
 REDIRECT_CACHE_KEY_PREFIX = 'redirects'
+
+############## Settings for Block Structures ###############
+
+# Maximum size, in bytes of pickled data, of the per-process cache of
+# collected block structures.  The per-process cache is disabled if 0.
+BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE = 0
+
+############## Settings for the contentserver ###############
+
+# Directory where course assets too large for the "course_assets" cache are
+# cached, as chunk files, on the local disk.  This cache is disabled if None.
+CONTENTSERVER_DISK_CACHE_DIR = None
+
+# Size, in bytes, of the chunk files of assets cached on the local disk.
+CONTENTSERVER_DISK_CACHE_CHUNK_SIZE = 1048576
+
+# Maximum size, in bytes, of the assets cached on the local disk.  The least
+# recently used assets are removed once it is exceeded.  If None, the cache is
+# not pruned, and must be cleaned up externally.
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+############## Settings for the split modulestore ###############
+
+# Maximum size, in bytes of pickled data, of the per-process cache of course
+# structures, in front of the "course_structure_cache".  The per-process cache
+# is disabled if 0.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 0
+
+############## Settings for CCX ###############
+
+# Number of seconds the field overrides of a CCX are cached across requests.
+# Changes to the overrides invalidate the cache immediately; the timeout only
+# bounds how long overrides read by a request racing with an uncommitted
+# change can be cached.
+CCX_OVERRIDES_CACHE_TIMEOUT = 15 * 60
+
+############## Settings for the comments service ###############
+
+# Maximum number of connections to the comments service kept open by each
+# process.  Requests are sent without a connection pool if 0.
+COMMENTS_SERVICE_POOL_SIZE = 10
+
+# Number of times requests to the comments service which can be safely
+# repeated, like GETs, are retried after a connection error.
+COMMENTS_SERVICE_MAX_RETRIES = 0
+
+# Number of threads of each process used to send independent requests to the
+# comments service concurrently.  Requests are sent one after the other if 0.
+COMMENTS_SERVICE_FAN_OUT_WORKERS = 0
+
+############## Settings for configuration models ###############
+
+# Number of seconds configuration model entries are kept in each process, in
+# front of the "configuration" cache.  Saved changes are seen by all
+# processes within this time.  The per-process tier is disabled if 0.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 5
+
+# Whether configuration model entries are memoized for the duration of each
+# request.
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = True
+
+############## Settings for course enrollments ###############
+
+# Number of seconds the enrollments of a user are cached across requests.
+# Saving or deleting an enrollment invalidates the cache immediately; the
+# timeout only bounds how long enrollments read by a request racing with an
+# uncommitted change can be cached.  Enrollments are not cached if 0.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 60
+
+# Whether the enrollments of a user are memoized for the duration of each
+# request.
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = True
+
+############## Settings for course asset manifests ###############
+
+# Number of seconds the asset manifest of a course, used to rewrite the
+# /static/ urls of its content, is cached.  Saving, deleting or locking an
+# asset invalidates the manifest immediately; the timeout only bounds how
+# long changes made outside of the contentstore API can go unnoticed.
+# Manifests are not cached if 0.
+ASSET_MANIFEST_CACHE_TIMEOUT = 60 * 60
+
+# Maximum size, in bytes of pickled data, of a cached asset manifest, which
+# must fit in a single cache entry (memcached rejects values larger than 1MB).
+# The urls of courses with larger manifests are rewritten by looking up their
+# assets one by one.  Manifests of any size are cached if None.
+ASSET_MANIFEST_CACHE_MAX_SIZE = 1000000
@@ -60,6 +60,10 @@ FEATURES['DISABLE_START_DATES'] = True
 # the one in cms/envs/test.py
 FEATURES['ENABLE_DISCUSSION_SERVICE'] = False
 
+# Tests mock requests.request to fake the comments service, so send the
+# requests without a connection pool.
+COMMENTS_SERVICE_POOL_SIZE = 0
+
 FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 FEATURES['ENABLE_SHOPPING_CART'] = True
@@ -230,6 +234,20 @@ CACHES = {
     },
 }
 
+# Tests change configuration models outside of requests, and between tests
+# whose database changes are rolled back, so always read them through.
+CONFIGURATION_MODEL_LOCAL_CACHE_TIMEOUT = 0
+CONFIGURATION_MODEL_REQUEST_CACHE_ENABLED = False
+
+# Tests roll back their enrollments without invalidating any cache, and
+# count the queries enrollments take, so always read them through.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 0
+COURSE_ENROLLMENT_REQUEST_CACHE_ENABLED = False
+
+# Tests drop their contentstore without invalidating any cache, and count
+# the queries asset urls take, so always read asset manifests through.
+ASSET_MANIFEST_CACHE_TIMEOUT = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
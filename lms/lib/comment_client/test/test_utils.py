@@ -0,0 +1,75 @@
+"""
+Tests of the comment client utilities
+"""
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import translation
+import mock
+from nose.plugins.attrib import attr
+
+from lms.lib.comment_client import utils
+
+
+@attr('shard_1')
+class SessionTestCase(TestCase):
+    """
+    Tests of the pooled session used to send requests to the comments service.
+    """
+    def setUp(self):
+        super(SessionTestCase, self).setUp()
+        patcher = mock.patch.object(utils, '_SESSION', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(COMMENTS_SERVICE_POOL_SIZE=0)
+    def test_no_session_without_pool(self):
+        self.assertIsNone(utils.get_session())
+
+    @override_settings(COMMENTS_SERVICE_POOL_SIZE=5, COMMENTS_SERVICE_MAX_RETRIES=2)
+    def test_session_is_shared(self):
+        session = utils.get_session()
+        self.assertIs(utils.get_session(), session)
+        adapter = session.get_adapter('http://localhost:4567/api/v1/threads')
+        self.assertEqual(adapter._pool_maxsize, 5)  # pylint: disable=protected-access
+        self.assertEqual(adapter.max_retries.total, 2)
+
+    @override_settings(COMMENTS_SERVICE_POOL_SIZE=5)
+    def test_perform_request_uses_session(self):
+        response = mock.Mock(status_code=200, text='{"id": "thread"}')
+        response.json.return_value = {'id': 'thread'}
+        with mock.patch.object(utils.get_session(), 'request', return_value=response) as mock_request:
+            with mock.patch('lms.lib.comment_client.utils.requests.request') as mock_requests_request:
+                self.assertEqual(utils.perform_request('get', 'http://localhost:4567/api/v1/threads/thread'), {
+                    'id': 'thread'
+                })
+        self.assertTrue(mock_request.called)
+        self.assertFalse(mock_requests_request.called)
+
+
+@attr('shard_1')
+class FanOutTestCase(TestCase):
+    """
+    Tests of fan_out.
+    """
+    def test_serial(self):
+        calls = []
+        results = utils.fan_out(lambda: calls.append(1) or 'a', lambda: calls.append(2) or 'b')
+        self.assertEqual(results, ['a', 'b'])
+        self.assertEqual(calls, [1, 2])
+
+    @override_settings(COMMENTS_SERVICE_FAN_OUT_WORKERS=2)
+    def test_concurrent(self):
+        with translation.override('eo'):
+            results = utils.fan_out(translation.get_language, lambda: 'b')
+        self.assertEqual(results, ['eo', 'b'])
+
+    @override_settings(COMMENTS_SERVICE_FAN_OUT_WORKERS=2)
+    def test_concurrent_exception(self):
+        def fail():
+            """
+            Raises a comment client error.
+            """
+            raise utils.CommentClientRequestError('Not found', 404)
+
+        with self.assertRaises(utils.CommentClientRequestError):
+            utils.fan_out(lambda: 'a', fail)
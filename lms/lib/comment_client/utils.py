@@ -2,14 +2,24 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
+from multiprocessing.pool import ThreadPool
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 from django.conf import settings
+from django.db import connections
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+_SESSION = None
+_FAN_OUT_POOL = None
+_LOCK = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -51,6 +61,86 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def get_session():
+    """
+    Returns the requests Session used by this process to send requests to the
+    comments service, which keeps up to COMMENTS_SERVICE_POOL_SIZE connections
+    open, or None if COMMENTS_SERVICE_POOL_SIZE is 0.
+
+    Requests which can be safely repeated are retried up to
+    COMMENTS_SERVICE_MAX_RETRIES times after a connection error.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    pool_size = getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 10)
+    if not pool_size:
+        return None
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                adapter = HTTPAdapter(
+                    pool_maxsize=pool_size,
+                    max_retries=Retry(
+                        total=getattr(settings, "COMMENTS_SERVICE_MAX_RETRIES", 0),
+                        backoff_factor=0.1,
+                    ),
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Sends a request to the comments service, through the pooled session if
+    there is one.
+    """
+    session = get_session()
+    if session is None:
+        return requests.request(method, url, **kwargs)
+    return session.request(method, url, **kwargs)
+
+
+def fan_out(*functions):
+    """
+    Calls the given functions, which make independent requests to the
+    comments service, and returns the list of their results.  The functions
+    are called concurrently by a pool of COMMENTS_SERVICE_FAN_OUT_WORKERS
+    threads, or one after the other if COMMENTS_SERVICE_FAN_OUT_WORKERS is 0.
+
+    If any of the functions raises an exception, the first one is raised
+    once all the functions have returned.
+    """
+    global _FAN_OUT_POOL  # pylint: disable=global-statement
+    workers = getattr(settings, "COMMENTS_SERVICE_FAN_OUT_WORKERS", 0)
+    if not workers or len(functions) < 2:
+        return [function() for function in functions]
+
+    if _FAN_OUT_POOL is None:
+        with _LOCK:
+            if _FAN_OUT_POOL is None:
+                _FAN_OUT_POOL = ThreadPool(workers)
+
+    language = get_language()
+
+    def call(function):
+        """
+        Calls the function in a worker thread, with the language of the
+        calling thread, and closes the database connections it opened.
+        """
+        try:
+            with translation.override(language):
+                return function()
+        finally:
+            connections.close_all()
+
+    results = [_FAN_OUT_POOL.apply_async(call, (function,)) for function in functions]
+    for result in results:
+        result.wait()
+    return [result.get() for result in results]
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
     # To avoid dependency conflict
@@ -80,7 +170,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
         config = ForumsConfig.current()
-        response = requests.request(
+        response = _send_request(
             method,
             url,
             data=data,
@@ -1,7 +1,10 @@
 """
 Higher order functions built on the BlockStructureManager to interact with a django cache.
 """
+from django.conf import settings
 from django.core.cache import cache
+from django.utils.lru_cache import lru_cache
+from openedx.core.lib.block_structure.cache import BlockStructureLocalCache
 from openedx.core.lib.block_structure.manager import BlockStructureManager
 from xmodule.modulestore.django import modulestore
 
@@ -48,7 +51,7 @@ def get_block_structure_manager(course_key):
     """
     store = modulestore()
     course_usage_key = store.make_course_usage_key(course_key)
-    return BlockStructureManager(course_usage_key, store, get_cache())
+    return BlockStructureManager(course_usage_key, store, get_cache(), get_local_cache())
 
 
 def get_cache():
@@ -56,3 +59,22 @@ def get_cache():
     Returns the storage for caching Block Structures.
     """
     return cache
+
+
+def get_local_cache():
+    """
+    Returns the per-process cache of Block Structures, or None if it is
+    disabled by the BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE setting.
+    """
+    max_size = getattr(settings, 'BLOCK_STRUCTURES_LOCAL_CACHE_MAX_SIZE', 0)
+    if not max_size:
+        return None
+    return _get_local_cache(max_size)
+
+
+@lru_cache()
+def _get_local_cache(max_size):
+    """
+    Returns the per-process cache of Block Structures of the given size.
+    """
+    return BlockStructureLocalCache(max_size)
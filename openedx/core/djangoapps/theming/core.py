@@ -3,7 +3,7 @@ Core logic for Comprehensive Theming.
 """
 from django.conf import settings
 
-from .helpers import get_themes
+from .helpers import get_theme_template_index, get_themes
 
 from logging import getLogger
 logger = getLogger(__name__)  # pylint: disable=invalid-name
@@ -27,3 +27,6 @@ def enable_theming():
 
         if theme.themes_base_dir not in settings.MAKO_TEMPLATES['main']:
             settings.MAKO_TEMPLATES['main'].insert(0, theme.themes_base_dir)
+
+    # Index the templates overridden by each theme, rather than on the first template lookup.
+    get_theme_template_index()
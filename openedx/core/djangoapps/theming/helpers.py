@@ -16,6 +16,9 @@ from microsite_configuration import microsite
 from logging import getLogger
 logger = getLogger(__name__)  # pylint: disable=invalid-name
 
+# The ThemeTemplateIndex of the themes, keyed by the settings they were found with.
+THEME_TEMPLATE_INDEXES = {}
+
 
 def get_template_path(relative_path, **kwargs):
     """
@@ -57,7 +60,7 @@ def get_template_path_with_theme(relative_path):
     """
     relative_path = os.path.normpath(relative_path)
 
-    theme = get_current_theme()
+    theme = get_current_indexed_theme()
 
     if not theme:
         return relative_path
@@ -65,6 +68,11 @@ def get_template_path_with_theme(relative_path):
     # strip `/` if present at the start of relative_path
     template_name = re.sub(r'^/+', '', relative_path)
 
+    template_index = get_theme_template_index()
+    if theme.theme_dir_name in template_index.themes:
+        return template_index.template_paths.get((theme.theme_dir_name, template_name), relative_path)
+
+    # The theme was added after the index was built, look the template up in it.
     template_path = theme.template_path / template_name
     absolute_path = theme.path / "templates" / template_name
     if absolute_path.exists():
@@ -73,6 +81,52 @@ def get_template_path_with_theme(relative_path):
         return relative_path
 
 
+def get_current_indexed_theme():
+    """
+    Return current theme object, as `get_current_theme` does, but from the
+    ThemeTemplateIndex rather than by looking the theme up in the themes
+    directories, unless the theme is not in the index.
+
+    Returns:
+         (Theme): theme object for the current site.
+    """
+    site_theme = get_current_site_theme()
+    if not site_theme:
+        return None
+
+    theme = get_theme_template_index().themes.get(site_theme.theme_dir_name)
+    if theme is None:
+        return get_current_theme()
+    return theme
+
+
+def get_theme_template_index():
+    """
+    Return the ThemeTemplateIndex of all the themes.
+
+    The index is built once per process, at startup by `enable_theming`, and
+    rebuilt on every request in DEBUG mode, so that templates added to or
+    removed from a theme during development are picked up.
+
+    Returns:
+        (ThemeTemplateIndex): index of the templates overridden by each theme.
+    """
+    index_key = (
+        unicode(getattr(settings, 'COMPREHENSIVE_THEME_DIR', '')),
+        tuple(unicode(theme_dir) for theme_dir in getattr(settings, 'COMPREHENSIVE_THEME_DIRS', [])),
+        unicode(settings.PROJECT_ROOT),
+    )
+    if settings.DEBUG:
+        request_cache = RequestCache.get_request_cache('theming.template_index')
+        if index_key not in request_cache:
+            request_cache[index_key] = True
+            THEME_TEMPLATE_INDEXES.pop(index_key, None)
+
+    if index_key not in THEME_TEMPLATE_INDEXES:
+        THEME_TEMPLATE_INDEXES[index_key] = ThemeTemplateIndex(get_themes())
+    return THEME_TEMPLATE_INDEXES[index_key]
+
+
 def get_all_theme_template_dirs():
     """
     Returns template directories for all the themes.
@@ -109,7 +163,7 @@ def strip_site_theme_templates_path(uri):
     Returns:
         (str): template path with site theme path removed.
     """
-    theme = get_current_theme()
+    theme = get_current_indexed_theme()
 
     if not theme:
         return uri
@@ -439,3 +493,37 @@ class Theme(object):
         return [
             self.path / 'templates',
         ]
+
+
+class ThemeTemplateIndex(object):
+    """
+    Index of the templates overridden by each theme, so that the template
+    path of the current theme is resolved with a dict lookup rather than by
+    looking up the theme in the themes directories and checking that the
+    template exists on every template lookup.
+    """
+    def __init__(self, themes):
+        """
+        Walks the templates directory of each of the given themes.
+
+        Args:
+            themes: list of Theme objects to index
+        """
+        # Theme objects, keyed by their directory name.
+        self.themes = {}
+        # Template paths in the themes, keyed by (theme directory name, template name).
+        self.template_paths = {}
+
+        for theme in themes:
+            # As in get_theme_base_dir, the first themes dir which contains a theme wins.
+            if theme.theme_dir_name in self.themes:
+                continue
+            self.themes[theme.theme_dir_name] = theme
+
+            templates_dir = theme.path / 'templates'
+            for dirpath, __, filenames in os.walk(templates_dir, followlinks=True):
+                for filename in filenames:
+                    template_name = os.path.relpath(os.path.join(dirpath, filename), templates_dir)
+                    self.template_paths[(theme.theme_dir_name, template_name)] = str(
+                        theme.template_path / template_name
+                    )
@@ -3,6 +3,7 @@ Test helpers for Comprehensive Theming.
 """
 import unittest
 from mock import patch
+from path import Path
 
 from django.test import TestCase, override_settings
 from django.conf import settings
@@ -10,7 +11,9 @@ from django.conf import settings
 from openedx.core.djangoapps.theming.tests.test_util import with_comprehensive_theme
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.theming.helpers import get_template_path_with_theme, strip_site_theme_templates_path, \
-    get_themes, Theme, get_theme_base_dir
+    get_themes, Theme, get_theme_base_dir, get_theme_template_index
+from openedx.core.lib.tempdir import mkdtemp_clean
+from request_cache.middleware import RequestCache
 
 
 class TestHelpers(TestCase):
@@ -96,6 +99,51 @@ class TestHelpersLMS(TestCase):
         template_path = strip_site_theme_templates_path('/red-theme/lms/templates/header.html')
         self.assertEqual(template_path, '/red-theme/lms/templates/header.html')
 
+    @override_settings(COMPREHENSIVE_THEME_DIRS=[settings.TEST_THEME.dirname()])
+    def test_theme_template_index(self):
+        """
+        Tests the templates of each theme are indexed.
+        """
+        template_index = get_theme_template_index()
+        self.assertEqual(template_index.template_paths, {
+            ('test-theme', 'footer.html'): 'test-theme/lms/templates/footer.html',
+            ('test-theme', 'static_templates/embargo.html'): 'test-theme/lms/templates/static_templates/embargo.html',
+        })
+
+    @with_comprehensive_theme('red-theme')
+    def test_get_template_path_with_theme_from_index(self):
+        """
+        Tests template paths are looked up in the index rather than in the theme directory.
+        """
+        get_theme_template_index()
+        with patch.object(Path, 'exists') as mock_exists:
+            self.assertEqual(get_template_path_with_theme('header.html'), 'red-theme/lms/templates/header.html')
+            self.assertEqual(get_template_path_with_theme('course.html'), 'course.html')
+        self.assertFalse(mock_exists.called)
+
+    def test_theme_template_index_refreshed_in_debug(self):
+        """
+        Tests the index is rebuilt on every request in DEBUG mode only.
+        """
+        themes_dir = Path(mkdtemp_clean())
+        template_dir = themes_dir / 'temp-theme' / 'lms' / 'templates'
+        template_dir.makedirs()
+        (template_dir / 'footer.html').write_text(u'<footer>TEMPORARY THEME</footer>')
+
+        for debug in (False, True):
+            with override_settings(COMPREHENSIVE_THEME_DIRS=[str(themes_dir)], DEBUG=debug):
+                RequestCache.clear_request_cache()
+                self.assertNotIn(('temp-theme', 'header.html'), get_theme_template_index().template_paths)
+                (template_dir / 'header.html').write_text(u'<header>TEMPORARY THEME</header>')
+                self.assertNotIn(('temp-theme', 'header.html'), get_theme_template_index().template_paths)
+
+                RequestCache.clear_request_cache()
+                self.assertEqual(
+                    ('temp-theme', 'header.html') in get_theme_template_index().template_paths,
+                    debug
+                )
+                (template_dir / 'header.html').remove()
+
 
 @unittest.skipUnless(settings.ROOT_URLCONF == 'cms.urls', 'Test only valid in cms')
 class TestHelpersCMS(TestCase):
@@ -2,11 +2,23 @@
 Module for the Cache class for BlockStructure objects.
 """
 # pylint: disable=protected-access
+from collections import OrderedDict
+import cPickle as pickle
 from logging import getLogger
+from threading import Lock
+from uuid import uuid4
+import zlib
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+import dogstats_wrapper as dog_stats_api
 
-from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from openedx.core.lib.cache_utils import zpickle
+
+from .block_structure import (
+    BlockStructureModulestoreData,
+    BlockStructureBlockData,
+    TransformerData,
+    _BlockRelations,
+)
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -15,52 +27,79 @@ logger = getLogger(__name__)  # pylint: disable=C0103
 class BlockStructureCache(object):
     """
     Cache for BlockStructure objects.
+
+    A block structure is stored in separately addressable segments:
+
+        * The root segment, with the structure's block relations and
+          the names of the transformers whose data was collected.
+        * The fields segment, with the collected xBlock fields of all
+          blocks.
+        * One segment per transformer, with the transformer's
+          structure-level data and its block-specific data.
+
+    All the segments of a block structure are stamped with an identifier
+    that is unique to each write of the structure, so that segments from
+    different writes are never mixed.  The stamp is also stored on its
+    own, so that segments kept in an optional BlockStructureLocalCache
+    can be checked to be up to date with a single small read.
     """
-    def __init__(self, cache):
+    def __init__(self, cache, local_cache=None):
         """
         Arguments:
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache into which cacheable data of the block structure
                 is to be serialized.
+
+            local_cache (BlockStructureLocalCache) - The per-process
+                cache in which deserialized segments are kept, or None
+                to always deserialize them from the cache.
         """
         self._cache = cache
+        self._local_cache = local_cache
 
     def add(self, block_structure):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store compressed and pickled serializations of the segments of
+        the given block structure into the given cache.
 
-        The key in the cache is 'root.key.<root_block_usage_key>'.
-        The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        The key of the root segment in the cache is
+        'root.key.<root_block_usage_key>', and the keys of the other
+        segments are derived from it.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
+        root_cache_key = self._encode_root_cache_key(block_structure.root_block_usage_key)
+        transformer_segments = self._get_transformer_segments(block_structure)
+        segments = {
+            root_cache_key: (block_structure._block_relations, transformer_segments.keys()),
+            self._encode_fields_cache_key(root_cache_key): {
+                usage_key: block_data.fields for usage_key, block_data in block_structure.iteritems()
+            },
+        }
+        for transformer_name, transformer_segment in transformer_segments.iteritems():
+            segments[self._encode_transformer_cache_key(root_cache_key, transformer_name)] = transformer_segment
+
+        stamp = uuid4().hex
+        data_to_cache = {
+            cache_key: zpickle((stamp, segment)) for cache_key, segment in segments.iteritems()
+        }
+        data_to_cache[self._encode_stamp_cache_key(root_cache_key)] = stamp
 
         # Set the timeout value for the cache to 1 day as a fail-safe
         # in case the signal to invalidate the cache doesn't come through.
         timeout_in_seconds = 60 * 60 * 24
-        self._cache.set(
-            self._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache,
-            timeout=timeout_in_seconds,
-        )
+        self._cache.set_many(data_to_cache, timeout=timeout_in_seconds)
 
         logger.info(
-            "Wrote BlockStructure %s to cache, size: %s",
+            "Wrote BlockStructure %s to cache, segments: %s, size: %s",
             block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
+            len(segments),
+            sum(len(data_to_cache[cache_key]) for cache_key in segments),
         )
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformers=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -73,60 +112,376 @@ class BlockStructureCache(object):
                 of the block structure that is to be deserialized from
                 the given cache.
 
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose collected data is to be loaded, along with the root
+                and fields segments, in a single read of the cache.  If
+                None, the data of all the collected transformers is
+                loaded, which takes a second read.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
-            NoneType - If the root_block_usage_key is not found in the cache.
+            NoneType - If the root_block_usage_key is not found in the
+            cache, or any of the segments to load is missing from it.
         """
+        root_cache_key = self._encode_root_cache_key(root_block_usage_key)
+        fields_cache_key = self._encode_fields_cache_key(root_cache_key)
+        stamp, segments = self._get_local_segments(root_block_usage_key, root_cache_key)
 
-        # Find root_block_usage_key in the cache.
-        zp_data_from_cache = self._cache.get(self._encode_root_cache_key(root_block_usage_key))
-        if not zp_data_from_cache:
+        # Read the segments that are not in the local cache from the cache.
+        cache_keys = [root_cache_key, fields_cache_key]
+        if transformers is not None:
+            cache_keys.extend(
+                self._encode_transformer_cache_key(root_cache_key, transformer.name()) for transformer in transformers
+            )
+        stamp, read_segments, read_size = self._read_segments(
+            root_cache_key, stamp, [cache_key for cache_key in cache_keys if cache_key not in segments],
+        )
+        if stamp is None:
             logger.info(
                 "Did not find BlockStructure %r in the cache.",
                 root_block_usage_key,
             )
             return None
+        segments.update(read_segments)
+
+        # Only the transformers that were collected have a segment.
+        block_relations, transformer_names = segments[root_cache_key]
+        if transformers is None:
+            _, more_segments, more_size = self._read_segments(root_cache_key, stamp, [
+                cache_key
+                for cache_key in (
+                    self._encode_transformer_cache_key(root_cache_key, name) for name in transformer_names
+                )
+                if cache_key not in segments
+            ])
+            segments.update(more_segments)
+            read_segments.update(more_segments)
+            read_size += more_size
         else:
+            requested_transformer_names = set(transformer.name() for transformer in transformers)
+            transformer_names = [name for name in transformer_names if name in requested_transformer_names]
+
+        missing_cache_keys = [
+            cache_key
+            for cache_key in [fields_cache_key] + [
+                self._encode_transformer_cache_key(root_cache_key, name) for name in transformer_names
+            ]
+            if cache_key not in segments
+        ]
+        if missing_cache_keys:
             logger.info(
-                "Read BlockStructure %r from cache, size: %s",
+                "Did not find the segments %s of BlockStructure %r in the cache.",
+                missing_cache_keys,
                 root_block_usage_key,
-                len(zp_data_from_cache),
             )
+            return None
+
+        logger.info(
+            "Read BlockStructure %r from cache, segments: %s, size: %s",
+            root_block_usage_key,
+            len(read_segments),
+            read_size,
+        )
+
+        # Segments in the local cache are shared by all the block
+        # structures deserialized from it, so each block structure
+        # gets its own copies of their mutable parts.
+        copy_segments = self._local_cache is not None
+        if copy_segments and read_segments:
+            self._local_cache.update(root_block_usage_key, stamp, read_segments, read_size)
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
         block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure.transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
+        block_structure._block_relations = (
+            self._copy_block_relations(block_relations) if copy_segments else block_relations
+        )
+        for usage_key, fields in segments[fields_cache_key].iteritems():
+            block_structure._get_or_create_block(usage_key).fields = dict(fields) if copy_segments else fields
+        for transformer_name in transformer_names:
+            self._set_transformer_segment(
+                block_structure,
+                transformer_name,
+                segments[self._encode_transformer_cache_key(root_cache_key, transformer_name)],
+                copy_segments,
+            )
 
         return block_structure
 
+    def _get_local_segments(self, root_block_usage_key, root_cache_key):
+        """
+        Returns a tuple of the stamp and a dict of the deserialized
+        segments, keyed by cache key, of the block structure for the given
+        root_block_usage_key that are in the local cache and are up to
+        date with the cache.
+
+        Returns (None, {}) if the local cache is disabled or has no up to
+        date segments for the block structure.
+        """
+        if self._local_cache is None:
+            return None, {}
+        stamp = self._cache.get(self._encode_stamp_cache_key(root_cache_key))
+        segments = self._local_cache.get(root_block_usage_key, stamp) if stamp is not None else None
+        if segments is None:
+            return None, {}
+        return stamp, dict(segments)
+
+    def _read_segments(self, root_cache_key, stamp, cache_keys):
+        """
+        Reads and deserializes the segments with the given cache keys from
+        the cache, and returns a tuple of the stamp of the block structure,
+        a dict of the deserialized segments keyed by cache key, and their
+        total serialized size.
+
+        If the root segment is to be read, the stamp of the block structure
+        is taken from it, and None is returned as stamp if it is not found.
+        Otherwise, the given stamp is used.  Segments whose stamp doesn't
+        match the stamp of the block structure are left out.
+        """
+        if not cache_keys:
+            return stamp, {}, 0
+        zp_segments = self._cache.get_many(cache_keys)
+        segments = {}
+        size = 0
+        if root_cache_key in cache_keys:
+            if root_cache_key not in zp_segments:
+                return None, {}, 0
+            pickled_segment = zlib.decompress(zp_segments.pop(root_cache_key))
+            stamp, segments[root_cache_key] = pickle.loads(pickled_segment)
+            size += len(pickled_segment)
+
+        for cache_key, zp_segment in zp_segments.iteritems():
+            pickled_segment = zlib.decompress(zp_segment)
+            segment_stamp, segment = pickle.loads(pickled_segment)
+            if segment_stamp == stamp:
+                segments[cache_key] = segment
+                size += len(pickled_segment)
+        return stamp, segments, size
+
     def delete(self, root_block_usage_key):
         """
         Deletes the block structure for the given root_block_usage_key
         from the given cache.
 
+        Only the root segment and the stamp are deleted: the other
+        segments can't be read without them, and expire on their own.
+        The block structure is also removed from the local cache of
+        this process; the local caches of other processes find out that
+        it was deleted when they next check its stamp.
+
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be removed from
                 the cache.
         """
-        self._cache.delete(self._encode_root_cache_key(root_block_usage_key))
+        root_cache_key = self._encode_root_cache_key(root_block_usage_key)
+        self._cache.delete_many([root_cache_key, self._encode_stamp_cache_key(root_cache_key)])
+        if self._local_cache is not None:
+            self._local_cache.delete(root_block_usage_key)
         logger.info(
             "Deleted BlockStructure %r from the cache.",
             root_block_usage_key,
         )
 
+    @classmethod
+    def _get_transformer_segments(cls, block_structure):
+        """
+        Returns a map of transformer name to the cacheable segment of the
+        transformer's collected data in the given block structure.
+
+        A segment is a tuple of the transformer's structure-level fields
+        and a map of block usage key to the transformer's block-specific
+        fields.
+        """
+        transformer_segments = {}
+        for transformer_name, transformer_data in block_structure.transformer_data.iteritems():
+            transformer_segments[transformer_name] = (transformer_data.fields, {})
+        for usage_key, block_data in block_structure.iteritems():
+            for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+                transformer_segment = transformer_segments.setdefault(transformer_name, ({}, {}))
+                transformer_segment[1][usage_key] = transformer_block_data.fields
+        return transformer_segments
+
+    @classmethod
+    def _set_transformer_segment(cls, block_structure, transformer_name, transformer_segment, copy_segment=False):
+        """
+        Sets the transformer's collected data in the given block structure
+        from the given cacheable segment, using copies of the segment's
+        field dicts if copy_segment is True.
+        """
+        transformer_fields, block_fields_map = transformer_segment
+        if transformer_fields:
+            block_structure.transformer_data[transformer_name] = cls._create_transformer_data(
+                transformer_fields, copy_segment,
+            )
+        for usage_key, fields in block_fields_map.iteritems():
+            block_structure._get_or_create_block(usage_key).transformer_data[transformer_name] = (
+                cls._create_transformer_data(fields, copy_segment)
+            )
+
+    @classmethod
+    def _create_transformer_data(cls, fields, copy_fields=False):
+        """
+        Returns a TransformerData with the given fields.
+        """
+        transformer_data = TransformerData()
+        transformer_data.fields = dict(fields) if copy_fields else fields
+        return transformer_data
+
+    @classmethod
+    def _copy_block_relations(cls, block_relations):
+        """
+        Returns a copy of the given map of usage key to _BlockRelations
+        that can be mutated independently of it.
+        """
+        copied_block_relations = {}
+        for usage_key, relations in block_relations.iteritems():
+            copied_relations = _BlockRelations()
+            copied_relations.parents = list(relations.parents)
+            copied_relations.children = list(relations.children)
+            copied_block_relations[usage_key] = copied_relations
+        return copied_block_relations
+
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
         """
-        Returns the cache key to use for storing the block structure
-        for the given root_block_usage_key.
+        Returns the cache key to use for storing the root segment of the
+        block structure for the given root_block_usage_key.
         """
         return "v{version}.root.key.{root_usage_key}".format(
             version=unicode(BlockStructureBlockData.VERSION),
             root_usage_key=unicode(root_block_usage_key),
         )
+
+    @classmethod
+    def _encode_stamp_cache_key(cls, root_cache_key):
+        """
+        Returns the cache key to use for storing the stamp of the block
+        structure with the given root segment cache key.
+        """
+        return "{root_cache_key}.stamp".format(root_cache_key=root_cache_key)
+
+    @classmethod
+    def _encode_fields_cache_key(cls, root_cache_key):
+        """
+        Returns the cache key to use for storing the xBlock fields segment
+        of the block structure with the given root segment cache key.
+        """
+        return "{root_cache_key}.fields".format(root_cache_key=root_cache_key)
+
+    @classmethod
+    def _encode_transformer_cache_key(cls, root_cache_key, transformer_name):
+        """
+        Returns the cache key to use for storing the segment of the given
+        transformer of the block structure with the given root segment
+        cache key.
+        """
+        return "{root_cache_key}.transformer.{transformer_name}".format(
+            root_cache_key=root_cache_key,
+            transformer_name=transformer_name,
+        )
+
+
+class BlockStructureLocalCache(object):
+    """
+    A per-process, size-bounded LRU cache of the deserialized segments of
+    block structures, keyed by root usage key and block structure stamp.
+
+    The size of an entry is accounted as the size of the pickled segments
+    it holds, which approximates the memory they use.  Least recently
+    used entries are evicted once the total size of the entries exceeds
+    max_size.
+
+    Hits, misses, evictions and the total size are reported to datadog.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int) - The maximum total size, in bytes of pickled
+                data, of the cached segments.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Map of root usage key to a (stamp, segments, size) tuple, in
+        # order of least to most recent use.
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, root_block_usage_key, stamp):
+        """
+        Returns the dict of deserialized segments, keyed by cache key,
+        cached for the block structure with the given root usage key and
+        stamp, or None if there are none.
+
+        The returned dict and segments must not be mutated.
+        """
+        with self._lock:
+            entry = self._entries.pop(root_block_usage_key, None)
+            if entry is not None and entry[0] == stamp:
+                self._entries[root_block_usage_key] = entry
+                self.hits += 1
+                dog_stats_api.increment('block_structure.local_cache.hit')
+                return entry[1]
+            if entry is not None:
+                # The block structure was written again since it was cached.
+                self.size -= entry[2]
+            self.misses += 1
+        dog_stats_api.increment('block_structure.local_cache.miss')
+        return None
+
+    def update(self, root_block_usage_key, stamp, segments, size):
+        """
+        Caches the given deserialized segments, keyed by cache key, of the
+        block structure with the given root usage key and stamp, along with
+        any of its segments that are already cached.
+
+        Arguments:
+            size (int) - The size of the pickled segments.
+        """
+        if size > self.max_size:
+            return
+        with self._lock:
+            entry = self._entries.pop(root_block_usage_key, None)
+            if entry is not None:
+                self.size -= entry[2]
+                if entry[0] == stamp:
+                    cached_segments = dict(entry[1])
+                    cached_segments.update(segments)
+                    segments = cached_segments
+                    size += entry[2]
+            self._entries[root_block_usage_key] = (stamp, segments, size)
+            self.size += size
+
+            evictions = 0
+            while self.size > self.max_size:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evictions += 1
+            total_size = self.size
+        if evictions:
+            dog_stats_api.increment('block_structure.local_cache.eviction', evictions)
+        dog_stats_api.histogram('block_structure.local_cache.size', total_size)
+
+    def delete(self, root_block_usage_key):
+        """
+        Removes the segments of the block structure with the given root
+        usage key from the cache.
+        """
+        with self._lock:
+            entry = self._entries.pop(root_block_usage_key, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def clear(self):
+        """
+        Removes all the entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
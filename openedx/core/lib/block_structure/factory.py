@@ -58,7 +58,7 @@ class BlockStructureFactory(object):
         return block_structure
 
     @classmethod
-    def create_from_cache(cls, root_block_usage_key, block_structure_cache):
+    def create_from_cache(cls, root_block_usage_key, block_structure_cache, transformers=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -75,10 +75,14 @@ class BlockStructureFactory(object):
                 cache from which the block structure is to be
                 deserialized.
 
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose collected data is to be deserialized.  If None, the
+                data of all collected transformers is deserialized.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
             NoneType - If the root_block_usage_key is not found in the cache.
         """
-        return block_structure_cache.get(root_block_usage_key)
+        return block_structure_cache.get(root_block_usage_key, transformers)
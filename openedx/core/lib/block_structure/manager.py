@@ -15,7 +15,7 @@ class BlockStructureManager(object):
     Top-level class for managing Block Structures.
     """
 
-    def __init__(self, root_block_usage_key, modulestore, cache):
+    def __init__(self, root_block_usage_key, modulestore, cache, local_cache=None):
         """
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -28,10 +28,13 @@ class BlockStructureManager(object):
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache to use for storing/retrieving the block structure's
                 collected data.
+
+            local_cache (BlockStructureLocalCache) - The optional
+                per-process cache to keep deserialized collected data in.
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
-        self.block_structure_cache = BlockStructureCache(cache)
+        self.block_structure_cache = BlockStructureCache(cache, local_cache)
 
     def get_transformed(self, transformers, starting_block_usage_key=None):
         """
@@ -40,7 +43,9 @@ class BlockStructureManager(object):
         and modulestore, as needed.
 
         Details: Similar to the get_collected method, except the transformers'
-        transform methods are also called.
+        transform methods are also called.  Only the collected data of the
+        given transformers, and of the transformers whose collected data
+        they depend on, is loaded from the cache.
 
         Arguments:
             transformers (BlockStructureTransformers) - Collection of
@@ -54,7 +59,9 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = self.get_collected()
+        block_structure = self._get_collected(
+            BlockStructureTransformers.with_collected_data_dependencies(transformers)
+        )
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
             # requested location.  The rest of the structure will be pruned
@@ -83,12 +90,25 @@ class BlockStructureManager(object):
                 starting at root_block_usage_key, with collected data
                 from each registered transformer.
         """
+        return self._get_collected()
+
+    def _get_collected(self, transformers=None):
+        """
+        Returns the collected Block Structure for the root_block_usage_key,
+        loading only the collected data of the given transformers from the
+        cache, or of all transformers if transformers is None.
+
+        If the cache needs to be updated, the data of all registered
+        transformers is collected, and the returned block structure
+        includes all of it.
+        """
         block_structure = BlockStructureFactory.create_from_cache(
             self.root_block_usage_key,
-            self.block_structure_cache
+            self.block_structure_cache,
+            transformers,
         )
         cache_miss = block_structure is None
-        if cache_miss or BlockStructureTransformers.is_collected_outdated(block_structure):
+        if cache_miss or BlockStructureTransformers.is_collected_outdated(block_structure, transformers):
             with self._bulk_operations():
                 block_structure = BlockStructureFactory.create_from_modulestore(
                     self.root_block_usage_key,
@@ -95,6 +95,14 @@ class MockCache(object):
         self.map[key] = val
         self.timeout_from_last_call = timeout
 
+    def set_many(self, data, timeout):
+        """
+        Associates each key of the given dict with its value in the cache.
+        """
+        self.set_call_count += 1
+        self.map.update(data)
+        self.timeout_from_last_call = timeout
+
     def get(self, key, default=None):
         """
         Returns the value associated with the given key in the cache;
@@ -102,12 +110,26 @@ class MockCache(object):
         """
         return self.map.get(key, default)
 
+    def get_many(self, keys):
+        """
+        Returns a dict of the given keys that are found in the cache to
+        their values.
+        """
+        return {key: self.map[key] for key in keys if key in self.map}
+
     def delete(self, key):
         """
         Deletes the given key from the cache.
         """
         del self.map[key]
 
+    def delete_many(self, keys):
+        """
+        Deletes the given keys that are found in the cache.
+        """
+        for key in keys:
+            self.map.pop(key, None)
+
 
 class MockModulestoreFactory(object):
     """
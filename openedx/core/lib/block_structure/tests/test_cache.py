@@ -1,11 +1,12 @@
 """
 Tests for block_structure/cache.py
 """
+from mock import patch
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
-from ..cache import BlockStructureCache
-from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer
+from ..cache import BlockStructureCache, BlockStructureLocalCache
+from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, MockFilteringTransformer
 
 
 @attr('shard_2')
@@ -25,7 +26,7 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         Add each registered transformer to the block structure.
         Mimic collection by setting test transformer block data.
         """
-        for transformer in [MockTransformer]:
+        for transformer in [MockTransformer, MockFilteringTransformer]:
             self.block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             self.block_structure.set_transformer_block_field(
                 usage_key=0, transformer=transformer, key='test', value='{} val'.format(transformer.name())
@@ -41,6 +42,52 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         self.assertIsNotNone(cached_value)
         self.assert_block_structure(cached_value, self.children_map)
+        for transformer in [MockTransformer, MockFilteringTransformer]:
+            self.assertEquals(
+                cached_value.get_transformer_block_field(0, transformer, 'test'),
+                '{} val'.format(transformer.name()),
+            )
+
+    def test_get_some_transformers(self):
+        self.add_transformers()
+        self.block_structure_cache.add(self.block_structure)
+
+        with patch.object(self.mock_cache, 'get_many', wraps=self.mock_cache.get_many) as mock_get_many:
+            cached_value = self.block_structure_cache.get(
+                self.block_structure.root_block_usage_key, transformers=[MockTransformer],
+            )
+        self.assertEquals(mock_get_many.call_count, 1)
+        self.assert_block_structure(cached_value, self.children_map)
+        self.assertEquals(cached_value.get_transformer_block_field(0, MockTransformer, 'test'), 'MockTransformer val')
+        self.assertEquals(cached_value._get_transformer_data_version(MockTransformer), 1)  # pylint: disable=protected-access
+        self.assertIsNone(cached_value.get_transformer_block_field(0, MockFilteringTransformer, 'test'))
+
+    def test_get_missing_transformer_segment(self):
+        self.add_transformers()
+        self.block_structure_cache.add(self.block_structure)
+        segment_key = next(key for key in self.mock_cache.map if key.endswith(MockFilteringTransformer.name()))
+        del self.mock_cache.map[segment_key]
+
+        self.assertIsNone(self.block_structure_cache.get(self.block_structure.root_block_usage_key))
+        self.assertIsNone(
+            self.block_structure_cache.get(
+                self.block_structure.root_block_usage_key, transformers=[MockFilteringTransformer],
+            )
+        )
+        self.assertIsNotNone(
+            self.block_structure_cache.get(self.block_structure.root_block_usage_key, transformers=[MockTransformer])
+        )
+
+    def test_get_mixed_segments(self):
+        self.add_transformers()
+        self.block_structure_cache.add(self.block_structure)
+        old_segments = dict(self.mock_cache.map)
+        self.block_structure_cache.add(self.block_structure)
+
+        # Segments from an older write of the structure are ignored.
+        fields_key = next(key for key in old_segments if key.endswith('.fields'))
+        self.mock_cache.map[fields_key] = old_segments[fields_key]
+        self.assertIsNone(self.block_structure_cache.get(self.block_structure.root_block_usage_key))
 
     def test_get_none(self):
         self.assertIsNone(
@@ -54,3 +101,73 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         self.assertIsNone(
             self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         )
+
+
+@attr('shard_2')
+class TestBlockStructureLocalCache(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureCache with a BlockStructureLocalCache
+    """
+    def setUp(self):
+        super(TestBlockStructureLocalCache, self).setUp()
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        self.block_structure.set_transformer_block_field(2, MockTransformer, 'test', 'original')
+        self.mock_cache = MockCache()
+        self.local_cache = BlockStructureLocalCache(max_size=1024 * 1024)
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, self.local_cache)
+        self.block_structure_cache.add(self.block_structure)
+
+    def get_block_structure(self):
+        """
+        Returns the block structure from the cache, and verifies it.
+        """
+        cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(cached_value, self.children_map)
+        self.assertEquals(cached_value._get_transformer_data_version(MockTransformer), 1)  # pylint: disable=protected-access
+        return cached_value
+
+    def test_hit(self):
+        first_value = self.get_block_structure()
+        self.assertEquals((self.local_cache.hits, self.local_cache.misses), (0, 1))
+        self.assertGreater(self.local_cache.size, 0)
+
+        # Mutating a block structure doesn't affect the cached data.
+        first_value.remove_block(1, keep_descendants=False)
+        first_value.set_transformer_block_field(2, MockTransformer, 'test', 'mutated')
+
+        self.mock_cache.map = {
+            key: value for key, value in self.mock_cache.map.iteritems() if key.endswith('.stamp')
+        }
+        second_value = self.get_block_structure()
+        self.assertEquals((self.local_cache.hits, self.local_cache.misses), (1, 1))
+        self.assertEquals(second_value.get_transformer_block_field(2, MockTransformer, 'test'), 'original')
+
+    def test_outdated(self):
+        self.get_block_structure()
+        self.block_structure_cache.add(self.block_structure)
+        self.get_block_structure()
+        self.assertEquals((self.local_cache.hits, self.local_cache.misses), (0, 2))
+        self.assertEquals(len(self.local_cache), 1)
+
+    def test_delete(self):
+        self.get_block_structure()
+        self.block_structure_cache.delete(self.block_structure.root_block_usage_key)
+        self.assertEquals((len(self.local_cache), self.local_cache.size), (0, 0))
+        self.assertIsNone(self.block_structure_cache.get(self.block_structure.root_block_usage_key))
+
+    def test_eviction(self):
+        self.get_block_structure()
+        entry_size = self.local_cache.size
+        self.local_cache.max_size = entry_size * 2
+
+        other_block_structure = self.create_block_structure(self.children_map)
+        for root_block_usage_key in ['other_root', 'another_root']:
+            other_block_structure.root_block_usage_key = root_block_usage_key
+            self.block_structure_cache.add(other_block_structure)
+            self.block_structure_cache.get(root_block_usage_key)
+
+        self.assertEquals(len(self.local_cache), 2)
+        self.assertLessEqual(self.local_cache.size, self.local_cache.max_size)
+        self.assertIsNone(self.local_cache.get(self.block_structure.root_block_usage_key, None))
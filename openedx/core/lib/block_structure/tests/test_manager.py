@@ -1,6 +1,7 @@
 """
 Tests for manager.py
 """
+from mock import patch
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
@@ -85,6 +86,18 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class DependentTransformer(MockTransformer):
+    """
+    Test Transformer class that reads the data collected by TestTransformer1.
+    """
+    @classmethod
+    def collected_data_dependencies(cls):
+        return [TestTransformer1]
+
+    def transform(self, usage_info, block_structure):
+        TestTransformer1.assert_collected(block_structure)
+
+
 @attr('shard_2')
 class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
     """
@@ -131,6 +144,36 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         TestTransformer1.assert_collected(block_structure)
         TestTransformer1.assert_transformed(block_structure)
 
+    def test_get_transformed_cached(self):
+        registered_transformers = self.registered_transformers + [DependentTransformer()]
+        for expect_cache_miss in (True, False):
+            self.modulestore.get_items_call_count = 0
+            self.cache.set_call_count = 0
+            with patch.object(self.cache, 'get_many', wraps=self.cache.get_many) as mock_get_many:
+                with mock_registered_transformers(registered_transformers):
+                    block_structure = self.bs_manager.get_transformed(
+                        BlockStructureTransformers([DependentTransformer()])
+                    )
+            self.assert_block_structure(block_structure, self.children_map)
+            TestTransformer1.assert_collected(block_structure)
+            self.assertEquals(self.modulestore.get_items_call_count > 0, expect_cache_miss)
+            self.assertEquals(self.cache.set_call_count, 1 if expect_cache_miss else 0)
+            # The segments of the transformers and their dependencies are read at once.
+            self.assertEquals(mock_get_many.call_count, 1)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
+    def test_get_transformed_loads_only_its_transformers(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.cache.set_call_count = 0
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_transformed(BlockStructureTransformers([]))
+        self.assert_block_structure(block_structure, self.children_map)
+        self.assertIsNone(
+            block_structure.get_transformer_block_field(0, TestTransformer1, TestTransformer1.collect_data_key)
+        )
+        self.assertEquals(self.cache.set_call_count, 0)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
     def test_get_transformed_with_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             block_structure = self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=1)
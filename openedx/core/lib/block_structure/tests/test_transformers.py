@@ -81,3 +81,48 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.assertTrue(self.transformers.is_collected_outdated(block_structure))
             self.transformers.collect(block_structure)
             self.assertFalse(self.transformers.is_collected_outdated(block_structure))
+
+    def test_with_collected_data_dependencies(self):
+        class DependentTransformer(MockTransformer):
+            """
+            Mock transformer that reads the data of the filtering and unregistered transformers.
+            """
+            @classmethod
+            def collected_data_dependencies(cls):
+                return [MockFilteringTransformer, TestBlockStructureTransformers.UnregisteredTransformer]
+
+        class TransitivelyDependentTransformer(MockTransformer):
+            """
+            Mock transformer that reads the data of DependentTransformer.
+            """
+            @classmethod
+            def collected_data_dependencies(cls):
+                return [DependentTransformer, MockFilteringTransformer]
+
+        self.assertItemsEqual(
+            [
+                transformer.name()
+                for transformer in BlockStructureTransformers.with_collected_data_dependencies(
+                    [TransitivelyDependentTransformer(), MockTransformer()]
+                )
+            ],
+            [
+                'TransitivelyDependentTransformer', 'DependentTransformer', 'MockFilteringTransformer',
+                'UnregisteredTransformer', 'MockTransformer',
+            ],
+        )
+
+    def test_is_collected_outdated_unregistered(self):
+        block_structure = self.create_block_structure(
+            self.SIMPLE_CHILDREN_MAP,
+            BlockStructureModulestoreData
+        )
+
+        with mock_registered_transformers(self.registered_transformers):
+            self.transformers.collect(block_structure)
+            # The data of unregistered transformers is versioned by the registered transformer collecting it.
+            self.assertFalse(
+                self.transformers.is_collected_outdated(
+                    block_structure, [MockTransformer(), self.UnregisteredTransformer()]
+                )
+            )
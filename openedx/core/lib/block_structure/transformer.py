@@ -43,6 +43,19 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    @classmethod
+    def collected_data_dependencies(cls):
+        """
+        Returns the transformers, other than this one, whose collected
+        data is read by this transformer's transform method, or by the
+        clients of the block structures it transforms.
+
+        Only the collected data of the transformers that are applied to
+        a block structure, and of their dependencies, is loaded from the
+        cache.
+        """
+        return []
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -2,6 +2,7 @@
 Module for a collection of BlockStructureTransformers.
 """
 import functools
+from itertools import chain
 from logging import getLogger
 
 from .exceptions import TransformerException
@@ -70,6 +71,31 @@ class BlockStructureTransformers(object):
                 self._transformers['no_filter'].append(transformer)
         return self
 
+    def __iter__(self):
+        """
+        Returns an iterator over the transformers in the collection.
+        """
+        return chain(self._transformers['supports_filter'], self._transformers['no_filter'])
+
+    @classmethod
+    def with_collected_data_dependencies(cls, transformers):
+        """
+        Returns a list of the given transformers along with the
+        transformers whose collected data they depend on, transitively.
+
+        Arguments:
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose dependencies are to be added.
+        """
+        transformers_by_name = {}
+        pending_transformers = list(transformers)
+        while pending_transformers:
+            transformer = pending_transformers.pop()
+            if transformer.name() not in transformers_by_name:
+                transformers_by_name[transformer.name()] = transformer
+                pending_transformers.extend(transformer.collected_data_dependencies())
+        return transformers_by_name.values()
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -83,12 +109,26 @@ class BlockStructureTransformers(object):
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
     @classmethod
-    def is_collected_outdated(cls, block_structure):
+    def is_collected_outdated(cls, block_structure, transformers=None):
         """
         Returns whether the collected data in the block structure is outdated.
-        """
+
+        Arguments:
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose collected data is checked.  Only the registered
+                ones have a version: the data of the others is collected,
+                and thus versioned, by a registered transformer.  If None,
+                all registered transformers are checked.
+        """
+        registered_transformers = TransformerRegistry.get_registered_transformers()
+        if transformers is not None:
+            registered_transformer_names = set(transformer.name() for transformer in registered_transformers)
+            registered_transformers = [
+                transformer for transformer in transformers if transformer.name() in registered_transformer_names
+            ]
+
         outdated_transformers = []
-        for transformer in TransformerRegistry.get_registered_transformers():
+        for transformer in registered_transformers:
             version_in_block_structure = block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
             if transformer.VERSION != version_in_block_structure:
                 outdated_transformers.append(transformer)
@@ -251,6 +251,23 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def replace_all_urls(data_dir, course_id, jump_to_id_base_url, block, view, frag, context,  # pylint: disable=unused-argument
+                     static_asset_path=''):
+    """
+    Updates the supplied module with a new get_html function that wraps
+    the old get_html function and substitutes urls as replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls would, in a single pass
+    over the content.
+    """
+    return wrap_fragment(frag, static_replace.replace_all_urls(
+        frag.content,
+        data_dir,
+        course_id,
+        static_asset_path=static_asset_path,
+        jump_to_id_base_url=jump_to_id_base_url
+    ))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.